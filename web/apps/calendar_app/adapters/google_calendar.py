@@ -1,17 +1,85 @@
 # apps/calendar_app/adapters/google_calendar.py
-from typing import List
+import json
+import threading
+import time as time_module
+from dataclasses import dataclass
+from typing import Any, List, Optional
 from datetime import datetime, time, timedelta
 import pytz
 from google.oauth2.credentials import Credentials
 from google.auth.exceptions import RefreshError
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
 from django.conf import settings
-from apps.calendar_app.ports.calendar_provider import ICalendarProvider, FixedEvent
+from apps.calendar_app.ports.calendar_provider import ICalendarProvider, FixedEvent, EventChanges, SyncTokenExpired
 from apps.core.models import GoogleCredentials
 
 
+# Pełna synchronizacja obejmuje wydarzenia od tylu dni wstecz (starsze nie wpływają na plan)
+SYNC_LOOKBACK_DAYS = 30
+
+# Jak długo trzymamy zbudowanego klienta API użytkownika
+CLIENT_TTL_SECONDS = 10 * 60
+
+
+_discovery_document = None
+
+
+def calendar_discovery_document() -> dict:
+    """Statyczny dokument discovery Calendar v3 (z paczki googleapiclient), parsowany raz na proces."""
+    global _discovery_document
+    if _discovery_document is None:
+        _discovery_document = json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+    return _discovery_document
+
+
+@dataclass
+class _CachedClient:
+    service: Any
+    credentials: Credentials
+    token: str  # Token zapisany w bazie (różnica = odświeżony w trakcie zapytania)
+    version: datetime  # GoogleCredentials.updated_at - nowe poświadczenia unieważniają klienta
+    expires_at: float  # time.monotonic()
+
+
+# Klienci per proces; osobny słownik na wątek, bo połączenia httplib2 nie są bezpieczne wątkowo
+_clients = threading.local()
+
+
+def _client_cache() -> dict:
+    """{user_id: _CachedClient} dla bieżącego wątku."""
+    if not hasattr(_clients, 'by_user'):
+        _clients.by_user = {}
+    return _clients.by_user
+
+
 class GoogleCalendarAdapter(ICalendarProvider):
 
+    @staticmethod
+    def _parse_event(event: dict) -> Optional[FixedEvent]:
+        """Wydarzenie z API -> FixedEvent (None dla całodniowych i nieparsowalnych)."""
+        # Ignoruj wydarzenia całodniowe
+        if 'dateTime' not in event.get('start', {}):
+            return None
+
+        start_str = event['start'].get('dateTime')
+        end_str = event['end'].get('dateTime')
+
+        try:
+            start_dt = datetime.fromisoformat(start_str)
+            end_dt = datetime.fromisoformat(end_str)
+        except ValueError:
+            return None
+
+        return FixedEvent(
+            title=event.get('summary', 'Bez tytułu'),
+            start_time=start_dt,
+            end_time=end_dt,
+            is_work=True,
+            external_id=event.get('id')
+        )
+
     def _fetch_from_google(self, service, t_min: str, t_max: str) -> List[FixedEvent]:
         """Metoda pomocnicza do pobierania i parsowania zdarzeń z API."""
         try:
@@ -27,25 +95,9 @@ class GoogleCalendarAdapter(ICalendarProvider):
             fixed_events = []
 
             for event in events:
-                # Ignoruj wydarzenia całodniowe
-                if 'dateTime' not in event.get('start', {}):
-                    continue
-
-                start_str = event['start'].get('dateTime')
-                end_str = event['end'].get('dateTime')
-
-                try:
-                    start_dt = datetime.fromisoformat(start_str)
-                    end_dt = datetime.fromisoformat(end_str)
-                except ValueError:
-                    continue
-
-                fixed_events.append(FixedEvent(
-                    title=event.get('summary', 'Bez tytułu'),
-                    start_time=start_dt,
-                    end_time=end_dt,
-                    is_work=True
-                ))
+                fixed_event = self._parse_event(event)
+                if fixed_event:
+                    fixed_events.append(fixed_event)
 
             return fixed_events
 
@@ -54,7 +106,20 @@ class GoogleCalendarAdapter(ICalendarProvider):
             return []
 
     def _get_service(self, user_id: int):
-        """Buduje klienta API dla danego usera."""
+        """
+        Klient API dla danego usera - z cache procesu (TTL + wersja poświadczeń).
+        Dokument discovery jest wczytany raz, więc budowa klienta nie parsuje go za każdym razem.
+        """
+        version = GoogleCredentials.objects.filter(user_id=user_id).values_list('updated_at', flat=True).first()
+        clients = _client_cache()
+        if version is None:
+            clients.pop(user_id, None)
+            return None
+
+        entry = clients.get(user_id)
+        if entry and entry.version == version and entry.expires_at > time_module.monotonic():
+            return entry.service
+
         try:
             creds_db = GoogleCredentials.objects.get(user_id=user_id)
         except GoogleCredentials.DoesNotExist:
@@ -66,11 +131,13 @@ class GoogleCalendarAdapter(ICalendarProvider):
             token_uri=creds_db.token_uri,
             client_id=creds_db.client_id,
             client_secret=creds_db.client_secret,
-            scopes=creds_db.scopes.split()
+            scopes=creds_db.scopes.split(),
+            # google-auth porównuje expiry jako naive UTC
+            expiry=creds_db.token_expiry.astimezone(pytz.UTC).replace(tzinfo=None) if creds_db.token_expiry else None
         )
 
         try:
-            return build('calendar', 'v3', credentials=creds)
+            service = build_from_document(calendar_discovery_document(), credentials=creds)
         except RefreshError:
             print("Token wygasł.")
             return None
@@ -78,6 +145,29 @@ class GoogleCalendarAdapter(ICalendarProvider):
             print(f"Błąd budowania serwisu: {e}")
             return None
 
+        clients[user_id] = _CachedClient(
+            service=service,
+            credentials=creds,
+            token=creds.token,
+            version=creds_db.updated_at,
+            expires_at=time_module.monotonic() + CLIENT_TTL_SECONDS
+        )
+        return service
+
+    def _save_refreshed_token(self, user_id: int):
+        """Jeśli google-auth odświeżył token w trakcie zapytania, zapisujemy go w GoogleCredentials."""
+        entry = _client_cache().get(user_id)
+        if not entry or entry.credentials.token == entry.token:
+            return
+
+        expiry = entry.credentials.expiry
+        # .update() nie zmienia updated_at -> wersja poświadczeń (i klient w cache) zostaje
+        GoogleCredentials.objects.filter(user_id=user_id).update(
+            token=entry.credentials.token,
+            token_expiry=expiry.replace(tzinfo=pytz.UTC) if expiry else None
+        )
+        entry.token = entry.credentials.token
+
     def get_events(self, user_id: int, day: datetime.date) -> List[FixedEvent]:
         """Pobiera wydarzenia na jeden dzień."""
         service = self._get_service(user_id)
@@ -88,7 +178,9 @@ class GoogleCalendarAdapter(ICalendarProvider):
         day_start = datetime.combine(day, time.min).isoformat() + 'Z'
         day_end = datetime.combine(day, time.max).isoformat() + 'Z'
 
-        return self._fetch_from_google(service, day_start, day_end)
+        events = self._fetch_from_google(service, day_start, day_end)
+        self._save_refreshed_token(user_id)
+        return events
 
     def get_events_range(self, user_id: int, start_date: datetime.date, end_date: datetime.date) -> List[FixedEvent]:
         """Pobiera wydarzenia z zakresu dat."""
@@ -98,4 +190,46 @@ class GoogleCalendarAdapter(ICalendarProvider):
         t_min = datetime.combine(start_date, time.min).isoformat() + 'Z'
         t_max = datetime.combine(end_date, time.max).isoformat() + 'Z'
 
-        return self._fetch_from_google(service, t_min, t_max)
\ No newline at end of file
+        events = self._fetch_from_google(service, t_min, t_max)
+        self._save_refreshed_token(user_id)
+        return events
+
+    def list_changes(self, user_id: int, sync_token: Optional[str] = None) -> EventChanges:
+        """
+        Delta wydarzeń przez sync token Google (events.list z syncToken).
+        Bez tokenu: pełna lista od SYNC_LOOKBACK_DAYS dni wstecz. HTTP 410 -> SyncTokenExpired.
+        """
+        service = self._get_service(user_id)
+        if not service:
+            raise ConnectionError(f"Brak połączenia z Google Calendar dla użytkownika {user_id}")
+
+        params = {'calendarId': 'primary', 'singleEvents': True, 'showDeleted': True}
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            time_min = datetime.now(pytz.UTC) - timedelta(days=SYNC_LOOKBACK_DAYS)
+            params['timeMin'] = time_min.isoformat()
+
+        changes = EventChanges(is_full=not sync_token)
+        page_token = None
+        while True:
+            try:
+                result = service.events().list(pageToken=page_token, **params).execute()
+            except HttpError as e:
+                if e.resp.status == 410:
+                    raise SyncTokenExpired() from e
+                raise
+
+            for event in result.get('items', []):
+                fixed_event = None if event.get('status') == 'cancelled' else self._parse_event(event)
+                if fixed_event:
+                    changes.events.append(fixed_event)
+                elif event.get('id'):
+                    # Usunięte (lub zmienione na całodniowe) - lokalnie ich nie trzymamy
+                    changes.deleted_ids.append(event['id'])
+
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                changes.next_sync_token = result.get('nextSyncToken')
+                self._save_refreshed_token(user_id)
+                return changes
@@ -0,0 +1,55 @@
+# apps/calendar_app/adapters/local_calendar.py
+from typing import List, Optional
+from datetime import datetime, time, timedelta
+import pytz
+from django.conf import settings
+from django.utils import timezone
+from apps.calendar_app.models import CalendarEvent, CalendarSyncState
+from apps.calendar_app.ports.calendar_provider import ICalendarProvider, FixedEvent
+
+
+# Po tylu sekundach bez udanej synchronizacji lokalna kopia jest uznawana za nieaktualną
+DEFAULT_STALE_AFTER = 30 * 60
+
+
+class LocalCalendarProvider(ICalendarProvider):
+    """
+    Czyta wydarzenia z lokalnej tabeli CalendarEvent (uzupełnianej w tle przez sync_calendars).
+    Do zdalnego dostawcy sięga tylko wtedy, gdy kopia jest nieaktualna (lub jeszcze jej nie ma).
+    """
+
+    def __init__(self, remote: Optional[ICalendarProvider] = None, stale_after: Optional[int] = None):
+        self.remote = remote
+        if stale_after is None:
+            stale_after = getattr(settings, 'CALENDAR_SYNC_STALE_AFTER', DEFAULT_STALE_AFTER)
+        self.stale_after = timedelta(seconds=stale_after)
+
+    def is_fresh(self, user_id: int) -> bool:
+        last_synced_at = CalendarSyncState.objects.filter(user_id=user_id).values_list(
+            'last_synced_at', flat=True
+        ).first()
+        return last_synced_at is not None and timezone.now() - last_synced_at <= self.stale_after
+
+    def get_events(self, user_id: int, day: datetime.date) -> List[FixedEvent]:
+        """Pobiera wydarzenia na jeden dzień."""
+        return self.get_events_range(user_id, day, day)
+
+    def get_events_range(self, user_id: int, start_date: datetime.date, end_date: datetime.date) -> List[FixedEvent]:
+        """Pobiera wydarzenia z zakresu dat (lokalnie, a przy nieaktualnej kopii - zdalnie)."""
+        if self.remote is not None and not self.is_fresh(user_id):
+            return self.remote.get_events_range(user_id, start_date, end_date)
+
+        # Zakres czasu (całe dni w UTC) - wydarzenia nachodzące na zakres, jak timeMin/timeMax w API
+        range_start = datetime.combine(start_date, time.min).replace(tzinfo=pytz.UTC)
+        range_end = datetime.combine(end_date, time.max).replace(tzinfo=pytz.UTC)
+
+        rows = CalendarEvent.objects.filter(
+            user_id=user_id,
+            start_time__lte=range_end,
+            end_time__gt=range_start,
+        ).order_by('start_time').values_list('external_id', 'title', 'start_time', 'end_time', 'is_work')
+
+        return [
+            FixedEvent(title=title, start_time=start, end_time=end, is_work=is_work, external_id=external_id)
+            for external_id, title, start, end, is_work in rows
+        ]
@@ -1,8 +1,8 @@
 # apps/calendar_app/adapters/mock_calendar.py
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta, time
 import pytz
-from apps.calendar_app.ports.calendar_provider import ICalendarProvider, FixedEvent
+from apps.calendar_app.ports.calendar_provider import ICalendarProvider, FixedEvent, EventChanges, SyncTokenExpired
 
 
 class MockCalendarProvider(ICalendarProvider):
@@ -16,4 +16,70 @@ class MockCalendarProvider(ICalendarProvider):
 
         return [
             FixedEvent(title="Lunch (Fixed)", start_time=start, end_time=end, is_work=True)
-        ]
\ No newline at end of file
+        ]
+
+class FakeCalendarProvider(ICalendarProvider):
+    """
+    Kalendarz w pamięci z deltami (sync token = "epoka:numer wersji zmian").
+    Pozwala testować synchronizację i LocalCalendarProvider bez Google API.
+    """
+
+    def __init__(self):
+        self._events = {}  # {user_id: {external_id: FixedEvent}}
+        self._changes = []  # [(wersja, user_id, external_id)]
+        self._version = 0
+        self._epoch = 0  # Zmiana epoki unieważnia wszystkie wydane tokeny
+        self.calls = 0  # Liczba odwołań do "zdalnego" kalendarza
+
+    def put(self, user_id: int, event: FixedEvent):
+        self._events.setdefault(user_id, {})[event.external_id] = event
+        self._record(user_id, event.external_id)
+
+    def delete(self, user_id: int, external_id: str):
+        self._events.get(user_id, {}).pop(external_id, None)
+        self._record(user_id, external_id)
+
+    def expire_tokens(self):
+        """Symuluje wygaśnięcie tokenów (HTTP 410 w Google)."""
+        self._epoch += 1
+
+    def _token(self) -> str:
+        return f"{self._epoch}:{self._version}"
+
+    def _record(self, user_id: int, external_id: str):
+        self._version += 1
+        self._changes.append((self._version, user_id, external_id))
+
+    def get_events(self, user_id: int, day: datetime.date) -> List[FixedEvent]:
+        self.calls += 1
+        day_start = datetime.combine(day, time.min).replace(tzinfo=pytz.UTC)
+        day_end = datetime.combine(day, time.max).replace(tzinfo=pytz.UTC)
+        events = [
+            e for e in self._events.get(user_id, {}).values()
+            if e.start_time <= day_end and e.end_time > day_start
+        ]
+        return sorted(events, key=lambda e: e.start_time)
+
+    def list_changes(self, user_id: int, sync_token: Optional[str] = None) -> EventChanges:
+        self.calls += 1
+        if sync_token is None:
+            return EventChanges(
+                events=list(self._events.get(user_id, {}).values()),
+                next_sync_token=self._token(),
+                is_full=True
+            )
+
+        epoch, since = map(int, sync_token.split(':'))
+        if epoch != self._epoch:
+            raise SyncTokenExpired()
+
+        changes = EventChanges(next_sync_token=self._token())
+        user_events = self._events.get(user_id, {})
+        for version, change_user_id, external_id in self._changes:
+            if version <= since or change_user_id != user_id:
+                continue
+            if external_id in user_events:
+                changes.events.append(user_events[external_id])
+            else:
+                changes.deleted_ids.append(external_id)
+        return changes
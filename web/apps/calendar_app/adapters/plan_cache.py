@@ -0,0 +1,58 @@
+# apps/calendar_app/adapters/plan_cache.py
+import threading
+import time
+from typing import Any, Optional
+from django.core.cache import caches
+from apps.core.application.cache_generations import bump_generation
+from apps.calendar_app.ports.plan_cache import IPlanCacheBackend
+
+
+class LocMemPlanCacheBackend(IPlanCacheBackend):
+    """Słownik w pamięci procesu (testy, pojedynczy proces deweloperski)."""
+
+    def __init__(self):
+        self._data = {}  # {key: (expires_at | None, value)}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None):
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        self._data[key] = (expires_at, value)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self.get(key, 0) + 1
+            self.set(key, value)
+            return value
+
+    def clear(self):
+        self._data.clear()
+
+
+class DjangoPlanCacheBackend(IPlanCacheBackend):
+    """Framework cache Django (settings.CACHES) - współdzielony między procesami, np. Redis/Memcached."""
+
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.cache.get(key, default)
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None):
+        self.cache.set(key, value, timeout)
+
+    def incr(self, key: str) -> int:
+        return bump_generation(self.cache, key)
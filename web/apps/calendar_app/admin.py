@@ -1,3 +1,14 @@
 from django.contrib import admin
+from .models import CalendarEvent, CalendarSyncState
 
-# Register your models here.
+
+@admin.register(CalendarEvent)
+class CalendarEventAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'start_time', 'end_time', 'is_work')
+    list_filter = ('user', 'is_work')
+    search_fields = ('title', 'external_id')
+
+
+@admin.register(CalendarSyncState)
+class CalendarSyncStateAdmin(admin.ModelAdmin):
+    list_display = ('user', 'last_synced_at')
@@ -0,0 +1,81 @@
+# apps/calendar_app/application/calendar_sync.py
+from dataclasses import dataclass
+from django.db import transaction
+from django.utils import timezone
+from apps.calendar_app.application.plan_cache import invalidate_user_plans
+from apps.calendar_app.models import CalendarEvent, CalendarSyncState
+from apps.calendar_app.ports.calendar_provider import ICalendarProvider, SyncTokenExpired
+
+
+@dataclass
+class SyncResult:
+    user_id: int
+    upserted: int = 0
+    deleted: int = 0
+    full: bool = False
+
+
+class SyncCalendarUseCase:
+    """
+    Synchronizuje lokalną kopię (CalendarEvent) z zewnętrznym kalendarzem.
+    Korzysta z delt (sync token) - pełna lista tylko za pierwszym razem, po wygaśnięciu tokenu
+    albo na żądanie (full=True).
+    """
+
+    def __init__(self, provider: ICalendarProvider):
+        self.provider = provider
+
+    def execute(self, user_id: int, full: bool = False) -> SyncResult:
+        state, _ = CalendarSyncState.objects.get_or_create(user_id=user_id)
+        sync_token = None if full else state.sync_token
+
+        try:
+            changes = self.provider.list_changes(user_id, sync_token)
+        except SyncTokenExpired:
+            changes = self.provider.list_changes(user_id, None)
+
+        result = SyncResult(user_id=user_id, full=changes.is_full)
+
+        with transaction.atomic():
+            if changes.is_full:
+                # Pełna lista zastępuje lokalną kopię
+                keep_ids = [e.external_id for e in changes.events]
+                result.deleted += CalendarEvent.objects.filter(user_id=user_id).exclude(
+                    external_id__in=keep_ids
+                ).delete()[0]
+
+            if changes.deleted_ids:
+                result.deleted += CalendarEvent.objects.filter(
+                    user_id=user_id, external_id__in=changes.deleted_ids
+                ).delete()[0]
+
+            # Ostatnia wersja wygrywa (to samo wydarzenie może pojawić się w delcie kilka razy)
+            events = list({e.external_id: e for e in changes.events}.values())
+            if events:
+                CalendarEvent.objects.bulk_create(
+                    [
+                        CalendarEvent(
+                            user_id=user_id,
+                            external_id=e.external_id,
+                            title=e.title[:255],
+                            start_time=e.start_time,
+                            end_time=e.end_time,
+                            is_work=e.is_work,
+                        )
+                        for e in events
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['user', 'external_id'],
+                    update_fields=['title', 'start_time', 'end_time', 'is_work', 'updated_at'],
+                )
+                result.upserted = len(events)
+
+            state.sync_token = changes.next_sync_token
+            state.last_synced_at = timezone.now()
+            state.save(update_fields=['sync_token', 'last_synced_at'])
+
+        if result.upserted or result.deleted:
+            # Odświeżony kalendarz -> stare plany użytkownika są nieaktualne
+            invalidate_user_plans(user_id)
+
+        return result
@@ -0,0 +1,165 @@
+# apps/calendar_app/application/plan_cache.py
+import hashlib
+import json
+import logging
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.utils.module_loading import import_string
+from apps.calendar_app.domain.services import ScheduledItem
+from apps.calendar_app.ports.calendar_provider import FixedEvent
+from apps.calendar_app.ports.plan_cache import IPlanCacheBackend
+from apps.tasks.domain.entities import TaskSnapshot
+
+
+DEFAULT_BACKEND = 'apps.calendar_app.adapters.plan_cache.DjangoPlanCacheBackend'
+DEFAULT_TIMEOUT = 15 * 60  # Wynik zależy też od "teraz" (pilność, aging) - nie trzymamy planu w nieskończoność
+STATS_LOG_EVERY = 100  # Co tyle odczytów statystyki trafień idą do logu (INFO)
+
+logger = logging.getLogger(__name__)
+
+
+def profile_fingerprint(profile) -> str:
+    """Ustawienia profilu, od których zależy plan (okna czasowe, bufory, energia, strategia)."""
+    if profile is None:
+        return ''
+    return json.dumps([
+        str(profile.work_start_hour), str(profile.work_end_hour),
+        str(profile.personal_start_hour), str(profile.personal_end_hour),
+        profile.morning_buffer_minutes, profile.between_tasks_buffer_minutes, profile.evening_buffer_minutes,
+        profile.energy_profile, profile.current_strategy,
+    ], sort_keys=True, default=str)
+
+
+def events_fingerprint(events: Iterable[FixedEvent]) -> str:
+    """Odcisk wydarzeń sztywnych - odświeżenie kalendarza ze zmianami daje nowy klucz."""
+    return repr(sorted(
+        (e.start_time.isoformat(), e.end_time.isoformat(), e.title, e.is_work) for e in events
+    ))
+
+
+class PlanCache:
+    """
+    Cache wyliczonych planów ({dzień: [ScheduledItem, ...]}).
+
+    Klucz: (użytkownik, generacja użytkownika, rodzaj planu, dzień startu, strategia,
+    hash profilu + odcisk wydarzeń + filtry). Każda zmiana danych użytkownika podbija
+    jego generację (signals.py) - stare wpisy przestają być osiągalne i same wygasają.
+    Razem z planem można zapamiętać backlog (zadania, które się nie zmieściły) - widok dnia
+    przy trafieniu nie ładuje wtedy puli zadań wcale.
+
+    Liczniki hits / misses są per proces (stats()); co STATS_LOG_EVERY odczytów trafiają do logu.
+    """
+
+    def __init__(self, backend: IPlanCacheBackend, timeout: Optional[int] = DEFAULT_TIMEOUT):
+        self.backend = backend
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f'plan:gen:{user_id}'
+
+    def invalidate_user(self, user_id: int):
+        """Unieważnia wszystkie zapamiętane plany użytkownika."""
+        self.backend.incr(self._generation_key(user_id))
+
+    def make_key(self, user_id: int, day: date, kind: str, profile, fixed_events=(), **filters) -> str:
+        generation = self.backend.get(self._generation_key(user_id), 0)
+        digest = hashlib.sha1('|'.join([
+            profile_fingerprint(profile),
+            events_fingerprint(fixed_events),
+            repr(sorted(filters.items())),
+        ]).encode()).hexdigest()
+        strategy = getattr(profile, 'current_strategy', None)
+        return f'plan:{user_id}:{generation}:{kind}:{day.isoformat()}:{strategy}:{digest}'
+
+    def get(self, key: str) -> Optional[Dict[date, List[ScheduledItem]]]:
+        entry = self.get_with_backlog(key)
+        return entry[0] if entry is not None else None
+
+    def get_with_backlog(self, key: str) -> Optional[Tuple[Dict[date, List[ScheduledItem]], Optional[List[TaskSnapshot]]]]:
+        """(plan, backlog) albo None; backlog jest None, jeśli nie został zapisany."""
+        data = self.backend.get(key)
+        if not isinstance(data, dict) or 'plan' not in data:  # Brak albo wpis w starym formacie
+            self._record(hit=False, key=key)
+            return None
+
+        self._record(hit=True, key=key)
+        plan = {
+            day: [self._deserialize(row) for row in rows]
+            for day, rows in data['plan'].items()
+        }
+        backlog = None
+        if data['backlog'] is not None:
+            backlog = [self._deserialize_task(row) for row in data['backlog']]
+        return plan, backlog
+
+    def set(self, key: str, plan: Dict[date, List[ScheduledItem]], backlog: Optional[List[TaskSnapshot]] = None):
+        data = {
+            'plan': {
+                day: [self._serialize(item) for item in items]
+                for day, items in plan.items()
+            },
+            'backlog': [self._serialize_task(task) for task in backlog] if backlog is not None else None,
+        }
+        self.backend.set(key, data, self.timeout)
+
+    def _record(self, hit: bool, key: str):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        logger.debug("Cache planów: %s %s", 'trafienie' if hit else 'chybienie', key)
+        if (self.hits + self.misses) % STATS_LOG_EVERY == 0:
+            logger.info("Cache planów: %(hits)d trafień, %(misses)d chybień (hit rate %(hit_rate).3f)", self.stats())
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+        }
+
+    # --- Serializacja (proste krotki, bez obiektów domenowych w cache) ---
+
+    @staticmethod
+    def _serialize_task(task) -> tuple:
+        return tuple(getattr(task, name, None) for name in TaskSnapshot.__slots__)
+
+    @staticmethod
+    def _deserialize_task(task_values: tuple) -> TaskSnapshot:
+        return TaskSnapshot(*task_values[:-1], title=task_values[-1])
+
+    def _serialize(self, item: ScheduledItem) -> tuple:
+        return self._serialize_task(item.task), item.start, item.end
+
+    def _deserialize(self, row: tuple) -> ScheduledItem:
+        task_values, start, end = row
+        return ScheduledItem(task=self._deserialize_task(task_values), start=start, end=end)
+
+
+_plan_cache: Optional[PlanCache] = None
+
+
+def get_plan_cache() -> PlanCache:
+    """
+    Współdzielona instancja cache planów, skonfigurowana przez settings.PLAN_CACHE:
+    {'BACKEND': 'ścieżka.do.Klasy', 'OPTIONS': {...}, 'TIMEOUT': sekundy}.
+    """
+    global _plan_cache
+    if _plan_cache is None:
+        config = getattr(settings, 'PLAN_CACHE', {})
+        backend_class = import_string(config.get('BACKEND', DEFAULT_BACKEND))
+        _plan_cache = PlanCache(
+            backend_class(**config.get('OPTIONS', {})),
+            timeout=config.get('TIMEOUT', DEFAULT_TIMEOUT),
+        )
+    return _plan_cache
+
+
+def invalidate_user_plans(user_id: Optional[int]):
+    if user_id:
+        get_plan_cache().invalidate_user(user_id)
@@ -4,3 +4,10 @@ class CalendarAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.calendar_app"
     label = "calendar_app"
+
+    def ready(self):
+        import apps.calendar_app.signals
+        from apps.calendar_app.adapters.google_calendar import calendar_discovery_document
+
+        # Dokument discovery Google Calendar wczytujemy raz, przy starcie procesu
+        calendar_discovery_document()
@@ -0,0 +1,194 @@
+# apps/calendar_app/domain/candidate_pool.py
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from apps.tasks.domain.columns import TaskColumns
+from apps.tasks.domain.entities import TaskEntity
+from apps.tasks.domain.services.task_scorer import TaskScorer, EOD_WINDOW_HOURS
+
+
+# Wynik jest zaokrąglany do 4 miejsc, więc zadania, których część statyczna
+# różni się o mniej niż 1e-4, mogą po zaokrągleniu dać remis (rozstrzygany czasem trwania).
+# Takie "pasmo" kandydatów zawsze oceniamy dokładnie.
+SCORE_BAND = 1e-4 + 1e-6
+
+
+class CandidatePool:
+    """
+    Pula kandydatów Schedulera.
+
+    Część statyczna wyniku (priorytet, czas, złożoność, pilność, aging, milestone, CPM)
+    liczona jest raz przy budowie puli (wektorowo, jednym przebiegiem NumPy).
+    Zadania trzymane są w kopcach pogrupowanych po (projekt, czas trwania, energia,
+    bonus EOD) - w obrębie takiego kubełka składowe
+    dynamiczne (energia, sekwencja, EOD) są identyczne, więc najlepsze zadanie kubełka
+    to po prostu szczyt jego kopca.
+
+    Szczyty kubełków leżą w kopcu nadrzędnym (po części statycznej). pop_best() przegląda
+    je malejąco i kończy, gdy część statyczna + największy możliwy bonus dynamiczny
+    nie sięga już pasma wyboru. Koszt umieszczenia to O((k + m) log n): k - kubełki
+    w zasięgu bonusu dynamicznego od najlepszego (plus pominięte, bo za długie na okno),
+    m - zadania w paśmie. Przy kilku poziomach energii i jednym projekcie w sekwencji
+    k jest małe; w najgorszym razie (wszystkie kubełki w zasięgu) wraca do O(liczba kubełków).
+
+    Wybór daje ten sam wynik co pełne przeliczenie i sortowanie wszystkich kandydatów:
+    max po (score, -czas trwania), a przy pełnym remisie wygrywa wcześniejsze zadanie z listy.
+    """
+
+    def __init__(self, tasks: List[TaskEntity], now: datetime, scorer: TaskScorer = None):
+        self.scorer = scorer or TaskScorer()
+        self.now = now
+        # {(project_id, duration, energy_required, eod): [[-static_key, index, task, components], ...]}
+        self._buckets: Dict[tuple, list] = {}
+        # Szczyty kubełków: [-static_key, licznik, klucz kubełka]. Wpisy po zmianie szczytu
+        # zostają w kopcu i są odrzucane przy odczycie (_valid_head).
+        self._heads: list = []
+        self._head_counter = 0
+        # Górne ograniczenia składowych dynamicznych (tylko rosną - ograniczenie pozostaje poprawne)
+        self._max_energy = 0
+        self._max_eod = 0.0
+        self._size = 0
+        self._next_index = 0
+
+        self.add_many([t for t in tasks if t.is_active()])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add_many(self, tasks: List[TaskEntity]):
+        """
+        Dodaje zadania na koniec kolejności (przegrywają remisy z wcześniejszymi).
+        Klucze statyczne liczone są wektorowo (TaskScorer.static_components_batch),
+        a dokładne składowe skalarne dopiero dla zadań, które trafią do pasma wyboru.
+        """
+        if not tasks:
+            return
+
+        columns = TaskColumns.from_tasks(tasks)
+        components = self.scorer.static_components_batch(columns, self.now)
+        static_keys = self.scorer.static_total(components)
+
+        for i, task in enumerate(tasks):
+            key = (task.project_id, task.duration_expected, task.energy_required, float(components.eod[i]))
+            entry = [-float(static_keys[i]), self._next_index, task, None]
+            heap = self._buckets.setdefault(key, [])
+            heapq.heappush(heap, entry)
+            if heap[0] is entry:
+                self._push_head(key)
+            self._max_energy = max(self._max_energy, task.energy_required)
+            self._max_eod = max(self._max_eod, key[3])
+            self._next_index += 1
+
+        self._size += len(tasks)
+
+    def add(self, task: TaskEntity):
+        self.add_many([task])
+
+    def _push_head(self, key: tuple):
+        heapq.heappush(self._heads, [self._buckets[key][0][0], self._head_counter, key])
+        self._head_counter += 1
+
+    def _valid_head(self, head: list) -> bool:
+        heap = self._buckets.get(head[2])
+        return bool(heap) and heap[0][0] == head[0]
+
+    def _max_dynamic(self, slot_energy_level: int, last_project_id: Optional[int],
+                     sequence_count: int, eod_active: bool) -> float:
+        """Największy bonus dynamiczny, jaki może dostać dowolny kubełek w tym slocie."""
+        weights = self.scorer.weights
+        energy = weights['bonus_energy_match'] * (min(slot_energy_level, self._max_energy) / 3.0)
+        sequence = weights.get('bonus_sequence', 0.5) * (0.8 ** sequence_count) if last_project_id else 0.0
+        eod = self._max_eod if eod_active else 0.0
+        return max(0.0, energy) + max(0.0, sequence) + max(0.0, eod)
+
+    def pop_best(
+            self,
+            window_remaining_minutes: float,
+            slot_energy_level: int = 1,
+            last_project_id: Optional[int] = None,
+            sequence_count: int = 0,
+            hours_to_end_of_day: Optional[float] = None
+        ) -> Optional[TaskEntity]:
+        """Zdejmuje z puli najlepsze zadanie mieszczące się w oknie (lub None)."""
+        eod_active = hours_to_end_of_day is not None and hours_to_end_of_day < EOD_WINDOW_HOURS
+
+        max_dynamic = self._max_dynamic(slot_energy_level, last_project_id, sequence_count, eod_active)
+
+        # 1. Górne ograniczenie kubełków mieszczących się w oknie - szczyty malejąco po części
+        #    statycznej, dopóki statyczna + max_dynamic może jeszcze sięgnąć pasma wyboru
+        bounds: List[Tuple[float, tuple, float, float, float]] = []
+        scanned = set()
+        best_bound = None
+        while self._heads:
+            static_key = -self._heads[0][0]
+            if best_bound is not None and static_key + max_dynamic < best_bound - SCORE_BAND:
+                break
+
+            head = heapq.heappop(self._heads)
+            key = head[2]
+            if not self._valid_head(head) or key in scanned:
+                continue  # Nieaktualny wpis albo duplikat szczytu
+            scanned.add(key)
+
+            project_id, duration, energy, eod = key
+            if duration > window_remaining_minutes:
+                continue
+
+            top_task = self._buckets[key][0][2]
+            energy_bonus = self.scorer.energy_bonus(top_task, slot_energy_level)
+            seq_bonus = self.scorer.sequence_bonus(top_task, last_project_id, sequence_count)
+            eod_bonus = eod if eod_active else 0.0
+
+            dynamic = energy_bonus + seq_bonus + eod_bonus
+            bound = static_key + dynamic
+            bounds.append((bound, key, energy_bonus, seq_bonus, eod_bonus))
+            if best_bound is None or bound > best_bound:
+                best_bound = bound
+
+        if not bounds:
+            for key in scanned:
+                self._push_head(key)
+            return None
+
+        threshold = best_bound - SCORE_BAND
+
+        # 2. Dokładna ocena pasma kandydatów bliskich maksimum
+        best_rank = None
+        best_key = None
+        best_entry = None
+        popped = []
+
+        for bound, key, energy_bonus, seq_bonus, eod_bonus in bounds:
+            if bound < threshold:
+                continue
+
+            heap = self._buckets[key]
+            dynamic = energy_bonus + seq_bonus + eod_bonus
+            while heap and -heap[0][0] + dynamic >= threshold:
+                entry = heapq.heappop(heap)
+                popped.append((key, entry))
+
+                # Dokładne składowe (jak w calculate_score) - liczone leniwie i zapamiętywane
+                if entry[3] is None:
+                    entry[3] = self.scorer.static_components(entry[2], self.now)
+
+                score = self.scorer.combine(entry[3], energy_bonus, seq_bonus, eod_bonus)
+                rank = (score, -key[1], -entry[1])
+                if best_rank is None or rank > best_rank:
+                    best_rank, best_key, best_entry = rank, key, entry
+
+        # 3. Oddaj niewybranych z powrotem do kopców
+        for key, entry in popped:
+            if entry is not best_entry:
+                heapq.heappush(self._buckets[key], entry)
+
+        if not self._buckets[best_key]:
+            del self._buckets[best_key]
+        self._size -= 1
+
+        # 4. Szczyty przejrzanych kubełków wracają do kopca nadrzędnego (po zmianach)
+        for key in scanned:
+            if key in self._buckets:
+                self._push_head(key)
+
+        return best_entry[2]
@@ -1,10 +1,12 @@
 # apps/calendar_app/domain/services.py
+from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone, time
-from typing import List
+from typing import Dict, List
 from dataclasses import dataclass
 from apps.calendar_app.ports.calendar_provider import FixedEvent
 from apps.tasks.domain.entities import TaskEntity, TaskStatus
 from apps.tasks.domain.services import TaskScorer
+from apps.calendar_app.domain.candidate_pool import CandidatePool
 
 
 @dataclass
@@ -92,13 +94,25 @@ class SchedulerService:
         Uwzględnia: Priorytet, Energię, Ciągłość (Sequence) i Presję Końca Dnia (EOD).
         """
 
-        scorer = TaskScorer()
-        schedule = []
+        # Pula kandydatów (statyczna część wyniku liczona raz na przebieg)
+        pool = CandidatePool(tasks, now, TaskScorer())
+        return self.fill_windows(pool, windows, now, user_profile)
 
-        # Kopia listy zadań
-        remaining_tasks = [t for t in tasks if t.is_active()]
+    def fill_windows(
+        self,
+        pool: CandidatePool,
+        windows: List[FreeWindow],
+        now: datetime,
+        user_profile
+    ) -> List[ScheduledItem]:
+        """
+        Rozdziela zadania z puli na okna jednej osi czasu (jeden dzień, jedna domena).
+        Zaplanowane zadania są z puli zdejmowane, więc tę samą pulę można
+        przekazywać dalej - do kolejnych dni planu.
+        """
+        schedule = []
 
-        # Stan Schedulera
+        # Stan Schedulera (sekwencja liczona osobno dla każdej osi czasu)
         last_project_id = None
         sequence_count = 0
 
@@ -111,46 +125,25 @@ class SchedulerService:
             current_time = window.start
 
             # Poziom Energii Okna
-            current_hour_str = current_time.strftime("%H")
-            slot_energy = 1
-            if user_profile and user_profile.energy_profile:
-                val = user_profile.energy_profile.get(current_hour_str)
-                if val is None:
-                    val = user_profile.energy_profile.get(int(current_hour_str))
-                if val is not None:
-                    slot_energy = int(val)
+            slot_energy = self._slot_energy(user_profile, current_time)
 
             # Pętla Alokacji w Oknie
-            while remaining_tasks and (window.end - current_time).total_seconds() > 0:
+            while pool and (window.end - current_time).total_seconds() > 0:
 
                 # Oblicz czas do końca dnia (EOD Factor)
                 time_to_end = absolute_end_time - current_time
                 hours_to_end = time_to_end.total_seconds() / 3600
 
-                # 1. Scoring
-                scored_candidates = []
-                for task in remaining_tasks:
-                    score = scorer.calculate_score(
-                        task,
-                        now,
-                        slot_energy_level=slot_energy,
-                        last_project_id=last_project_id,
-                        sequence_count=sequence_count,
-                        hours_to_end_of_day=hours_to_end  # <-- EOD Factor
-                    )
-                    scored_candidates.append((task, score))
-
-                # Sortuj malejąco po: 1. Score, 2. Odwróconym czasie (krótsze mają wyższy priorytet przy remisie)
-                scored_candidates.sort(key=lambda x: (x[1], -x[0].duration_expected), reverse=True)
-
-                # 2. Wybór (Bin Packing)
-                best_candidate = None
+                # Wybór (Bin Packing): najlepszy kandydat, który mieści się w oknie
                 window_remaining_minutes = (window.end - current_time).total_seconds() / 60
 
-                for task, score in scored_candidates:
-                    if task.duration_expected <= window_remaining_minutes:
-                        best_candidate = task
-                        break
+                best_candidate = pool.pop_best(
+                    window_remaining_minutes,
+                    slot_energy_level=slot_energy,
+                    last_project_id=last_project_id,
+                    sequence_count=sequence_count,
+                    hours_to_end_of_day=hours_to_end  # <-- EOD Factor
+                )
 
                 if best_candidate:
                     # Planujemy
@@ -163,7 +156,6 @@ class SchedulerService:
                     ))
 
                     current_time = end_time
-                    remaining_tasks.remove(best_candidate)
 
                     # Aktualizacja Sequence
                     if best_candidate.project_id and best_candidate.project_id == last_project_id:
@@ -178,69 +170,125 @@ class SchedulerService:
 
         return schedule
 
-    def get_weekly_plan(self, user, start_date: date):
-        """Generuje plan na 7 dni od start_date."""
+    def _slot_energy(self, user_profile, slot_start: datetime) -> int:
+        """Poziom energii (1-3) z profilu użytkownika dla godziny startu okna."""
+        current_hour_str = slot_start.strftime("%H")
+        slot_energy = 1
+        if user_profile and user_profile.energy_profile:
+            val = user_profile.energy_profile.get(current_hour_str)
+            if val is None:
+                val = user_profile.energy_profile.get(int(current_hour_str))
+            if val is not None:
+                slot_energy = int(val)
+        return slot_energy
+
+    def get_weekly_plan(self, user, start_date: date, task_repo=None, context_id=None, area_id=None, plan_cache=None):
+        """Generuje plan na 7 dni od start_date (tylko zadania użytkownika)."""
+        return self.get_plan(
+            user, start_date, horizon_days=7, task_repo=task_repo, context_id=context_id, area_id=area_id,
+            plan_cache=plan_cache
+        )
+
+    def get_plan(
+        self,
+        user,
+        start_date: date,
+        horizon_days: int = 7,
+        task_repo=None,
+        context_id=None,
+        area_id=None,
+        plan_cache=None
+    ):
+        """
+        Generuje plan na horizon_days dni od start_date w jednym przebiegu.
+
+        Wynik statyczny zadań liczony jest raz dla całego horyzontu (jedna pula na domenę
+        Work/Personal, przenoszona między dniami - zaplanowane zadania po prostu z niej znikają),
+        a wydarzenia sztywne są wstępnie pogrupowane po dniach.
+        task_repo można przekazać z widoku, żeby pula zadań była ładowana raz na request.
+        plan_cache (PlanCache) pozwala pominąć planowanie, jeśli nic się nie zmieniło.
+        Dni dostają też 'recurring' - wirtualne wystąpienia zadań cyklicznych (bez wierszy Task),
+        liczone do obciążenia dnia.
+        """
         from apps.calendar_app.adapters.google_calendar import GoogleCalendarAdapter
+        from apps.calendar_app.adapters.local_calendar import LocalCalendarProvider
         from apps.tasks.adapters.orm_repositories import DjangoTaskRepository
 
         week_plan = []
-        days = [start_date + timedelta(days=i) for i in range(7)]
+        days = [start_date + timedelta(days=i) for i in range(horizon_days)]
+        if not days:
+            return week_plan
         end_date = days[-1]
 
-        # 1. Pobierz zadania (pula do rozdysponowania)
-        task_repo = DjangoTaskRepository()
-        all_tasks = task_repo.get_active_tasks()
-        # Ważne: Kopiujemy listę, bo scheduler będzie ją "zjadał" (usuwał zaplanowane)
-        # Ale tutaj chcemy symulację. Jeśli zadanie zaplanujemy w Poniedziałek,
-        # to we Wtorek już nie powinno być dostępne.
-        # Nasz `schedule_tasks` nie modyfikuje obiektów w bazie, więc musimy
-        # sami zarządzać pulą `remaining_tasks` między dniami.
-
-        pool_work = [t for t in all_tasks if not t.is_private]
-        pool_personal = [t for t in all_tasks if t.is_private]
+        # Profil (Godziny) - dla uproszczenia te same dla każdego dnia,
+        # ale w weekendy mogłyby być inne (TODO).
+        try:
+            profile = user.profile
+        except:
+            return week_plan
 
-        # 2. Pobierz Fixed Events (Batch)
-        gcal = GoogleCalendarAdapter()
+        # 1. Pobierz Fixed Events (Batch) i pogrupuj po dniach
+        gcal = LocalCalendarProvider(remote=GoogleCalendarAdapter())
         all_fixed = gcal.get_events_range(user.id, start_date, end_date)
-
-        # 3. Pętla po dniach
+        fixed_by_day = defaultdict(list)
+        for event in all_fixed:
+            fixed_by_day[event.start_time.date()].append(event)
+
+        # 2. Plan zadań (z cache albo liczony od zera)
+        cache_key = None
+        schedule_by_day = None
+        if plan_cache is not None:
+            cache_key = plan_cache.make_key(
+                user.id, start_date, f'horizon{horizon_days}', profile, all_fixed,
+                context_id=context_id, area_id=area_id
+            )
+            schedule_by_day = plan_cache.get(cache_key)
+
+        if schedule_by_day is None:
+            task_repo = task_repo or DjangoTaskRepository()
+            all_tasks = task_repo.get_active_snapshots(  # Lekkie snapshoty (tytuły na końcu)
+                user_id=user.id, context_id=context_id, area_id=area_id
+            )
+            schedule_by_day = self.schedule_days(all_tasks, days, fixed_by_day, profile)
+
+            # Tytuły tylko dla zadań, które faktycznie trafiły do planu
+            task_repo.resolve_titles([item.task for items in schedule_by_day.values() for item in items])
+
+            if plan_cache is not None:
+                plan_cache.set(cache_key, schedule_by_day)
+
+        # 3. Przyszłe wystąpienia zadań cyklicznych - projekcja szablonów, poza cache planu
+        # (szablony nie mają kontekstu - przy filtrze ?context= ich nie pokazujemy)
+        recurring_by_day = {}
+        if context_id is None:
+            from apps.tasks.domain.services import RecurrenceService
+            recurring_by_day = RecurrenceService().project_occurrences(user.id, start_date, end_date, area_id=area_id)
+
+        # Pojemność dnia (Capacity) - stała dla całego horyzontu
+        # Uproszczenie: Czas między Work Start a Personal End (cały aktywny dzień)
+        # Lub tylko Work Window, jeśli interesuje nas praca.
+        # Policzmy cały dostępny czas (Work + Personal)
+        work_cap = (profile.work_end_hour.hour * 60 + profile.work_end_hour.minute) - \
+                   (profile.work_start_hour.hour * 60 + profile.work_start_hour.minute)
+
+        pers_cap = (profile.personal_end_hour.hour * 60 + profile.personal_end_hour.minute) - \
+                   (profile.personal_start_hour.hour * 60 + profile.personal_start_hour.minute)
+
+        total_capacity = max(1, work_cap + pers_cap)  # Unikaj dzielenia przez 0
+
+        # 4. Pętla po dniach
         for day in days:
-            # Filtruj fixed events dla tego dnia
-            day_fixed = [e for e in all_fixed if e.start_time.date() == day]
-
-            # Profil (Godziny) - dla uproszczenia te same co w user profile,
-            # ale w weekendy mogłyby być inne (TODO).
-            try:
-                profile = user.profile
-            except:
-                continue
-
-            now = datetime.now(timezone.utc)  # Używane tylko do oceny "czy już po czasie"
+            day_fixed = fixed_by_day.get(day, [])
+            day_sched = schedule_by_day.get(day, [])
+            day_recurring = recurring_by_day.get(day, [])
 
-            # --- Work Timeline ---
-            work_wins = self.calculate_free_windows(day, day_fixed, profile.work_start_hour, profile.work_end_hour)
-            work_sched = self.schedule_tasks(pool_work, work_wins, now, profile)
-
-            # Usuń zaplanowane z puli (żeby nie planować ich znowu jutro)
-            scheduled_ids = {item.task.id for item in work_sched}
-            pool_work = [t for t in pool_work if t.id not in scheduled_ids]
-
-            # --- Personal Timeline ---
-            pers_wins = self.calculate_free_windows(day, day_fixed, profile.personal_start_hour,
-                                                    profile.personal_end_hour)
-            pers_sched = self.schedule_tasks(pool_personal, pers_wins, now, profile)
-
-            scheduled_ids_p = {item.task.id for item in pers_sched}
-            pool_personal = [t for t in pool_personal if t.id not in scheduled_ids_p]
-
-
-            # --- NOWE: Obliczanie obciążenia (Load Calculation) ---
+            # --- Obliczanie obciążenia (Load Calculation) ---
 
             # 1. Całkowity czas zajęty (minuty)
             total_minutes = 0
 
             # Zadania zaplanowane
-            for item in work_sched + pers_sched:
+            for item in day_sched:
                 total_minutes += item.task.duration_expected
 
             # Spotkania sztywne
@@ -248,22 +296,14 @@ class SchedulerService:
                 dur = (event.end_time - event.start_time).total_seconds() / 60
                 total_minutes += int(dur)
 
-            # 2. Pojemność dnia (Capacity)
-            # Uproszczenie: Czas między Work Start a Personal End (cały aktywny dzień)
-            # Lub tylko Work Window, jeśli interesuje nas praca.
-            # Policzmy cały dostępny czas (Work + Personal)
-            work_cap = (profile.work_end_hour.hour * 60 + profile.work_end_hour.minute) - \
-                       (profile.work_start_hour.hour * 60 + profile.work_start_hour.minute)
-
-            pers_cap = (profile.personal_end_hour.hour * 60 + profile.personal_end_hour.minute) - \
-                       (profile.personal_start_hour.hour * 60 + profile.personal_start_hour.minute)
-
-            total_capacity = max(1, work_cap + pers_cap)  # Unikaj dzielenia przez 0
+            # Zadania cykliczne, których instancje jeszcze nie powstały
+            for occurrence in day_recurring:
+                total_minutes += occurrence.duration_expected
 
             load_percent = int((total_minutes / total_capacity) * 100)
 
-            # 3. Suma Energii (Heatmap)
-            total_energy = sum(item.task.energy_required for item in work_sched + pers_sched)
+            # 2. Suma Energii (Heatmap)
+            total_energy = sum(item.task.energy_required for item in day_sched)
             # Heurystyka: Jeśli suma energii > 15 (np. 5 zadań trudnych), to dzień ciężki
             intensity = 'low'
             if total_energy > 15:
@@ -276,7 +316,8 @@ class SchedulerService:
             week_plan.append({
                 'date': day,
                 'day_name': day.strftime("%A"),
-                'items': work_sched + pers_sched + day_fixed,
+                'items': day_sched + day_fixed,
+                'recurring': day_recurring,
                 # Nowe dane do widoku:
                 'load_percent': load_percent,
                 'total_minutes': total_minutes,
@@ -284,4 +325,37 @@ class SchedulerService:
                 'intensity': intensity
             })
 
-        return week_plan
\ No newline at end of file
+        return week_plan
+
+    def schedule_days(
+        self,
+        tasks,
+        days: List[date],
+        fixed_by_day: Dict[date, List[FixedEvent]],
+        profile,
+        now: datetime = None
+    ) -> Dict[date, List[ScheduledItem]]:
+        """Rozdziela pulę zadań na kolejne dni (Work + Personal), jedna pula na domenę."""
+        now = now or datetime.now(timezone.utc)  # Używane tylko do oceny "czy już po czasie"
+
+        # Jedna pula na domenę na cały horyzont: jeśli zadanie zaplanujemy w Poniedziałek,
+        # to pop_best zdejmie je z puli i we Wtorek nie będzie już dostępne.
+        pool_work = CandidatePool([t for t in tasks if not t.is_private], now, TaskScorer())
+        pool_personal = CandidatePool([t for t in tasks if t.is_private], now, TaskScorer())
+
+        schedule_by_day = {}
+        for day in days:
+            day_fixed = fixed_by_day.get(day, [])
+
+            # --- Work Timeline ---
+            work_wins = self.calculate_free_windows(day, day_fixed, profile.work_start_hour, profile.work_end_hour)
+            work_sched = self.fill_windows(pool_work, work_wins, now, profile)
+
+            # --- Personal Timeline ---
+            pers_wins = self.calculate_free_windows(day, day_fixed, profile.personal_start_hour,
+                                                    profile.personal_end_hour)
+            pers_sched = self.fill_windows(pool_personal, pers_wins, now, profile)
+
+            schedule_by_day[day] = work_sched + pers_sched
+
+        return schedule_by_day
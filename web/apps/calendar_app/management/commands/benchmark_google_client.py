@@ -0,0 +1,75 @@
+import json
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+from apps.calendar_app.adapters.google_calendar import GoogleCalendarAdapter, _client_cache
+from apps.core.models import GoogleCredentials
+
+
+def legacy_get_service(user_id: int):
+    """Poprzednia ścieżka: poświadczenia z bazy i build() (parsowanie discovery) przy każdym wywołaniu."""
+    creds_db = GoogleCredentials.objects.get(user_id=user_id)
+    creds = Credentials(
+        token=creds_db.token,
+        refresh_token=creds_db.refresh_token,
+        token_uri=creds_db.token_uri,
+        client_id=creds_db.client_id,
+        client_secret=creds_db.client_secret,
+        scopes=creds_db.scopes.split()
+    )
+    return build('calendar', 'v3', credentials=creds)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark klienta Google Calendar: build() przy każdym wywołaniu vs klient z cache (_get_service)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--events', type=int, default=20, help='Liczba wydarzeń w odpowiedzi events.list')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        body = json.dumps({'items': [
+            {
+                'id': f'ev{i}', 'summary': f'Spotkanie {i}',
+                'start': {'dateTime': f'2025-03-10T{8 + i % 10:02d}:00:00+00:00'},
+                'end': {'dateTime': f'2025-03-10T{8 + i % 10:02d}:30:00+00:00'},
+            }
+            for i in range(options['events'])
+        ]})
+
+        def request(service):
+            # Atrapa transportu HTTP: bez sieci, mierzymy tylko koszt po stronie klienta
+            http = HttpMockSequence([({'status': '200'}, body)])
+            service.events().list(calendarId='primary', singleEvents=True).execute(http=http)
+
+        # Dane syntetyczne tylko na czas pomiaru - transakcja jest wycofywana
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(username=f'benchmark-google-client-{time.time_ns()}')
+            GoogleCredentials.objects.create(
+                user=user, token='token', refresh_token='refresh', token_uri='https://oauth2.googleapis.com/token',
+                client_id='client', client_secret='secret', scopes='https://www.googleapis.com/auth/calendar.readonly'
+            )
+            adapter = GoogleCalendarAdapter()
+            _client_cache().pop(user.id, None)
+            adapter._get_service(user.id)  # Rozgrzanie: discovery + pierwszy klient
+
+            cases = [
+                ('build() przy każdym wywołaniu', lambda: legacy_get_service(user.id)),
+                ('_get_service z cache', lambda: adapter._get_service(user.id)),
+                ('build() + events.list', lambda: request(legacy_get_service(user.id))),
+                ('_get_service z cache + events.list', lambda: request(adapter._get_service(user.id))),
+            ]
+            for label, call in cases:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    call()
+                per_call_ms = (time.perf_counter() - start) * 1000 / iterations
+                self.stdout.write(f"{label:<36}: {per_call_ms:7.2f} ms / wywołanie ({iterations} powtórzeń)")
+
+            _client_cache().pop(user.id, None)
+            transaction.set_rollback(True)
@@ -0,0 +1,42 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.calendar_app.adapters.google_calendar import GoogleCalendarAdapter
+from apps.calendar_app.application.calendar_sync import SyncCalendarUseCase
+from apps.core.models import GoogleCredentials
+
+
+class Command(BaseCommand):
+    help = 'Synchronizuje lokalną kopię kalendarzy Google (delty przez sync token)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Tylko dla użytkownika o tym ID')
+        parser.add_argument('--full', action='store_true', help='Pełna synchronizacja (ignoruje sync token)')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Działaj w pętli co N sekund (zadanie w tle); 0 = jeden przebieg (np. z crona)'
+        )
+
+    def handle(self, *args, **options):
+        use_case = SyncCalendarUseCase(GoogleCalendarAdapter())
+
+        while True:
+            user_ids = GoogleCredentials.objects.values_list('user_id', flat=True)
+            if options['user']:
+                user_ids = user_ids.filter(user_id=options['user'])
+
+            for user_id in user_ids:
+                try:
+                    result = use_case.execute(user_id, full=options['full'])
+                except Exception as e:
+                    # Jeden użytkownik (np. odwołany token) nie zatrzymuje reszty
+                    self.stderr.write(f"- user {user_id}: błąd synchronizacji: {e}")
+                    continue
+
+                mode = 'pełna' if result.full else 'delta'
+                self.stdout.write(f"- user {user_id} ({mode}): {result.upserted} zmienionych, {result.deleted} usuniętych")
+
+            self.stdout.write(self.style.SUCCESS('Synchronizacja kalendarzy zakończona.'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
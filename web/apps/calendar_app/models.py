@@ -1,3 +1,36 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class CalendarEvent(models.Model):
+    """Lokalna kopia wydarzenia z zewnętrznego kalendarza (uzupełniana przez sync_calendars)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='calendar_events')
+    external_id = models.CharField(max_length=255)
+    title = models.CharField(max_length=255)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    is_work = models.BooleanField(default=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['start_time']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'external_id'], name='unique_calendar_event_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'start_time'], name='calendar_event_user_start'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.start_time:%Y-%m-%d %H:%M})"
+
+
+class CalendarSyncState(models.Model):
+    """Stan synchronizacji kalendarza użytkownika (token delty i czas ostatniego sukcesu)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_sync')
+    sync_token = models.TextField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Calendar sync for {self.user.username}"
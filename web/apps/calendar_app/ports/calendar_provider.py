@@ -1,8 +1,13 @@
 # apps/calendar_app/ports/calendar_provider.py
+import hashlib
 from abc import ABC, abstractmethod
-from typing import List
-from dataclasses import dataclass
-from datetime import datetime
+from typing import List, Optional
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+
+# Okno pełnej listy w domyślnym list_changes() (dostawcy bez delt)
+FULL_SYNC_PAST_DAYS = 30
+FULL_SYNC_AHEAD_DAYS = 365
 
 @dataclass
 class FixedEvent:
@@ -10,9 +15,60 @@ class FixedEvent:
     start_time: datetime
     end_time: datetime
     is_work: bool = True # Czy to spotkanie służbowe?
+    external_id: Optional[str] = None  # ID w zewnętrznym kalendarzu (do synchronizacji)
+
+
+@dataclass
+class EventChanges:
+    """Wynik synchronizacji: zmienione/nowe wydarzenia, usunięte ID i token do następnej delty."""
+    events: List[FixedEvent] = field(default_factory=list)
+    deleted_ids: List[str] = field(default_factory=list)
+    next_sync_token: Optional[str] = None
+    is_full: bool = False  # Pełna synchronizacja - lokalna kopia powinna zostać zastąpiona
+
+
+class SyncTokenExpired(Exception):
+    """Token synchronizacji wygasł (np. HTTP 410 w Google) - potrzebna pełna synchronizacja."""
+    pass
+
 
 class ICalendarProvider(ABC):
     @abstractmethod
     def get_events(self, user_id: int, day: datetime.date) -> List[FixedEvent]:
         """Pobiera sztywne spotkania na dany dzień."""
-        pass
\ No newline at end of file
+        pass
+
+    def get_events_range(self, user_id: int, start_date: datetime.date, end_date: datetime.date) -> List[FixedEvent]:
+        """Pobiera wydarzenia z zakresu dat (domyślnie dzień po dniu)."""
+        events = []
+        day = start_date
+        while day <= end_date:
+            events.extend(self.get_events(user_id, day))
+            day += timedelta(days=1)
+        return events
+
+    def list_changes(self, user_id: int, sync_token: Optional[str] = None) -> EventChanges:
+        """
+        Zmiany od ostatniej synchronizacji (sync_token=None -> pełna lista).
+        Rzuca SyncTokenExpired, gdy token jest już nieważny.
+
+        Domyślnie (dostawca bez delt): zawsze pełna lista z okna
+        [dziś - FULL_SYNC_PAST_DAYS, dziś + FULL_SYNC_AHEAD_DAYS] przez get_events_range(),
+        bez tokenu. SyncCalendarUseCase zastępuje nią lokalną kopię, więc różnica
+        (nowe, zmienione, usunięte) wychodzi z porównania z poprzednią listą.
+        Wydarzenia bez external_id dostają stały identyfikator z (początek, koniec, tytuł).
+        """
+        today = date.today()
+        events = self.get_events_range(
+            user_id, today - timedelta(days=FULL_SYNC_PAST_DAYS), today + timedelta(days=FULL_SYNC_AHEAD_DAYS)
+        )
+        return EventChanges(
+            events=[e if e.external_id else replace(e, external_id=self._derived_id(e)) for e in events],
+            next_sync_token=None,
+            is_full=True,
+        )
+
+    @staticmethod
+    def _derived_id(event: FixedEvent) -> str:
+        key = f"{event.start_time.isoformat()}|{event.end_time.isoformat()}|{event.title}"
+        return 'derived-' + hashlib.sha1(key.encode()).hexdigest()
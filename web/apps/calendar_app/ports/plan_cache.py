@@ -0,0 +1,21 @@
+# apps/calendar_app/ports/plan_cache.py
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class IPlanCacheBackend(ABC):
+    """Magazyn klucz-wartość dla zapamiętanych planów (pamięć lokalna, cache Django...)."""
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, timeout: Optional[int] = None):
+        """Zapisuje wartość (timeout w sekundach, None = bez wygasania)."""
+        pass
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Zwiększa licznik o 1 (brak klucza = 0) i zwraca nową wartość."""
+        pass
@@ -0,0 +1,40 @@
+# apps/calendar_app/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from apps.areas.models import Area
+from apps.calendar_app.application.plan_cache import invalidate_user_plans
+from apps.core.models import UserProfile
+from apps.goals.models import Goal
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+
+# Zmiana czegokolwiek, co wpływa na plan użytkownika -> nowa generacja jego planów.
+# (Zbiorcze .update() poza sygnałami wołają invalidate_user_plans bezpośrednio.)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_plans_on_task_change(sender, instance, **kwargs):
+    invalidate_user_plans(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Task.blocked_by.through)
+def invalidate_plans_on_dependencies_change(sender, instance, action, **kwargs):
+    if action in ["post_add", "post_remove", "post_clear"]:
+        invalidate_user_plans(instance.user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_plans_on_profile_change(sender, instance, **kwargs):
+    invalidate_user_plans(instance.user_id)
+
+
+# Terminy celów/projektów i kolory obszarów są częścią snapshotu zadania
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+def invalidate_plans_on_related_change(sender, instance, **kwargs):
+    invalidate_user_plans(instance.user_id)
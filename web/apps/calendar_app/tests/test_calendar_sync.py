@@ -0,0 +1,220 @@
+from datetime import date, datetime, time, timedelta
+from typing import List
+
+import pytz
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.calendar_app.adapters.local_calendar import LocalCalendarProvider
+from apps.calendar_app.adapters.mock_calendar import FakeCalendarProvider, MockCalendarProvider
+from apps.calendar_app.application.calendar_sync import SyncCalendarUseCase
+from apps.calendar_app.models import CalendarEvent, CalendarSyncState
+from apps.calendar_app.ports.calendar_provider import (
+    FULL_SYNC_AHEAD_DAYS, FULL_SYNC_PAST_DAYS, FixedEvent, ICalendarProvider
+)
+
+
+DAY = date(2025, 3, 10)
+
+
+def event(external_id: str, hour: int, title: str = None, day: date = DAY) -> FixedEvent:
+    start = datetime.combine(day, time(hour, 0)).replace(tzinfo=pytz.UTC)
+    return FixedEvent(
+        title=title or external_id, start_time=start, end_time=start + timedelta(hours=1), external_id=external_id
+    )
+
+
+class ListOnlyProvider(ICalendarProvider):
+    """Dostawca bez delt i bez external_id - tylko get_events()."""
+
+    def __init__(self):
+        self.events: List[FixedEvent] = []
+
+    def add(self, title: str, day: date, hour: int):
+        start = datetime.combine(day, time(hour, 0)).replace(tzinfo=pytz.UTC)
+        self.events.append(FixedEvent(title=title, start_time=start, end_time=start + timedelta(hours=1)))
+
+    def get_events(self, user_id: int, day: date) -> List[FixedEvent]:
+        return [e for e in self.events if e.start_time.date() == day]
+
+
+class DefaultListChangesTest(TestCase):
+    """Domyślne list_changes(): pełna lista z okna zamiast synchronizacji przyrostowej."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='sync')
+
+    def test_full_listing_with_derived_ids(self):
+        provider = ListOnlyProvider()
+        today = date.today()
+        provider.add('Spotkanie', today, 10)
+        provider.add('Przegląd', today + timedelta(days=3), 14)
+        provider.add('Za daleko', today + timedelta(days=FULL_SYNC_AHEAD_DAYS + 1), 9)
+        provider.add('Dawno temu', today - timedelta(days=FULL_SYNC_PAST_DAYS + 1), 9)
+
+        changes = provider.list_changes(self.user.id, sync_token='ignorowany')
+
+        self.assertTrue(changes.is_full)
+        self.assertIsNone(changes.next_sync_token)
+        self.assertEqual([e.title for e in changes.events], ['Spotkanie', 'Przegląd'])
+        self.assertTrue(all(e.external_id.startswith('derived-') for e in changes.events))
+        # Identyfikator stały między wywołaniami
+        self.assertEqual(
+            [e.external_id for e in changes.events],
+            [e.external_id for e in provider.list_changes(self.user.id).events],
+        )
+
+    def test_sync_replaces_local_copy(self):
+        provider = ListOnlyProvider()
+        today = date.today()
+        provider.add('Spotkanie', today, 10)
+        provider.add('Przegląd', today + timedelta(days=1), 14)
+        use_case = SyncCalendarUseCase(provider)
+
+        first = use_case.execute(self.user.id)
+        self.assertTrue(first.full)
+        self.assertEqual(first.upserted, 2)
+
+        # Usunięte i przesunięte wydarzenie znika, nowe się pojawia
+        provider.events = provider.events[:1]
+        provider.add('Przesunięte', today + timedelta(days=2), 9)
+        second = use_case.execute(self.user.id)
+
+        self.assertEqual(second.deleted, 1)
+        self.assertEqual(
+            sorted(CalendarEvent.objects.filter(user=self.user).values_list('title', flat=True)),
+            ['Przesunięte', 'Spotkanie'],
+        )
+
+    def test_mock_provider_syncs_without_duplicates(self):
+        use_case = SyncCalendarUseCase(MockCalendarProvider())
+
+        use_case.execute(self.user.id)
+        count = CalendarEvent.objects.filter(user=self.user).count()
+        result = use_case.execute(self.user.id)
+
+        self.assertEqual(count, FULL_SYNC_PAST_DAYS + FULL_SYNC_AHEAD_DAYS + 1)
+        self.assertEqual(result.deleted, 0)
+        self.assertEqual(CalendarEvent.objects.filter(user=self.user).count(), count)
+
+
+class DeltaSyncTest(TestCase):
+    """Synchronizacja przyrostowa (sync token) na FakeCalendarProvider."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='delta')
+        cls.other = get_user_model().objects.create_user(username='delta-other')
+
+    def setUp(self):
+        self.remote = FakeCalendarProvider()
+        self.use_case = SyncCalendarUseCase(self.remote)
+
+    def local(self, user=None):
+        return dict(
+            CalendarEvent.objects.filter(user=user or self.user).values_list('external_id', 'title')
+        )
+
+    def test_initial_sync_is_full_and_stores_token(self):
+        self.remote.put(self.user.id, event('a', 9))
+        self.remote.put(self.user.id, event('b', 11))
+        self.remote.put(self.other.id, event('x', 10))
+
+        result = self.use_case.execute(self.user.id)
+
+        self.assertTrue(result.full)
+        self.assertEqual(result.upserted, 2)
+        self.assertEqual(self.local(), {'a': 'a', 'b': 'b'})
+        state = CalendarSyncState.objects.get(user=self.user)
+        self.assertIsNotNone(state.sync_token)
+        self.assertIsNotNone(state.last_synced_at)
+
+    def test_delta_applies_adds_updates_and_deletes(self):
+        self.remote.put(self.user.id, event('a', 9))
+        self.remote.put(self.user.id, event('b', 11))
+        self.use_case.execute(self.user.id)
+
+        self.remote.put(self.user.id, event('c', 14))
+        self.remote.put(self.user.id, event('a', 10, title='a przesunięte'))
+        self.remote.delete(self.user.id, 'b')
+        self.remote.put(self.other.id, event('x', 10))  # Zmiany innego użytkownika nie wchodzą do delty
+
+        result = self.use_case.execute(self.user.id)
+
+        self.assertFalse(result.full)
+        self.assertEqual((result.upserted, result.deleted), (2, 1))
+        self.assertEqual(self.local(), {'a': 'a przesunięte', 'c': 'c'})
+        self.assertEqual(
+            CalendarEvent.objects.get(user=self.user, external_id='a').start_time.hour, 10
+        )
+
+        # Bez zmian - pusta delta, nic nie zapisujemy
+        result = self.use_case.execute(self.user.id)
+        self.assertEqual((result.full, result.upserted, result.deleted), (False, 0, 0))
+
+    def test_expired_token_falls_back_to_full_resync(self):
+        self.remote.put(self.user.id, event('a', 9))
+        self.remote.put(self.user.id, event('b', 11))
+        self.use_case.execute(self.user.id)
+
+        self.remote.delete(self.user.id, 'a')
+        self.remote.put(self.user.id, event('c', 14))
+        self.remote.expire_tokens()
+
+        result = self.use_case.execute(self.user.id)
+
+        self.assertTrue(result.full)
+        self.assertEqual(self.local(), {'b': 'b', 'c': 'c'})
+        self.assertEqual(result.deleted, 1)
+        # Nowy token działa dla kolejnej delty
+        self.remote.put(self.user.id, event('d', 16))
+        self.assertFalse(self.use_case.execute(self.user.id).full)
+        self.assertIn('d', self.local())
+
+
+class LocalCalendarProviderTest(TestCase):
+    """Odczyt z lokalnej kopii; do zdalnego kalendarza tylko przy braku lub nieaktualnej kopii."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='local')
+
+    def setUp(self):
+        self.remote = FakeCalendarProvider()
+        self.remote.put(self.user.id, event('a', 9))
+        self.remote.put(self.user.id, event('b', 11, day=DAY + timedelta(days=1)))
+        self.provider = LocalCalendarProvider(remote=self.remote, stale_after=600)
+
+    def test_reads_through_without_local_copy(self):
+        self.assertEqual([e.external_id for e in self.provider.get_events(self.user.id, DAY)], ['a'])
+        self.assertEqual(self.remote.calls, 1)
+
+    def test_fresh_copy_is_read_locally(self):
+        SyncCalendarUseCase(self.remote).execute(self.user.id)
+        calls = self.remote.calls
+
+        events = self.provider.get_events_range(self.user.id, DAY, DAY + timedelta(days=1))
+
+        self.assertEqual([e.external_id for e in events], ['a', 'b'])
+        self.assertEqual(self.remote.calls, calls)
+
+    def test_stale_copy_reads_through(self):
+        SyncCalendarUseCase(self.remote).execute(self.user.id)
+        CalendarSyncState.objects.filter(user=self.user).update(
+            last_synced_at=timezone.now() - timedelta(seconds=601)
+        )
+        self.remote.put(self.user.id, event('c', 15))  # Jeszcze nie zsynchronizowane
+        calls = self.remote.calls
+
+        events = self.provider.get_events(self.user.id, DAY)
+
+        self.assertEqual([e.external_id for e in events], ['a', 'c'])
+        self.assertGreater(self.remote.calls, calls)
+
+    def test_without_remote_always_local(self):
+        provider = LocalCalendarProvider(stale_after=600)
+        self.assertEqual(provider.get_events(self.user.id, DAY), [])
+        SyncCalendarUseCase(self.remote).execute(self.user.id)
+        self.assertEqual([e.external_id for e in provider.get_events(self.user.id, DAY)], ['a'])
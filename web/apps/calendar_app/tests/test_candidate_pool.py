@@ -0,0 +1,152 @@
+import random
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from apps.calendar_app.domain.candidate_pool import CandidatePool
+from apps.calendar_app.domain.services import FreeWindow, ScheduledItem, SchedulerService
+from apps.calendar_app.ports.calendar_provider import FixedEvent
+from apps.tasks.domain.entities import TaskEntity, TaskStatus
+from apps.tasks.domain.services import TaskScorer
+
+
+NOW = datetime(2025, 3, 10, 7, 30, tzinfo=timezone.utc)
+
+
+def linear_scan_schedule(tasks, windows, now, user_profile):
+    """Poprzedni algorytm: pełne przeliczenie i sortowanie kandydatów po każdym umieszczeniu."""
+    scorer = TaskScorer()
+    schedule = []
+    remaining_tasks = [t for t in tasks if t.is_active()]
+    last_project_id = None
+    sequence_count = 0
+    absolute_end_time = windows[-1].end if windows else now
+
+    for window in windows:
+        current_time = window.start
+        slot_energy = SchedulerService()._slot_energy(user_profile, current_time)
+
+        while remaining_tasks and (window.end - current_time).total_seconds() > 0:
+            hours_to_end = (absolute_end_time - current_time).total_seconds() / 3600
+            scored_candidates = [
+                (task, scorer.calculate_score(
+                    task, now,
+                    slot_energy_level=slot_energy,
+                    last_project_id=last_project_id,
+                    sequence_count=sequence_count,
+                    hours_to_end_of_day=hours_to_end
+                ))
+                for task in remaining_tasks
+            ]
+            scored_candidates.sort(key=lambda x: (x[1], -x[0].duration_expected), reverse=True)
+
+            window_remaining_minutes = (window.end - current_time).total_seconds() / 60
+            best_candidate = next(
+                (task for task, _ in scored_candidates if task.duration_expected <= window_remaining_minutes), None
+            )
+            if best_candidate is None:
+                break
+
+            end_time = current_time + timedelta(minutes=best_candidate.duration_expected)
+            schedule.append(ScheduledItem(task=best_candidate, start=current_time, end=end_time))
+            current_time = end_time
+            remaining_tasks.remove(best_candidate)
+
+            if best_candidate.project_id and best_candidate.project_id == last_project_id:
+                sequence_count += 1
+            else:
+                sequence_count = 0
+            last_project_id = best_candidate.project_id
+
+    return schedule
+
+
+def random_task(rng, task_id, projects):
+    duration_min = rng.choice([15, 30, 30, 45, 60, 90, 120])
+    return TaskEntity(
+        id=task_id,
+        title=f"Zadanie {task_id}",
+        status=rng.choice([TaskStatus.TODO] * 4 + [TaskStatus.SCHEDULED, TaskStatus.WAITING, TaskStatus.DONE]),
+        duration_min=duration_min,
+        duration_max=rng.choice([None, duration_min, duration_min + 30]),
+        due_date=rng.choice([None, NOW + timedelta(hours=rng.randint(-48, 24 * 14))]),
+        priority=rng.randint(1, 5),
+        energy_required=rng.randint(1, 3),
+        complexity=rng.randint(1, 5),
+        is_critical_path=rng.random() < 0.1,
+        is_milestone=rng.random() < 0.05,
+        project_id=rng.choice(projects),
+        goal_deadline=rng.choice([None, NOW + timedelta(days=rng.randint(1, 60))]),
+        project_deadline=rng.choice([None, NOW + timedelta(days=rng.randint(1, 30))]),
+        ready_since=rng.choice([None, NOW - timedelta(days=rng.randint(0, 30))]),
+    )
+
+
+def random_day(rng):
+    """Wolne okna dnia pracy poprzerywane spotkaniami."""
+    day = NOW.date()
+    events = []
+    for _ in range(rng.randint(0, 4)):
+        start = datetime.combine(day, time(rng.randint(8, 16), rng.choice([0, 15, 30, 45])), tzinfo=timezone.utc)
+        events.append(FixedEvent(
+            title="Spotkanie",
+            start_time=start,
+            end_time=start + timedelta(minutes=rng.choice([30, 60, 90])),
+        ))
+    return SchedulerService().calculate_free_windows(day, events, time(8, 0), time(18, 0))
+
+
+class CandidatePoolEquivalenceTest(SimpleTestCase):
+    """CandidatePool musi dawać dokładnie ten sam plan co liniowe przeszukiwanie."""
+
+    def assertSameSchedule(self, actual, expected):
+        self.assertEqual(
+            [(item.task.id, item.start, item.end) for item in actual],
+            [(item.task.id, item.start, item.end) for item in expected],
+        )
+
+    def test_matches_linear_scan_on_random_inputs(self):
+        rng = random.Random(20250310)
+        profile = SimpleNamespace(energy_profile={"08": 3, "09": 3, "13": 1, 14: 2, "16": 3})
+
+        for scenario in range(150):
+            with self.subTest(scenario=scenario):
+                projects = [None] + list(range(1, rng.randint(1, 12)))
+                tasks = [random_task(rng, i, projects) for i in range(rng.randint(0, 80))]
+                windows = random_day(rng)
+
+                self.assertSameSchedule(
+                    SchedulerService().schedule_tasks(tasks, windows, NOW, profile),
+                    linear_scan_schedule(tasks, windows, NOW, profile),
+                )
+
+    def test_ties_keep_shorter_then_earlier_task(self):
+        # Identyczne zadania: remis wyniku rozstrzyga krótszy czas, potem kolejność na liście
+        tasks = [
+            TaskEntity(id=i, title=str(i), status=TaskStatus.TODO, duration_min=duration)
+            for i, duration in enumerate([60, 30, 30, 60, 30])
+        ]
+        windows = [FreeWindow(
+            start=NOW.replace(hour=9, minute=0), end=NOW.replace(hour=12, minute=0), is_work=True
+        )]
+
+        schedule = SchedulerService().schedule_tasks(tasks, windows, NOW, None)
+
+        self.assertSameSchedule(schedule, linear_scan_schedule(tasks, windows, NOW, None))
+        self.assertEqual([item.task.id for item in schedule][:3], [1, 2, 4])
+
+    def test_pool_carried_across_days_plans_each_task_once(self):
+        rng = random.Random(7)
+        tasks = [random_task(rng, i, [None, 1, 2, 3]) for i in range(120)]
+        pool = CandidatePool(tasks, NOW, TaskScorer())
+
+        planned = []
+        for offset in range(3):
+            day = NOW.date() + timedelta(days=offset)
+            windows = SchedulerService().calculate_free_windows(day, [], time(9, 0), time(13, 0))
+            planned += SchedulerService().fill_windows(pool, windows, NOW, None)
+
+        ids = [item.task.id for item in planned]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(pool) + len(ids), len([t for t in tasks if t.is_active()]))
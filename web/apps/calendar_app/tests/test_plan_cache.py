@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.calendar_app.adapters.plan_cache import LocMemPlanCacheBackend
+from apps.calendar_app.application.plan_cache import PlanCache, get_plan_cache
+from apps.tasks.models import Task
+
+
+class DailyViewPlanCacheTest(TestCase):
+    """Trafienie w cache planu dnia nie ładuje puli zadań ani nie planuje od nowa."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='plan')
+        for i in range(8):
+            Task.objects.create(user=cls.user, title=f'Zadanie {i}', status='todo', duration_min=45)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('calendar_daily')
+
+    def pool_queries(self, queries):
+        # Zapytanie puli snapshotów: aktywne zadania z kolumnami dla Schedulera
+        return [
+            q['sql'] for q in queries
+            if '"tasks_task"."duration_max"' in q['sql'] and "IN ('todo', 'scheduled')" in q['sql']
+        ]
+
+    def test_hit_skips_pool_load_and_keeps_backlog(self):
+        with CaptureQueriesContext(connection) as miss:
+            first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as hit:
+            second = self.client.get(self.url)
+
+        self.assertTrue(self.pool_queries(miss.captured_queries))
+        self.assertEqual(self.pool_queries(hit.captured_queries), [])
+        self.assertLess(len(hit), len(miss))
+
+        def titles(response):
+            return (
+                [item['title'] for item in response.context['timeline_items']],
+                [task.title for task in response.context['backlog_tasks']],
+            )
+        self.assertEqual(titles(first), titles(second))
+
+    def test_task_change_invalidates_plan(self):
+        self.client.get(self.url)
+        Task.objects.create(user=self.user, title='Nowe', status='todo', duration_min=15, priority=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertTrue(self.pool_queries(queries.captured_queries))
+        shown = [item['title'] for item in response.context['timeline_items']]
+        shown += [task.title for task in response.context['backlog_tasks']]
+        self.assertIn('Nowe', shown)
+
+
+class PlanCacheStatsTest(TestCase):
+    def test_hits_and_misses_are_counted_and_logged(self):
+        plan_cache = PlanCache(LocMemPlanCacheBackend())
+
+        with self.assertLogs('apps.calendar_app.application.plan_cache', level='DEBUG') as logs:
+            self.assertIsNone(plan_cache.get('plan:1:x'))
+            plan_cache.set('plan:1:x', {}, backlog=[])
+            self.assertEqual(plan_cache.get_with_backlog('plan:1:x'), ({}, []))
+
+        self.assertEqual(plan_cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        self.assertEqual(len(logs.records), 2)
+
+    def test_shared_instance_uses_configured_backend(self):
+        self.assertIsInstance(get_plan_cache(), PlanCache)
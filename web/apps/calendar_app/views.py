@@ -7,13 +7,34 @@ from django.contrib.auth.decorators import login_required
 # Importy z innych aplikacji (Modularność!)
 from apps.tasks.adapters.orm_repositories import DjangoTaskRepository
 from .adapters.google_calendar import GoogleCalendarAdapter
+from .adapters.local_calendar import LocalCalendarProvider
 from apps.calendar_app.domain.services import SchedulerService
+from apps.calendar_app.application.plan_cache import get_plan_cache, invalidate_user_plans
+from apps.tasks.domain.services import RecurrenceService
 from apps.core.models import UserProfile
 from apps.tasks.models import Task
 from apps.goals.models import Goal
 from apps.projects.models import Project
 
 
+def _task_repo(request) -> DjangoTaskRepository:
+    """Repozytorium zadań na czas requestu (pamięta pulę aktywnych zadań - ładujemy ją raz)."""
+    if not hasattr(request, '_task_repo'):
+        request._task_repo = DjangoTaskRepository()
+    return request._task_repo
+
+
+def _pool_filters(request) -> dict:
+    """Opcjonalne zawężenie puli (?context=ID, ?area=ID) - filtrowane w SQL."""
+    filters = {}
+    for param, field in (('context', 'context_id'), ('area', 'area_id')):
+        try:
+            filters[field] = int(request.GET[param])
+        except (KeyError, ValueError):
+            pass
+    return filters
+
+
 @login_required
 def daily_view(request):
     """
@@ -39,10 +60,7 @@ def daily_view(request):
     if overdue_candidates.exists():
         count = overdue_candidates.update(status='overdue')
         print(f"Lazy Check: Zmieniono {count} zadań na OVERDUE.")
-
-    # 2. Pobierz Zadania (Teraz pobierze już bez tych overdue!)
-    task_repo = DjangoTaskRepository()
-    all_tasks = task_repo.get_active_tasks()  # Ta metoda filtruje tylko TODO/SCHEDULED
+        invalidate_user_plans(request.user.id)  # .update() omija sygnały
 
     # Dodatkowo pobierzemy listę overdue, żeby wyświetlić w sekcji alarmowej
     overdue_tasks = Task.objects.filter(user=request.user, status='overdue')
@@ -53,54 +71,38 @@ def daily_view(request):
     except:
         profile = UserProfile.objects.create(user=request.user)
 
-    # 2. Pobierz Wszystkie Zadania
-    task_repo = DjangoTaskRepository()
-    all_tasks = task_repo.get_active_tasks()
-
-    # 3. Podział na Domeny (Work vs Personal)
-    work_tasks = [t for t in all_tasks if not t.is_private]
-    personal_tasks = [t for t in all_tasks if t.is_private]
-
-    # 4. Pobierz Fixed Events (Sztywne spotkania)
+    # 2. Pobierz Fixed Events (Sztywne spotkania)
     # Pobieramy raz, użyjemy ich do blokowania obu osi czasu
-    calendar_provider = GoogleCalendarAdapter()
+    # Lokalna kopia (sync_calendars) - Google API tylko, gdy kopia jest nieaktualna
+    calendar_provider = LocalCalendarProvider(remote=GoogleCalendarAdapter())
     fixed_events = calendar_provider.get_events(request.user.id, today)
 
-    scheduler = SchedulerService()
+    # 3. Plan dnia i backlog - z cache, jeśli od ostatniego wyliczenia nic się nie zmieniło
+    pool_filters = _pool_filters(request)
+    plan_cache = get_plan_cache()
+    cache_key = plan_cache.make_key(request.user.id, today, 'day', profile, fixed_events, **pool_filters)
+    cached = plan_cache.get_with_backlog(cache_key)
 
-    # ==========================================
-    # TIMELINE 1: PRACA (Work Window)
-    # ==========================================
-    work_windows = scheduler.calculate_free_windows(
-        today,
-        fixed_events,
-        work_start=profile.work_start_hour,
-        work_end=profile.work_end_hour
-    )
+    if cached is not None and cached[1] is not None:
+        plan, backlog_tasks = cached
+        full_schedule = plan.get(today, [])
+    else:
+        # 4. Pula zadań użytkownika (już bez tych overdue!) - tylko przy braku planu w cache.
+        # Lekkie snapshoty - tytuły dociągamy po zaplanowaniu
+        task_repo = _task_repo(request)
+        all_tasks = task_repo.get_active_snapshots(user_id=request.user.id, **pool_filters)
 
-    work_schedule = scheduler.schedule_tasks(
-        work_tasks,
-        work_windows,
-        now,
-        user_profile=profile
-    )
+        # Dual Timeline (Służbowe vs Prywatne) na tych samych fixed events
+        scheduler = SchedulerService()
+        full_schedule = scheduler.schedule_days(all_tasks, [today], {today: fixed_events}, profile, now)[today]
 
-    # ==========================================
-    # TIMELINE 2: PRYWATNE (Personal Window)
-    # ==========================================
-    personal_windows = scheduler.calculate_free_windows(
-        today,
-        fixed_events,
-        work_start=profile.personal_start_hour,
-        work_end=profile.personal_end_hour
-    )
+        # Backlog (To co się nie zmieściło w ŻADNYM oknie)
+        scheduled_task_ids = {item.task.id for item in full_schedule}
+        backlog_tasks = [t for t in all_tasks if t.id not in scheduled_task_ids]
 
-    personal_schedule = scheduler.schedule_tasks(
-        personal_tasks,
-        personal_windows,
-        now,
-        user_profile=profile
-    )
+        # Tytuły tylko dla wyświetlanych zadań (plan + backlog)
+        task_repo.resolve_titles([item.task for item in full_schedule] + backlog_tasks)
+        plan_cache.set(cache_key, {today: full_schedule}, backlog=backlog_tasks)
 
     # ==========================================
     # 5. Scalanie i Wyświetlanie
@@ -122,9 +124,6 @@ def daily_view(request):
         })
 
     # Dodaj Zaplanowane (Work + Personal)
-    full_schedule = work_schedule + personal_schedule
-    scheduled_task_ids = set()
-
     for item in full_schedule:
         duration_min = int((item.end - item.start).total_seconds() / 60)
         # Kolor z obszaru (jeśli jest)
@@ -140,14 +139,10 @@ def daily_view(request):
             'color': task_color,
             'task_id': item.task.id  # Potrzebne do akcji HTMX
         })
-        scheduled_task_ids.add(item.task.id)
 
     # Sortuj chronologicznie
     timeline_items.sort(key=lambda x: x['start'])
 
-    # 6. Backlog (To co się nie zmieściło w ŻADNYM oknie)
-    backlog_tasks = [t for t in all_tasks if t.id not in scheduled_task_ids]
-
     # --- PRZYWRÓCONA LOGIKA HTMX ---
     if request.headers.get('HX-Request'):
         base_template = 'base_htmx.html'
@@ -183,7 +178,10 @@ def weekly_view(request):
 
     # 2. Uruchom logikę planowania
     scheduler = SchedulerService()
-    week_plan = scheduler.get_weekly_plan(request.user, start_of_week)
+    week_plan = scheduler.get_weekly_plan(
+        request.user, start_of_week, task_repo=_task_repo(request), plan_cache=get_plan_cache(),
+        **_pool_filters(request)
+    )
 
     # 3. Generuj linki nawigacyjne
     prev_week_start = start_of_week - timedelta(weeks=1)
@@ -276,6 +274,14 @@ def monthly_view(request):
     for p in projects: add_event(p.deadline.day, p, 'Projekt', 'bg-primary')
     for m in milestones: add_event(m.due_date.day, m, 'Milestone', 'bg-info')
 
+    # Zadania cykliczne - wirtualne wystąpienia (od dziś), bez tworzenia zadań
+    month_start = date(year, month, 1)
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    recurring_by_day = RecurrenceService().project_occurrences(request.user.id, month_start, month_end)
+    for day, occurrences in sorted(recurring_by_day.items()):
+        for o in occurrences:
+            add_event(day.day, f"↻ {o.title}", 'Cykliczne', 'bg-secondary bg-opacity-50')
+
     # 4. Generuj kalendarz (Macierz: [[0,0,1,2,3...], [4,5...]])
     cal = calendar.monthcalendar(year, month)
 
@@ -0,0 +1,18 @@
+# apps/core/application/cache_generations.py
+
+
+def bump_generation(cache, key: str) -> int:
+    """
+    Podbija licznik generacji w cache Django i zwraca nową wartość (brak klucza = 0).
+
+    Generacja jest częścią kluczy zapamiętanych wyników (plany, przegląd tygodniowy, statystyki),
+    więc podbicie unieważnia je wszystkie naraz - stare wpisy przestają być osiągalne i same wygasają.
+    Licznik nie wygasa; incr() jest atomowy w backendach, które to wspierają (Redis, Memcached).
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:  # Brak klucza (pierwsza zmiana albo wyparty z cache)
+        # add() nie nadpisuje licznika, który ktoś utworzył w międzyczasie - wtedy zwykłe incr()
+        if cache.add(key, 1, None):
+            return 1
+        return cache.incr(key)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_userprofile_current_strategy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="googlecredentials",
+            name="token_expiry",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -55,6 +55,7 @@ def save_user_profile(sender, instance, **kwargs):
 class GoogleCredentials(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='google_creds')
     token = models.TextField()  # Access Token
+    token_expiry = models.DateTimeField(null=True, blank=True)  # Kiedy wygasa Access Token
     refresh_token = models.TextField(null=True)  # Refresh Token (ważne!)
     token_uri = models.CharField(max_length=255)
     client_id = models.CharField(max_length=255)
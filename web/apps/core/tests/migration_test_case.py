@@ -0,0 +1,34 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Test migracji danych: baza cofnięta do migrate_from, setUpBeforeMigration() zapisuje dane
+    modelami historycznymi, potem migracja do migrate_to; self.apps - modele po migracji.
+    Po teście baza wraca do najnowszych migracji.
+    """
+
+    migrate_from = None  # [(app_label, nazwa migracji)]
+    migrate_to = None
+
+    def setUp(self):
+        MigrationExecutor(connection).migrate(self.migrate_from)
+        self.setUpBeforeMigration(self._applied_state())
+
+        MigrationExecutor(connection).migrate(self.migrate_to)
+        self.apps = self._applied_state()
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def setUpBeforeMigration(self, apps):
+        pass
+
+    @staticmethod
+    def _applied_state():
+        """Modele historyczne wszystkich aplikacji wg migracji zastosowanych w bazie (nie tylko przodków migrate_from)."""
+        loader = MigrationExecutor(connection).loader  # Graf od nowa - stan bazy się zmienił
+        return loader.project_state(list(loader.applied_migrations)).apps
@@ -0,0 +1,67 @@
+from datetime import date
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from apps.calendar_app.adapters.plan_cache import DjangoPlanCacheBackend
+from apps.calendar_app.application.plan_cache import PlanCache
+from apps.core.application.cache_generations import bump_generation
+from apps.reports.application.stats_report import StatsReport
+from apps.reports.application.weekly_review import WeeklyReviewPage
+
+
+class BumpGenerationTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = LocMemCache('generations', {})
+        self.cache.clear()
+
+    def test_counts_from_missing_key(self):
+        self.assertEqual([bump_generation(self.cache, 'gen') for _ in range(3)], [1, 2, 3])
+        self.assertEqual(self.cache.get('gen'), 3)
+
+    def test_evicted_key_starts_again(self):
+        bump_generation(self.cache, 'gen')
+        self.cache.delete('gen')
+
+        self.assertEqual(bump_generation(self.cache, 'gen'), 1)
+
+    def test_key_created_concurrently_is_not_overwritten(self):
+        # Między nieudanym incr() a add() licznik utworzył inny proces
+        self.cache.set('gen', 4, None)
+        with mock.patch.object(self.cache, 'incr', side_effect=[ValueError, 5]) as incr:
+            self.assertEqual(bump_generation(self.cache, 'gen'), 5)
+        self.assertEqual(incr.call_count, 2)
+        self.assertEqual(self.cache.get('gen'), 4)  # add() niczego nie nadpisał
+
+    def test_counter_does_not_expire(self):
+        cache = LocMemCache('generations-ttl', {'TIMEOUT': 1})
+        bump_generation(cache, 'gen')
+
+        self.assertIsNone(cache._expire_info[cache.make_and_validate_key('gen')])
+
+
+class GenerationUsersTest(SimpleTestCase):
+    """Plany, przegląd tygodniowy i statystyki unieważniają się przez wspólny licznik generacji."""
+
+    def setUp(self):
+        self.cache = LocMemCache('generation-users', {})
+        self.cache.clear()
+
+    def test_plan_cache(self):
+        plans = PlanCache(DjangoPlanCacheBackend())
+        with mock.patch.object(DjangoPlanCacheBackend, 'cache', self.cache):
+            key = plans.make_key(7, date(2025, 3, 10), 'day', None)
+            plans.invalidate_user(7)
+            self.assertNotEqual(plans.make_key(7, date(2025, 3, 10), 'day', None), key)
+            self.assertEqual(self.cache.get('plan:gen:7'), 1)
+
+    def test_weekly_review_and_stats(self):
+        WeeklyReviewPage(cache_backend=self.cache).invalidate_user(7)
+        StatsReport(cache_backend=self.cache).invalidate_user(7, ['tasks', 'habits'])
+        StatsReport(cache_backend=self.cache).invalidate_user(7, ['tasks'])
+
+        self.assertEqual(
+            self.cache.get_many(['review:gen:7', 'stats:gen:7:tasks', 'stats:gen:7:habits']),
+            {'review:gen:7': 1, 'stats:gen:7:tasks': 2, 'stats:gen:7:habits': 1},
+        )
@@ -8,6 +8,7 @@ from django.conf import settings
 from google_auth_oauthlib.flow import Flow
 from .models import GoogleCredentials, UserProfile
 import os
+import pytz
 from datetime import date
 from apps.tasks.models import Task
 from django.views.decorators.http import require_http_methods
@@ -58,6 +59,7 @@ def google_callback(request):
         user=request.user,
         defaults={
             'token': creds.token,
+            'token_expiry': creds.expiry.replace(tzinfo=pytz.UTC) if creds.expiry else None,
             'refresh_token': creds.refresh_token,
             'token_uri': creds.token_uri,
             'client_id': creds.client_id,
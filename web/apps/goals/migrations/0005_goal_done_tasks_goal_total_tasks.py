@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goals", "0004_goal_area"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goal",
+            name="done_tasks",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="goal",
+            name="total_tasks",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Wypełnienie liczników postępu (total_tasks / done_tasks) dla istniejących danych
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def fill_counters(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Goal = apps.get_model("goals", "Goal")
+
+    projects = []
+    for project in Project.objects.annotate(
+        total=Count("tasks"), done=Count("tasks", filter=Q(tasks__status="done"))
+    ):
+        project.total_tasks, project.done_tasks = project.total, project.done
+        projects.append(project)
+    Project.objects.bulk_update(projects, ["total_tasks", "done_tasks"], batch_size=500)
+
+    goals = []
+    for goal in Goal.objects.annotate(
+        total=Count("projects__tasks"),
+        done=Count("projects__tasks", filter=Q(projects__tasks__status="done")),
+    ):
+        goal.total_tasks, goal.done_tasks = goal.total, goal.done
+        goal.progress = int((goal.done / goal.total) * 100) if goal.total > 0 else 0
+        goals.append(goal)
+    Goal.objects.bulk_update(goals, ["total_tasks", "done_tasks", "progress"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goals", "0005_goal_done_tasks_goal_total_tasks"),
+        ("projects", "0005_project_done_tasks_project_total_tasks"),
+        ("tasks", "0017_task_cpm_ef_task_cpm_es_task_cpm_lf_task_cpm_ls"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
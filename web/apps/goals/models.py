@@ -10,6 +10,9 @@ class Goal(models.Model):
     motivation = models.TextField(blank=True)
     deadline = models.DateField(null=True, blank=True)
     progress = models.IntegerField(default=0, help_text="Postęp w procentach (0-100)")
+    # Zadania ze wszystkich projektów celu (utrzymywane przyrostowo przez ProgressService)
+    total_tasks = models.IntegerField(default=0)
+    done_tasks = models.IntegerField(default=0)
     area = models.ForeignKey(
         'areas.Area',
         null=True, blank=True,
@@ -20,4 +23,13 @@ class Goal(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, **kwargs):
+        # Postęp i liczniki zmienia tylko ProgressService (UPDATE z F()) - zwykły zapis ich nie nadpisuje
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('progress', 'total_tasks', 'done_tasks')
+            ]
+        super().save(*args, **kwargs)
\ No newline at end of file
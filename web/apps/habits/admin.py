@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .application.history import HabitHistory
 from .models import Habit, HabitLog
 
 @admin.register(Habit)
@@ -10,4 +11,12 @@ class HabitAdmin(admin.ModelAdmin):
 @admin.register(HabitLog)
 class HabitLogAdmin(admin.ModelAdmin):
     list_display = ('habit', 'date')
-    list_filter = ('date', 'habit')
\ No newline at end of file
+    list_filter = ('date', 'habit')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Wpis mógł zmienić dzień lub nawyk - mapy lat nawyku odtwarzamy z jego wpisów
+        history = HabitHistory()
+        history.rebuild([obj.habit_id])
+        if change and 'habit' in form.changed_data and form.initial.get('habit'):
+            history.rebuild([form.initial['habit']])
\ No newline at end of file
@@ -0,0 +1,115 @@
+# apps/habits/application/analytics.py
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from django.db import connection
+from apps.habits.domain.streaks import RATE_WINDOWS, HabitStats, Island, fold, islands, window_starts
+
+
+class HabitAnalytics:
+    """
+    Skuteczność (30/90/365 dni) i serie wszystkich nawyków naraz - jednym zapytaniem.
+
+    Serie to gaps-and-islands: w obrębie serii kolejnych dni "data - ROW_NUMBER()" jest stałe,
+    więc GROUP BY po tej różnicy daje po wierszu na serię (długość, ostatni dzień, wykonania
+    w oknach). Na PostgreSQL liczy to baza (funkcja okna); na pozostałych bazach (SQLite)
+    pobieramy dni i składamy serie w Pythonie (apps.habits.domain.streaks) - wynik ten sam.
+
+    refresh() zapisuje current_streak / longest_streak / last_completed_date w Habit
+    (manage.py recompute_habit_streaks - dla wszystkich nawyków w bazie).
+    """
+
+    STORED_FIELDS = ['current_streak', 'longest_streak', 'last_completed_date']
+
+    def __init__(self, windows=RATE_WINDOWS):
+        self.windows = tuple(windows)
+
+    def stats(self, habit_ids: Optional[Iterable[int]], today: date) -> Dict[int, HabitStats]:
+        """{habit_id: HabitStats}; habit_ids=None - wszystkie nawyki z wpisami."""
+        habit_ids = list(habit_ids) if habit_ids is not None else None
+        if habit_ids == []:
+            return {}
+
+        if connection.vendor == 'postgresql':
+            by_habit = self._islands_sql(habit_ids, today)
+        else:
+            by_habit = self._islands_python(habit_ids, today)
+
+        result = {hid: fold(hid, rows, today, self.windows) for hid, rows in by_habit.items()}
+        for hid in habit_ids or ():
+            result.setdefault(hid, fold(hid, [], today, self.windows))
+        return result
+
+    def _islands_sql(self, habit_ids: Optional[List[int]], today: date) -> Dict[int, List[Island]]:
+        from apps.habits.models import HabitLog
+
+        table = connection.ops.quote_name(HabitLog._meta.db_table)
+        windows_sql = ', '.join('COUNT(*) FILTER (WHERE "date" >= %s)' for _ in self.windows)
+        where, params = '"date" <= %s', [today]
+        if habit_ids is not None:
+            where += ' AND habit_id = ANY(%s)'
+            params.append(habit_ids)
+
+        sql = f"""
+            SELECT habit_id, MIN("date"), MAX("date"), COUNT(*), {windows_sql}
+            FROM (
+                SELECT habit_id, "date",
+                       "date" - CAST(ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY "date") AS integer) AS island
+                FROM {table}
+                WHERE {where}
+            ) AS days
+            GROUP BY habit_id, island
+        """
+        by_habit = defaultdict(list)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*window_starts(today, self.windows), *params])
+            for habit_id, first_day, last_day, length, *in_windows in cursor.fetchall():
+                by_habit[habit_id].append(Island(first_day, last_day, length, tuple(in_windows)))
+        return by_habit
+
+    def _islands_python(self, habit_ids: Optional[List[int]], today: date) -> Dict[int, List[Island]]:
+        from apps.habits.models import HabitLog
+
+        logs = HabitLog.objects.filter(date__lte=today)
+        if habit_ids is not None:
+            logs = logs.filter(habit_id__in=habit_ids)
+
+        days = defaultdict(list)
+        for habit_id, day in logs.order_by('habit_id', 'date').values_list('habit_id', 'date').iterator(chunk_size=5000):
+            days[habit_id].append(day)
+        return {hid: islands(habit_days, today, self.windows) for hid, habit_days in days.items()}
+
+    # --- Zapisane statystyki w Habit ---
+
+    def _stale(self, habit_ids: Optional[Iterable[int]], today: date) -> List:
+        from apps.habits.models import Habit
+
+        habits = Habit.objects.only('id', *self.STORED_FIELDS)
+        if habit_ids is not None:
+            habits = habits.filter(id__in=habit_ids)
+        habits = list(habits)
+        stats = self.stats([h.id for h in habits] if habit_ids is not None else None, today)
+
+        stale = []
+        for habit in habits:
+            s = stats.get(habit.id) or HabitStats(habit_id=habit.id)
+            values = (s.current_streak, s.longest_streak, s.last_completed_date)
+            if tuple(getattr(habit, f) for f in self.STORED_FIELDS) != values:
+                habit.current_streak, habit.longest_streak, habit.last_completed_date = values
+                stale.append(habit)
+        return stale
+
+    def check(self, today: date) -> List[str]:
+        """Nawyki z nieaktualnymi zapisanymi seriami (pusta lista = spójne)."""
+        return [
+            f"Nawyk {h.id}: powinno być {h.current_streak}/{h.longest_streak} (ostatnio {h.last_completed_date})"
+            for h in self._stale(None, today)
+        ]
+
+    def refresh(self, habit_ids: Optional[Iterable[int]], today: date) -> int:
+        """Przelicza i zapisuje serie (None = wszystkie nawyki). Zwraca liczbę poprawionych."""
+        from apps.habits.models import Habit
+
+        stale = self._stale(habit_ids, today)
+        Habit.objects.bulk_update(stale, self.STORED_FIELDS, batch_size=1000)
+        return len(stale)
@@ -0,0 +1,103 @@
+# apps/habits/application/history.py
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from apps.habits.domain import bitmap
+
+
+class HabitHistory:
+    """
+    Historia nawyków w mapach bitowych lat (HabitYear): jeden wiersz na nawyk i rok.
+
+    mark() ustawia / czyści bit dnia (wiersz roku blokowany na czas zmiany), year_bits() czyta
+    rok wielu nawyków jednym zapytaniem, year_summary() składa z bitów widok roczny: skuteczność
+    (popcount), najdłuższą serię i siatkę heatmapy - bez wczytywania wpisów HabitLog.
+    rebuild() / check() - odtworzenie map z HabitLog (manage.py rebuild_habit_years).
+    """
+
+    def mark(self, habit_id: int, day: date, done: bool = True):
+        from apps.habits.models import HabitYear
+
+        with transaction.atomic():
+            rows = HabitYear.objects.select_for_update()
+            if done:
+                row, _ = rows.get_or_create(habit_id=habit_id, year=day.year)
+            else:
+                # Czyszczenie nie tworzy wiersza: bez mapy roku bitu i tak nie ma, a przy kaskadowym
+                # usuwaniu nawyku wiersz roku jest już skasowany (nowy naruszyłby klucz obcy)
+                row = rows.filter(habit_id=habit_id, year=day.year).first()
+                if row is None:
+                    return
+            row.bits = bitmap.with_day(row.bits, day, done)
+            row.save(update_fields=['bits'])
+
+    def year_bits(self, habit_ids: Iterable[int], year: int) -> Dict[int, bytes]:
+        """{habit_id: mapa roku} - nawyki bez wpisów w tym roku dostają pustą mapę."""
+        from apps.habits.models import HabitYear
+
+        habit_ids = list(habit_ids)
+        rows = dict(HabitYear.objects.filter(habit_id__in=habit_ids, year=year).values_list('habit_id', 'bits'))
+        return {hid: bytes(rows.get(hid) or b'') for hid in habit_ids}
+
+    def year_summary(self, habits: List, year: int, today: date) -> List[dict]:
+        """Widok roczny nawyków: po słowniku na nawyk (dla szablonu / JSON)."""
+        bits = self.year_bits([h.id for h in habits], year)
+        return [
+            {
+                'habit': habit,
+                'done': bitmap.count(bits[habit.id]),
+                'rate': bitmap.rate(bits[habit.id], year, today),
+                'longest_run': bitmap.longest_run(bits[habit.id]),
+                'weeks': bitmap.calendar_weeks(bits[habit.id], year),
+            }
+            for habit in habits
+        ]
+
+    # --- Odtworzenie z HabitLog / kontrola spójności ---
+
+    def expected(self, habit_ids: Optional[Iterable[int]] = None) -> Dict[Tuple[int, int], bytes]:
+        from apps.habits.models import HabitLog
+
+        logs = HabitLog.objects.order_by()
+        if habit_ids is not None:
+            logs = logs.filter(habit_id__in=habit_ids)
+
+        days = defaultdict(list)
+        for habit_id, day in logs.values_list('habit_id', 'date').iterator(chunk_size=5000):
+            days[(habit_id, day.year)].append(day)
+        return {key: bitmap.from_days(habit_days) for key, habit_days in days.items()}
+
+    def check(self) -> List[str]:
+        """Lata, w których mapa nie zgadza się z wpisami (pusta lista = spójne)."""
+        from apps.habits.models import HabitYear
+
+        expected = self.expected()
+        problems = []
+        for habit_id, year, bits in HabitYear.objects.values_list('habit_id', 'year', 'bits'):
+            want = expected.pop((habit_id, year), None)
+            if bitmap.to_int(bits) != bitmap.to_int(want):
+                problems.append(
+                    f"Nawyk {habit_id}, {year}: w mapie {bitmap.count(bits)} dni, we wpisach {bitmap.count(want)}"
+                )
+        for (habit_id, year), want in expected.items():
+            problems.append(f"Nawyk {habit_id}, {year}: brak mapy, we wpisach {bitmap.count(want)} dni")
+        return problems
+
+    def rebuild(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """Odtwarza mapy z HabitLog (None = wszystkie nawyki). Zwraca liczbę wierszy."""
+        from apps.habits.models import HabitYear
+
+        habit_ids = list(habit_ids) if habit_ids is not None else None
+        expected = self.expected(habit_ids)
+
+        rows = HabitYear.objects.all()
+        if habit_ids is not None:
+            rows = rows.filter(habit_id__in=habit_ids)
+        rows.delete()
+
+        HabitYear.objects.bulk_create(
+            [HabitYear(habit_id=habit_id, year=year, bits=bits) for (habit_id, year), bits in expected.items()],
+            batch_size=1000,
+        )
+        return len(expected)
@@ -5,3 +5,6 @@ class HabitsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.habits"
     label = "habits"
+
+    def ready(self):
+        import apps.habits.signals  # Przeliczanie serii po zmianie wpisów
@@ -0,0 +1,111 @@
+# apps/habits/domain/bitmap.py
+import calendar
+from datetime import date, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+
+YEAR_DAYS = 366
+YEAR_BYTES = 46  # 366 bitów
+
+
+def day_index(day: date) -> int:
+    """Numer bitu dnia w mapie jego roku (1 stycznia = 0)."""
+    return day.timetuple().tm_yday - 1
+
+
+def days_in_year(year: int) -> int:
+    return 366 if calendar.isleap(year) else 365
+
+
+def to_int(bits) -> int:
+    """Mapa z bazy (bytes / memoryview na PostgreSQL / pusta) -> int, bit n = dzień n."""
+    return int.from_bytes(bytes(bits or b''), 'little')
+
+
+def to_bytes(value: int) -> bytes:
+    return value.to_bytes(YEAR_BYTES, 'little')
+
+
+def from_days(days: Iterable[date]) -> bytes:
+    value = 0
+    for day in days:
+        value |= 1 << day_index(day)
+    return to_bytes(value)
+
+
+def with_day(bits, day: date, done: bool = True) -> bytes:
+    """Mapa z ustawionym (done=True) albo wyczyszczonym bitem dnia."""
+    value = to_int(bits)
+    mask = 1 << day_index(day)
+    return to_bytes(value | mask if done else value & ~mask)
+
+
+def has_day(bits, day: date) -> bool:
+    return bool(to_int(bits) >> day_index(day) & 1)
+
+
+def _range_mask(first: int, last: int) -> int:
+    """Bity first..last włącznie."""
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def count(bits, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Liczba wykonań (popcount) w dniach [start, end] tego roku; bez granic - cały rok."""
+    value = to_int(bits)
+    if start is not None or end is not None:
+        value &= _range_mask(day_index(start) if start else 0, day_index(end) if end else YEAR_DAYS - 1)
+    return value.bit_count()
+
+
+def rate(bits, year: int, today: Optional[date] = None) -> int:
+    """Skuteczność w roku, w procentach: bieżący rok - do dziś włącznie, miniony - cały."""
+    last = date(year, 12, 31)
+    if today is not None and today.year == year:
+        last = today
+    elif today is not None and today.year < year:
+        return 0
+    return int(count(bits, end=last) / (day_index(last) + 1) * 100)
+
+
+def longest_run(bits) -> int:
+    """Najdłuższa seria kolejnych dni: value & (value >> 1) skraca każdą serię o jeden bit."""
+    value = to_int(bits)
+    length = 0
+    while value:
+        value &= value >> 1
+        length += 1
+    return length
+
+
+def runs(bits, year: int) -> List[Tuple[date, int]]:
+    """Serie w roku: [(pierwszy dzień, długość)], chronologicznie."""
+    value = to_int(bits)
+    result = []
+    while value:
+        first = (value & -value).bit_length() - 1  # Najniższy ustawiony bit
+        shifted = value >> first
+        length = (~shifted & (shifted + 1)).bit_length() - 1  # Najniższe zero = koniec serii
+        result.append((date(year, 1, 1) + timedelta(days=first), length))
+        value &= ~_range_mask(first, first + length - 1)
+    return result
+
+
+class CalendarDay(NamedTuple):
+    day: date
+    done: bool
+
+
+def calendar_weeks(bits, year: int) -> List[List[Optional[CalendarDay]]]:
+    """
+    Siatka do heatmapy roku: tygodnie (od poniedziałku) x 7 dni, każda komórka to CalendarDay
+    albo None poza rokiem (dopełnienie pierwszego i ostatniego tygodnia).
+    """
+    value = to_int(bits)
+    first = date(year, 1, 1)
+    cells: List[Optional[CalendarDay]] = [None] * first.weekday()
+    for i in range(days_in_year(year)):
+        cells.append(CalendarDay(first + timedelta(days=i), bool(value >> i & 1)))
+    cells += [None] * (-len(cells) % 7)
+    return [cells[i:i + 7] for i in range(0, len(cells), 7)]
@@ -0,0 +1,73 @@
+# apps/habits/domain/streaks.py
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+RATE_WINDOWS = (30, 90, 365)  # dni
+
+
+@dataclass(frozen=True)
+class Island:
+    """Seria kolejnych dni z wykonaniem (gaps-and-islands) i liczba wykonań w oknach RATE_WINDOWS."""
+    first_day: date
+    last_day: date
+    length: int
+    in_windows: Tuple[int, ...]  # wykonania w ostatnich N dniach, w kolejności RATE_WINDOWS
+
+
+@dataclass
+class HabitStats:
+    habit_id: int
+    current_streak: int = 0  # seria kończąca się dziś albo wczoraj (dzisiejsze może jeszcze przyjść)
+    longest_streak: int = 0
+    last_completed_date: Optional[date] = None
+    completions: Dict[int, int] = field(default_factory=dict)  # {okno w dniach: wykonania}
+
+    def rate(self, days: int) -> int:
+        """Skuteczność w ostatnich `days` dniach (z dziś), w procentach."""
+        return int(self.completions.get(days, 0) / days * 100)
+
+
+def window_starts(today: date, windows: Sequence[int] = RATE_WINDOWS) -> List[date]:
+    """Pierwszy dzień każdego okna: ostatnie N dni to [today - N + 1, today]."""
+    return [today - timedelta(days=days - 1) for days in windows]
+
+
+def islands(days: Iterable[date], today: date, windows: Sequence[int] = RATE_WINDOWS) -> List[Island]:
+    """
+    Serie z posortowanych rosnąco, unikalnych dni (to samo, co zapytanie z ROW_NUMBER:
+    dzień - numer wiersza jest stały w obrębie serii).
+    """
+    starts = window_starts(today, windows)
+    result = []
+    first = prev = None
+    counts = [0] * len(windows)
+    for day in days:
+        if prev is not None and day != prev + timedelta(days=1):
+            result.append(Island(first, prev, (prev - first).days + 1, tuple(counts)))
+            first, counts = None, [0] * len(windows)
+        if first is None:
+            first = day
+        for i, start in enumerate(starts):
+            if day >= start:
+                counts[i] += 1
+        prev = day
+    if first is not None:
+        result.append(Island(first, prev, (prev - first).days + 1, tuple(counts)))
+    return result
+
+
+def fold(habit_id: int, habit_islands: Iterable[Island], today: date, windows: Sequence[int] = RATE_WINDOWS) -> HabitStats:
+    """Statystyki nawyku z jego serii (dni najwyżej do dziś)."""
+    stats = HabitStats(habit_id=habit_id, completions={days: 0 for days in windows})
+    yesterday = today - timedelta(days=1)
+    for island in habit_islands:
+        stats.longest_streak = max(stats.longest_streak, island.length)
+        if stats.last_completed_date is None or island.last_day > stats.last_completed_date:
+            stats.last_completed_date = island.last_day
+        if island.last_day >= yesterday:
+            stats.current_streak = island.length
+        for days, count in zip(windows, island.in_windows):
+            stats.completions[days] += count
+    return stats
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.habits.application.history import HabitHistory
+
+
+class Command(BaseCommand):
+    help = 'Odtwarza od zera mapy bitowe lat nawyków (HabitYear) z wpisów HabitLog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Tylko sprawdź spójność map z wpisami (bez zapisu); kod wyjścia != 0 przy rozbieżnościach'
+        )
+
+    def handle(self, *args, **options):
+        history = HabitHistory()
+
+        if options['check']:
+            problems = history.check()
+            for problem in problems:
+                self.stdout.write(f"- {problem}")
+            if problems:
+                raise CommandError(f'Niespójne mapy lat nawyków: {len(problems)}. Napraw: manage.py rebuild_habit_years')
+            self.stdout.write(self.style.SUCCESS('Mapy lat nawyków są spójne.'))
+            return
+
+        with transaction.atomic():
+            rows = history.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Odtworzono mapy lat nawyków ({rows} wierszy).'))
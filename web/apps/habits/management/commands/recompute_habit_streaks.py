@@ -0,0 +1,31 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.habits.application.analytics import HabitAnalytics
+
+
+class Command(BaseCommand):
+    help = 'Przelicza od zera serie wszystkich nawyków (current_streak / longest_streak / last_completed_date)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Tylko sprawdź, czy zapisane serie są aktualne (bez zapisu); kod wyjścia != 0 przy rozbieżnościach'
+        )
+
+    def handle(self, *args, **options):
+        analytics = HabitAnalytics()
+        today = date.today()
+
+        if options['check']:
+            problems = analytics.check(today)
+            for problem in problems:
+                self.stdout.write(f"- {problem}")
+            if problems:
+                raise CommandError(f'Nieaktualne serie nawyków: {len(problems)}. Napraw: manage.py recompute_habit_streaks')
+            self.stdout.write(self.style.SUCCESS('Serie nawyków są aktualne.'))
+            return
+
+        with transaction.atomic():
+            fixed = analytics.refresh(None, today)
+        self.stdout.write(self.style.SUCCESS(f'Przeliczono serie nawyków (poprawiono {fixed}).'))
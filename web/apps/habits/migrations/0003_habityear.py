@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0002_habit_area"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitYear",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year", models.PositiveSmallIntegerField()),
+                ("bits", models.BinaryField(default=bytes)),
+                ("habit", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="years", to="habits.habit")),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("habit", "year"), name="unique_habit_year")],
+            },
+        ),
+    ]
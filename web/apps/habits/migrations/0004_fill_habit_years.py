@@ -0,0 +1,33 @@
+# Wypełnienie map bitowych lat (HabitYear) z istniejących wpisów HabitLog
+
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def fill_years(apps, schema_editor):
+    HabitLog = apps.get_model("habits", "HabitLog")
+    HabitYear = apps.get_model("habits", "HabitYear")
+
+    years = defaultdict(int)
+    for habit_id, day in HabitLog.objects.values_list("habit_id", "date").iterator(chunk_size=5000):
+        years[(habit_id, day.year)] |= 1 << (day.timetuple().tm_yday - 1)
+
+    HabitYear.objects.bulk_create(
+        [
+            HabitYear(habit_id=habit_id, year=year, bits=value.to_bytes(46, "little"))
+            for (habit_id, year), value in years.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0003_habityear"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_years, migrations.RunPython.noop),
+    ]
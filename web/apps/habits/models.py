@@ -32,4 +32,25 @@ class HabitLog(models.Model):
     date = models.DateField(default=timezone.now)
 
     class Meta:
-        unique_together = ('habit', 'date')  # Jeden wpis na dzień
\ No newline at end of file
+        unique_together = ('habit', 'date')  # Jeden wpis na dzień
+
+
+class HabitYear(models.Model):
+    """
+    Rok nawyku jako mapa bitowa: bit n = wykonanie w (n+1)-szym dniu roku (366 bitów, 46 bajtów,
+    little-endian). Cały rok to jeden wiersz zamiast do 365 wpisów HabitLog - widok roczny
+    i skuteczność liczymy z bitów (apps.habits.domain.bitmap).
+    Utrzymywane razem z HabitLog (HabitService.complete_habit, usunięcie wpisu);
+    przeliczenie od zera: manage.py rebuild_habit_years.
+    """
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name='years')
+    year = models.PositiveSmallIntegerField()
+    bits = models.BinaryField(default=bytes)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['habit', 'year'], name='unique_habit_year'),
+        ]
+
+    def __str__(self):
+        return f"{self.habit} - {self.year}"
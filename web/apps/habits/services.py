@@ -1,4 +1,7 @@
-from datetime import date, timedelta
+from datetime import date
+from django.db import transaction
+from .application.analytics import HabitAnalytics
+from .application.history import HabitHistory
 from .models import Habit, HabitLog
 
 
@@ -8,26 +11,11 @@ class HabitService:
         if HabitLog.objects.filter(habit=habit, date=day).exists():
             return  # Już zrobione
 
-        # 2. Utwórz log
-        HabitLog.objects.create(habit=habit, date=day)
+        # 2. Utwórz log - serie przelicza receiver (signals.py) z wszystkich wpisów nawyku,
+        # więc działa też dopisanie dnia wstecz. Razem z wpisem - bit dnia w mapie roku.
+        with transaction.atomic():
+            HabitLog.objects.create(habit=habit, date=day)
+            HabitHistory().mark(habit.id, day)
 
-        # 3. Oblicz Streak
-        # Jeśli ostatnie wykonanie było wczoraj -> streak++
-        # Jeśli ostatnie wykonanie było dzisiaj -> nic
-        # Jeśli dawniej -> reset do 1
-
-        yesterday = day - timedelta(days=1)
-
-        if habit.last_completed_date == yesterday:
-            habit.current_streak += 1
-        elif habit.last_completed_date == day:
-            pass  # Nic nie rób, to dubel
-        else:
-            habit.current_streak = 1  # Reset (lub start)
-
-        # Update max streak
-        if habit.current_streak > habit.longest_streak:
-            habit.longest_streak = habit.current_streak
-
-        habit.last_completed_date = day
-        habit.save()
\ No newline at end of file
+        # 3. Odśwież instancję (current_streak, longest_streak, last_completed_date)
+        habit.refresh_from_db(fields=HabitAnalytics.STORED_FIELDS)
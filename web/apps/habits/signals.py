@@ -0,0 +1,65 @@
+# apps/habits/signals.py
+import threading
+from datetime import date
+from typing import Set
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.habits.application.analytics import HabitAnalytics
+from apps.habits.application.history import HabitHistory
+from apps.habits.models import HabitLog
+
+
+_local = threading.local()
+
+
+class _PendingRefresh:
+    """Nawyki z usuniętymi wpisami - serie przeliczane raz na transakcję, po commicie."""
+
+    def __init__(self):
+        self.habit_ids: Set[int] = set()
+
+    def run(self):
+        if getattr(_local, 'pending', None) is self:
+            _local.pending = None
+        HabitAnalytics().refresh(self.habit_ids, date.today())
+
+    def is_scheduled_on(self, connection) -> bool:
+        """Czy run() wciąż czeka w kolejce on_commit (rollback savepointu ją czyści)."""
+        return any(entry[1] == self.run for entry in connection.run_on_commit)
+
+
+def _refresh_after_commit(habit_id: int):
+    connection = transaction.get_connection()
+    pending = getattr(_local, 'pending', None)
+    if pending is None or not pending.is_scheduled_on(connection):
+        pending = _local.pending = _PendingRefresh()
+        transaction.on_commit(pending.run)
+    pending.habit_ids.add(habit_id)
+
+
+# Serie liczone od nowa z wpisów - także przy dopisaniu wstecz i usunięciu (np. z Admina)
+
+@receiver(post_save, sender=HabitLog)
+def refresh_habit_streaks(sender, instance, **kwargs):
+    HabitAnalytics().refresh([instance.habit_id], date.today())
+
+
+def _deleting_logs(origin) -> bool:
+    """Czy usuwane są same wpisy (a nie kaskada z usuwanego nawyku / użytkownika)."""
+    return isinstance(origin, HabitLog) or getattr(origin, 'model', None) is HabitLog
+
+
+@receiver(post_delete, sender=HabitLog)
+def refresh_habit_streaks_after_delete(sender, instance, origin=None, **kwargs):
+    # Przy kaskadzie nawyk znika razem z wpisami - serii nie liczymy
+    if _deleting_logs(origin):
+        # delete() działa w transakcji - jedno przeliczenie na nawyk zamiast jednego na usunięty wpis
+        _refresh_after_commit(instance.habit_id)
+
+
+@receiver(post_delete, sender=HabitLog)
+def clear_habit_year_day(sender, instance, origin=None, **kwargs):
+    # Przy kaskadzie mapy lat (HabitYear) są usuwane razem z nawykiem
+    if _deleting_logs(origin):
+        HabitHistory().mark(instance.habit_id, instance.date, done=False)
@@ -0,0 +1,56 @@
+import unittest
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from apps.habits.application.analytics import HabitAnalytics
+from apps.habits.models import Habit, HabitLog
+
+
+TODAY = date(2025, 3, 10)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Serie w SQL (funkcja okna) tylko na PostgreSQL')
+class IslandsSqlTest(TestCase):
+    """Serie z zapytania (_islands_sql) = serie złożone w Pythonie (_islands_python)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='islands')
+        cls.habits = Habit.objects.bulk_create([Habit(user=user, title=f'Nawyk {i}') for i in range(4)])
+        offsets = {
+            0: [0, 1, 2, 5, 6, 40, 100, 364, 365, 366],  # Serie na granicach okien 30/90/365
+            1: [1, 2, 3, 4, 70, 71, 72, 73, 74, 75],     # Bieżąca seria kończy się wczoraj, przełom roku
+            2: [-3, -2, 0, 10],                         # Wpisy "z przyszłości" pomijane
+            3: [],
+        }
+        HabitLog.objects.bulk_create([
+            HabitLog(habit=cls.habits[i], date=TODAY - timedelta(days=offset))
+            for i, days in offsets.items() for offset in days
+        ])
+
+    def assertSameIslands(self, habit_ids):
+        analytics = HabitAnalytics()
+        sql = analytics._islands_sql(habit_ids, TODAY)
+        python = analytics._islands_python(habit_ids, TODAY)
+
+        self.assertEqual(
+            {hid: sorted(rows, key=lambda island: island.first_day) for hid, rows in sql.items()},
+            {hid: sorted(rows, key=lambda island: island.first_day) for hid, rows in python.items()},
+        )
+
+    def test_all_habits(self):
+        self.assertSameIslands(None)
+
+    def test_selected_habits(self):
+        self.assertSameIslands([self.habits[1].id, self.habits[3].id])
+
+    def test_stats_use_sql(self):
+        stats = HabitAnalytics().stats([h.id for h in self.habits], TODAY)
+
+        self.assertEqual(stats[self.habits[0].id].current_streak, 3)
+        self.assertEqual(stats[self.habits[1].id].current_streak, 4)
+        self.assertEqual(stats[self.habits[1].id].longest_streak, 6)
+        self.assertEqual(stats[self.habits[3].id].longest_streak, 0)
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.habits.application.analytics import HabitAnalytics
+from apps.habits.application.history import HabitHistory
+from apps.habits.models import Habit, HabitLog, HabitYear
+from apps.habits.services import HabitService
+
+
+class HabitLogDeleteTest(TestCase):
+    """Usunięcie wpisów HabitLog (pojedynczo i kaskadowo) utrzymuje mapy lat HabitYear."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='habits')
+        self.habit = Habit.objects.create(user=self.user, title='Bieganie')
+        today = date.today()
+        for offset in range(3):
+            HabitService().complete_habit(self.habit, today - timedelta(days=offset))
+
+    def test_deleting_log_clears_day(self):
+        log = HabitLog.objects.filter(habit=self.habit).order_by('date').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            log.delete()
+
+        self.assertEqual(HabitHistory().check(), [])
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.current_streak, 2)
+
+    def test_deleting_habit_with_logs(self):
+        other = Habit.objects.create(user=self.user, title='Czytanie')
+        HabitService().complete_habit(other, date.today())
+
+        self.habit.delete()
+
+        self.assertFalse(HabitLog.objects.filter(habit_id=self.habit.id).exists())
+        self.assertFalse(HabitYear.objects.filter(habit_id=self.habit.id).exists())
+        self.assertTrue(HabitYear.objects.filter(habit=other).exists())
+        self.assertEqual(HabitHistory().check(), [])
+
+    def test_bulk_delete_refreshes_each_habit_once(self):
+        other = Habit.objects.create(user=self.user, title='Czytanie')
+        HabitService().complete_habit(other, date.today())
+
+        with mock.patch.object(HabitAnalytics, 'refresh', autospec=True, side_effect=HabitAnalytics.refresh) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                HabitLog.objects.filter(habit__user=self.user, date=date.today()).delete()
+
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(set(refresh.call_args.args[1]), {self.habit.id, other.id})
+        self.habit.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.habit.current_streak, other.current_streak), (2, 0))
+
+    def test_cascade_from_habit_skips_streak_refresh(self):
+        with mock.patch.object(HabitAnalytics, 'refresh') as refresh:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.habit.delete()
+
+        refresh.assert_not_called()
+        self.assertEqual(callbacks, [])
+
+    def test_cascade_from_habit_invalidates_stats_once(self):
+        with mock.patch('apps.reports.signals.invalidate_user_stats') as invalidate:
+            self.habit.delete()
+
+        # Tylko post_delete nawyku - bez odczytu właściciela dla każdego wpisu
+        invalidate.assert_called_once()
+
+    def test_deleting_user_with_habits(self):
+        self.user.delete()
+
+        self.assertFalse(Habit.objects.exists())
+        self.assertFalse(HabitYear.objects.exists())
+
+    def test_clearing_day_without_year_row_creates_nothing(self):
+        HabitHistory().mark(self.habit.id, date(2001, 5, 5), done=False)
+
+        self.assertFalse(HabitYear.objects.filter(habit=self.habit, year=2001).exists())
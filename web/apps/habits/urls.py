@@ -4,4 +4,6 @@ from . import views
 urlpatterns = [
     path('widget/', views.habit_list_widget, name='habit_widget'),
     path('<int:pk>/complete/', views.habit_complete_view, name='habit_complete'),
+    path('year/', views.habit_year_view, name='habit_year'),
+    path('year/<int:year>/', views.habit_year_view, name='habit_year_for'),
 ]
\ No newline at end of file
@@ -2,7 +2,9 @@ from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from datetime import date
-from .models import Habit, HabitLog
+from .application.analytics import HabitAnalytics
+from .application.history import HabitHistory
+from .models import Habit
 from .services import HabitService
 
 
@@ -12,13 +14,14 @@ def habit_list_widget(request):
     habits = Habit.objects.filter(user=request.user, is_active=True)
     today = date.today()
 
-    # Oznacz, które są zrobione dzisiaj
-    completed_ids = set(HabitLog.objects.filter(
-        habit__in=habits, date=today
-    ).values_list('habit_id', flat=True))
+    # Serie na dziś (zapisane w Habit mogą być sprzed przerwy) - jedno zapytanie dla wszystkich
+    stats = HabitAnalytics().stats([h.id for h in habits], today)
 
     for h in habits:
-        h.is_completed_today = h.id in completed_ids
+        # Oznacz, które są zrobione dzisiaj
+        h.is_completed_today = stats[h.id].last_completed_date == today
+        h.current_streak = stats[h.id].current_streak
+        h.rate_30d = stats[h.id].rate(30)
 
     return render(request, 'habits/partials/widget.html', {'habits': habits})
 
@@ -31,4 +34,18 @@ def habit_complete_view(request, pk):
     service.complete_habit(habit, date.today())
 
     # Przeładuj widget
-    return habit_list_widget(request)
\ No newline at end of file
+    return habit_list_widget(request)
+
+@login_required
+def habit_year_view(request, year=None):
+    """Rok nawyków w pigułce: heatmapa, skuteczność i najdłuższa seria - z map bitowych (HabitYear)."""
+    today = date.today()
+    year = year or today.year
+    habits = list(Habit.objects.filter(user=request.user, is_active=True))
+
+    return render(request, 'habits/year.html', {
+        'year': year,
+        'rows': HabitHistory().year_summary(habits, year, today),
+        'previous_year': year - 1,
+        'next_year': year + 1 if year < today.year else None,
+    })
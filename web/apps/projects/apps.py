@@ -2,4 +2,7 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.projects'
-    label = 'projects'
\ No newline at end of file
+    label = 'projects'
+
+    def ready(self):
+        import apps.projects.signals  # Liczniki postępu celów przy zmianach projektów
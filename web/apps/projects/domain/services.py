@@ -1,6 +1,17 @@
 # apps/projects/domain/services.py
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Set
 from dataclasses import dataclass
+from functools import cached_property
+from itertools import chain
+import numpy as np
+
+
+class CPMCycleError(ValueError):
+    """Zależności (blocked_by) tworzą cykl - ścieżka krytyczna nie istnieje."""
+
+    def __init__(self, cycle: List[int]):
+        self.cycle = cycle  # ID zadań w cyklu, w kolejności zależności
+        super().__init__(f"Cykl w zależnościach zadań: {' -> '.join(map(str, cycle + cycle[:1]))}")
 
 
 @dataclass
@@ -10,12 +21,229 @@ class CPMNode:
     dependencies: List[int]  # ID zadań, od których to zadanie zależy (Predecessors)
 
     # Obliczane wartości
-    es: int = 0
-    ef: int = 0
-    ls: int = 0
-    lf: int = 0
-    float_val: int = 0
+    # (None = jeszcze nie liczone, np. nowe zadanie przy aktualizacji przyrostowej)
+    es: Optional[int] = 0
+    ef: Optional[int] = 0
+    ls: Optional[int] = 0
+    lf: Optional[int] = 0
+    float_val: int = 0  # Zapas całkowity (Total Float): LS - ES
     is_critical: bool = False
+    free_float: int = 0  # Zapas swobodny: o ile można opóźnić bez przesuwania następników
+
+
+def _find_cycle(nodes: List[CPMNode], predecessors: Callable[[int], List[int]], in_degree) -> List[int]:
+    """Wyciąga jeden cykl spośród węzłów, których Kahn nie zdjął (in_degree > 0)."""
+    # Każdy taki węzeł ma poprzednika, który też nie został zdjęty - idziemy wstecz aż do powtórzenia
+    current = next(i for i in range(len(nodes)) if in_degree[i] > 0)
+    seen = {}
+    path = []
+    while current not in seen:
+        seen[current] = len(path)
+        path.append(current)
+        current = next(p for p in predecessors(current) if in_degree[p] > 0)
+
+    cycle = path[seen[current]:]
+    cycle.reverse()  # Kolejność zależności: poprzednik -> następnik
+    return [nodes[i].task_id for i in cycle]
+
+
+# Do tylu węzłów CPM liczymy na listach - stały koszt wywołań NumPy przeważa nad zyskiem
+SMALL_GRAPH_NODES = 2000
+
+# Głęboki, wąski graf (np. długi łańcuch): po tylu poziomach, jeśli średnio poziom ma mniej
+# niż MIN_LEVEL_WIDTH węzłów, dalszy przebieg idzie pętlą Pythona - koszt NumPy na poziom jest stały
+DEEP_GRAPH_LEVELS = 16
+MIN_LEVEL_WIDTH = 64
+
+
+class _Graph:
+    """
+    Graf CPM na indeksach całkowitych w układzie CSR (tablice NumPy): następnicy węzła i to
+    succ[succ_ptr[i]:succ_ptr[i + 1]] (analogicznie pred).
+
+    Przebiegi liczone są poziomami (Kahn "falami"): cały poziom - węzły, których wszyscy
+    poprzednicy są już policzeni - to kilka operacji na tablicach, więc koszt w Pythonie
+    zależy od głębokości grafu, a nie od liczby węzłów. Grafy projektów są szerokie i płytkie;
+    dla głębokich (łańcuchy) przebieg przechodzi na zwykłą pętlę po kolejności topologicznej.
+    """
+
+    def __init__(self, tasks: List[CPMNode]):
+        self.nodes = tasks
+        self.n = n = len(tasks)
+        ids = np.array([t.task_id for t in tasks], dtype=np.int64)
+        self.duration = np.array([t.duration for t in tasks], dtype=np.int64)
+
+        # Krawędzie poprzednik -> następnik, pogrupowane po następniku (to od razu CSR poprzedników)
+        dependencies = [t.dependencies for t in tasks]
+        counts = np.array(list(map(len, dependencies)), dtype=np.int64)
+        edges_src = self._positions(ids, np.array(list(chain.from_iterable(dependencies)), dtype=np.int64))
+        edges_dst = np.repeat(np.arange(n, dtype=np.int64), counts)
+        # Zabezpieczenie: bierzemy pod uwagę tylko istniejące zależności
+        known = edges_src >= 0
+        if not known.all():
+            edges_src, edges_dst = edges_src[known], edges_dst[known]
+
+        self.pred = edges_src
+        self.pred_ptr = self._offsets(edges_dst, n)
+        self.succ = edges_dst[np.argsort(edges_src, kind='stable')]
+        self.succ_ptr = self._offsets(edges_src, n)
+        self._edges = (edges_src, edges_dst)
+
+    @staticmethod
+    def _positions(ids: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Indeks węzła dla każdego ID z keys (-1 = nieznane ID)."""
+        low = int(ids.min())
+        span = int(ids.max()) - low + 1
+        if span <= 4 * len(ids) + 1024:
+            # ID zadań projektu są zwykle gęste - tablica bezpośrednia zamiast wyszukiwania
+            table = np.full(span, -1, dtype=np.int64)
+            table[ids - low] = np.arange(len(ids), dtype=np.int64)
+            offset = keys - low
+            inside = (offset >= 0) & (offset < span)
+            positions = np.full(len(keys), -1, dtype=np.int64)
+            positions[inside] = table[offset[inside]]
+            return positions
+
+        by_id = np.argsort(ids, kind='stable')
+        sorted_ids = ids[by_id]
+        found = np.minimum(np.searchsorted(sorted_ids, keys), len(ids) - 1)
+        return np.where(sorted_ids[found] == keys, by_id[found], -1)
+
+    @staticmethod
+    def _offsets(keys: np.ndarray, n: int) -> np.ndarray:
+        """Początki grup w CSR: sąsiedzi węzła i to pozycje [ptr[i], ptr[i + 1])."""
+        return np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=n)))).astype(np.int64)
+
+    @staticmethod
+    def _gather(ptr: np.ndarray, data: np.ndarray, nodes: np.ndarray):
+        """Sąsiedzi wielu węzłów naraz: (węzeł, sąsiad) dla każdej krawędzi z CSR."""
+        starts = ptr[nodes]
+        counts = ptr[nodes + 1] - starts
+        total = int(counts.sum())
+        offsets = np.cumsum(counts) - counts
+        positions = np.repeat(starts - offsets, counts) + np.arange(total, dtype=np.int64)
+        return np.repeat(nodes, counts), data[positions]
+
+    # --- Widoki list (pętle Pythona: przebieg przyrostowy i głębokie grafy) ---
+
+    @cached_property
+    def index(self) -> Dict[int, int]:
+        return {t.task_id: i for i, t in enumerate(self.nodes)}
+
+    @cached_property
+    def _lists(self):
+        return self.succ.tolist(), self.succ_ptr.tolist(), self.pred.tolist(), self.pred_ptr.tolist()
+
+    def successors(self, i: int) -> List[int]:
+        succ, succ_ptr, _, _ = self._lists
+        return succ[succ_ptr[i]:succ_ptr[i + 1]]
+
+    def predecessors(self, i: int) -> List[int]:
+        _, _, pred, pred_ptr = self._lists
+        return pred[pred_ptr[i]:pred_ptr[i + 1]]
+
+    # --- Przebiegi ---
+
+    def forward(self):
+        """
+        Kahn poziomami z przebiegiem w przód: ES węzła jest ostateczne, gdy wchodzi na poziom.
+        Zwraca (kolejność topologiczna, ES, poziomy - albo None po przejściu na pętlę Pythona).
+        Rzuca CPMCycleError, jeśli graf ma cykl.
+        """
+        duration = self.duration
+        in_degree = np.diff(self.pred_ptr)
+        es = np.zeros(self.n, dtype=np.int64)
+        frontier = np.flatnonzero(in_degree == 0)
+        levels = []
+        done = 0
+
+        while frontier.size:
+            if self.n < SMALL_GRAPH_NODES or (
+                len(levels) >= DEEP_GRAPH_LEVELS and done < MIN_LEVEL_WIDTH * len(levels)
+            ):
+                rest, in_degree = self._forward_python(frontier, in_degree, es)
+                if done + len(rest) < self.n:
+                    raise CPMCycleError(self._find_cycle(in_degree))
+                return np.concatenate(levels + [np.asarray(rest, dtype=np.int64)]), es, None
+
+            levels.append(frontier)
+            done += frontier.size
+            sources, targets = self._gather(self.succ_ptr, self.succ, frontier)
+            np.maximum.at(es, targets, es[sources] + duration[sources])
+            np.subtract.at(in_degree, targets, 1)
+            candidates = np.unique(targets)
+            frontier = candidates[in_degree[candidates] == 0]
+
+        if done < self.n:
+            raise CPMCycleError(self._find_cycle(in_degree))
+        order = np.concatenate(levels) if levels else np.zeros(0, dtype=np.int64)
+        return order, es, levels
+
+    def _forward_python(self, frontier: np.ndarray, in_degree: np.ndarray, es: np.ndarray):
+        """Dokończenie forward() zwykłą pętlą od bieżącego poziomu (es uzupełniane w miejscu)."""
+        succ, succ_ptr, _, _ = self._lists
+        duration = self.duration.tolist()
+        degree = in_degree.tolist()
+        start = es.tolist()
+
+        order = frontier.tolist()
+        for i in order:  # order rośnie w trakcie iteracji
+            finish = start[i] + duration[i]
+            for s in succ[succ_ptr[i]:succ_ptr[i + 1]]:
+                if finish > start[s]:
+                    start[s] = finish
+                degree[s] -= 1
+                if not degree[s]:
+                    order.append(s)
+
+        es[:] = start
+        return order, np.asarray(degree, dtype=np.int64)
+
+    def backward(self, order: np.ndarray, levels: Optional[List[np.ndarray]], project_duration: int) -> np.ndarray:
+        """LF: zadania końcowe (bez następników) kończą się z projektem; reszta - min(LS następników)."""
+        duration = self.duration
+
+        if levels is None:
+            succ, succ_ptr, _, _ = self._lists
+            durations = duration.tolist()
+            start = [0] * self.n  # LS
+            for i in reversed(order.tolist()):
+                a, b = succ_ptr[i], succ_ptr[i + 1]
+                start[i] = (min(map(start.__getitem__, succ[a:b])) if a != b else project_duration) - durations[i]
+            return np.asarray(start, dtype=np.int64) + duration
+
+        # Następnicy są zawsze na dalszych poziomach - idąc od końca, LF poziomu jest już ostateczne
+        lf = np.full(self.n, project_duration, dtype=np.int64)
+        for frontier in reversed(levels):
+            nodes, preds = self._gather(self.pred_ptr, self.pred, frontier)
+            np.minimum.at(lf, preds, lf[nodes] - duration[nodes])
+        return lf
+
+    def topological_order(self) -> List[int]:
+        """Kolejność topologiczna (indeksy). Rzuca CPMCycleError, jeśli graf ma cykl."""
+        return self.forward()[0].tolist()
+
+    def _find_cycle(self, in_degree: np.ndarray) -> List[int]:
+        return _find_cycle(self.nodes, self.predecessors, in_degree)
+
+    def free_floats(self, es, ef, project_duration: int) -> np.ndarray:
+        """FF = min(ES następników) - EF; dla zadań końcowych min liczone względem końca projektu."""
+        edges_src, edges_dst = self._edges
+        earliest_successor_start = np.full(self.n, project_duration, dtype=np.int64)
+        np.minimum.at(earliest_successor_start, edges_src, np.asarray(es, dtype=np.int64)[edges_dst])
+        return earliest_successor_start - np.asarray(ef, dtype=np.int64)
+
+    def store(self, es, ef, ls, lf, project_duration: int):
+        """Wpisuje wynik do węzłów (zapasy i flaga krytyczności liczone na tablicach)."""
+        es, ef, ls, lf = (np.asarray(v, dtype=np.int64) for v in (es, ef, ls, lf))
+        total_float = ls - es
+        columns = zip(
+            self.nodes, es.tolist(), ef.tolist(), ls.tolist(), lf.tolist(), total_float.tolist(),
+            (total_float == 0).tolist(), self.free_floats(es, ef, project_duration).tolist(),
+        )
+        for node, es_i, ef_i, ls_i, lf_i, float_i, critical, free in columns:
+            node.es, node.ef, node.ls, node.lf = es_i, ef_i, ls_i, lf_i
+            node.float_val, node.is_critical, node.free_float = float_i, critical, free
 
 
 class CPMService:
@@ -23,81 +251,143 @@ class CPMService:
         """
         Oblicza ścieżkę krytyczną dla listy węzłów.
         Zwraca słownik {task_id: node} z wypełnionymi wartościami.
+        Rzuca CPMCycleError, jeśli zależności tworzą cykl.
         """
-        node_map = {t.task_id: t for t in tasks}
-
         # Jeśli graf jest pusty, zwróć pusty słownik
-        if not node_map:
+        if not tasks:
             return {}
+        if len(tasks) < SMALL_GRAPH_NODES:
+            return self._calculate_small(tasks)
+
+        graph = _Graph(tasks)
+
+        # 1. Forward Pass (ES, EF) - razem z kolejnością topologiczną
+        order, es, levels = graph.forward()
+        ef = es + graph.duration
+
+        # 2. Backward Pass (LS, LF) - czas trwania projektu to maksymalny EF
+        project_duration = int(ef.max())
+        lf = graph.backward(order, levels, project_duration)
+        ls = lf - graph.duration
+
+        graph.store(es, ef, ls, lf, project_duration)
+        return {t.task_id: t for t in tasks}
 
-        # ---------------------------
-        # 1. Forward Pass (ES, EF)
-        # ---------------------------
-        processed = set()
-
-        def calc_forward(node_id):
-            if node_id in processed: return
-
-            # Zabezpieczenie: jeśli węzeł nie istnieje (np. został usunięty/zakończony), ignoruj
-            node = node_map.get(node_id)
-            if not node: return
-
-            max_predecessor_ef = 0
-            for dep_id in node.dependencies:
-                calc_forward(dep_id)
-
-                # Zabezpieczenie: bierzemy pod uwagę tylko istniejące zależności
-                if dep_id in node_map:
-                    if node_map[dep_id].ef > max_predecessor_ef:
-                        max_predecessor_ef = node_map[dep_id].ef
-
-            node.es = max_predecessor_ef
-            node.ef = node.es + node.duration
-            processed.add(node_id)
-
-        for tid in node_map:
-            calc_forward(tid)
-
-        # ---------------------------
-        # 2. Backward Pass (LS, LF)
-        # ---------------------------
-        # Czas trwania projektu to maksymalny EF
-        project_duration = max((n.ef for n in node_map.values()), default=0)
-        processed = set()
-
-        # Budowa mapy odwrotnej (Successors) dla łatwiejszego przeszukiwania
-        successors = {tid: [] for tid in node_map}
-        for node in node_map.values():
-            for dep_id in node.dependencies:
-                if dep_id in successors:
-                    successors[dep_id].append(node.task_id)
-
-        def calc_backward(node_id):
-            if node_id in processed: return
-
-            node = node_map.get(node_id)
-            if not node: return
-
-            min_successor_ls = project_duration
-
-            my_successors = successors.get(node_id, [])
-            if not my_successors:
-                # Zadanie końcowe (nie ma następców w grafie)
-                node.lf = project_duration
-            else:
-                for succ_id in my_successors:
-                    calc_backward(succ_id)
-                    if succ_id in node_map:
-                        if node_map[succ_id].ls < min_successor_ls:
-                            min_successor_ls = node_map[succ_id].ls
-                node.lf = min_successor_ls
-
-            node.ls = node.lf - node.duration
-            node.float_val = node.ls - node.es
+    @staticmethod
+    def _calculate_small(tasks: List[CPMNode]) -> Dict[int, CPMNode]:
+        """calculate_critical_path na listach Pythona (małe grafy - typowy projekt)."""
+        index = {t.task_id: i for i, t in enumerate(tasks)}
+        n = len(tasks)
+        duration = [t.duration for t in tasks]
+        # Zabezpieczenie: bierzemy pod uwagę tylko istniejące zależności
+        predecessors = [[index[d] for d in t.dependencies if d in index] for t in tasks]
+        successors = [[] for _ in range(n)]
+        for i, preds in enumerate(predecessors):
+            for p in preds:
+                successors[p].append(i)
+
+        # 1. Forward Pass (ES, EF) razem z algorytmem Kahna
+        in_degree = [len(preds) for preds in predecessors]
+        order = [i for i in range(n) if not in_degree[i]]
+        es = [0] * n
+        for i in order:  # order rośnie w trakcie iteracji
+            finish = es[i] + duration[i]
+            for s in successors[i]:
+                if finish > es[s]:
+                    es[s] = finish
+                in_degree[s] -= 1
+                if not in_degree[s]:
+                    order.append(s)
+        if len(order) < n:
+            raise CPMCycleError(_find_cycle(tasks, predecessors.__getitem__, in_degree))
+        ef = [start + d for start, d in zip(es, duration)]
+
+        # 2. Backward Pass (LS, LF) - zadania końcowe kończą się z projektem;
+        # przy okazji najwcześniejszy ES następnika (do zapasu swobodnego)
+        project_duration = max(ef)
+        lf = [project_duration] * n
+        successor_start = [project_duration] * n
+        for i in reversed(order):
+            start = lf[i] - duration[i]
+            early = es[i]
+            for p in predecessors[i]:
+                if start < lf[p]:
+                    lf[p] = start
+                if early < successor_start[p]:
+                    successor_start[p] = early
+
+        # 3. Zapasy: całkowity LS - ES, swobodny min(ES następników) - EF
+        for i, node in enumerate(tasks):
+            ls = lf[i] - duration[i]
+            node.es, node.ef, node.ls, node.lf = es[i], ef[i], ls, lf[i]
+            node.float_val = ls - es[i]
             node.is_critical = (node.float_val == 0)
-            processed.add(node_id)
+            node.free_float = successor_start[i] - ef[i]
+
+        return {t.task_id: t for t in tasks}
+
+    def update_critical_path(
+            self,
+            tasks: List[CPMNode],
+            dirty_ids: Set[int],
+            previous_duration: Optional[int] = None
+        ) -> Dict[int, CPMNode]:
+        """
+        Przyrostowa wersja calculate_critical_path.
+
+        Węzły niosą wartości (es, ef, ls, lf) z poprzedniego przeliczenia; dirty_ids to węzły,
+        których czas trwania lub krawędzie się zmieniły (albo sąsiedzi usuniętych węzłów).
+        Zmiany propagujemy tylko tam, gdzie faktycznie zmieniają wynik: EF w przód
+        (do następników), LS w tył (do poprzedników). Pełny przebieg wstecz jest potrzebny
+        tylko wtedy, gdy zmienił się czas trwania całego projektu.
+        previous_duration - poprzedni czas trwania projektu (podaj, jeśli węzły zostały usunięte -
+        ich EF mógł wyznaczać koniec projektu); domyślnie max EF z podanych węzłów.
+        """
+        if not tasks:
+            return {}
+
+        graph = _Graph(tasks)
+        order = graph.topological_order()
+        duration = graph.duration.tolist()
+        es = [t.es for t in tasks]
+        ef = [t.ef for t in tasks]
+        ls = [t.ls for t in tasks]
+        lf = [t.lf for t in tasks]
+
+        old_duration = previous_duration
+        if old_duration is None:
+            old_duration = max((v for v in ef if v is not None), default=0)
+
+        dirty = [graph.index[tid] for tid in dirty_ids if tid in graph.index]
+
+        # 1. Forward Pass - tylko brudne węzły, w kolejności topologicznej
+        forward_dirty = set(dirty)
+        for i in order:
+            if i not in forward_dirty:
+                continue
+            start = max((ef[p] for p in graph.predecessors(i)), default=0)
+            finish = start + duration[i]
+            if start != es[i] or finish != ef[i]:
+                es[i], ef[i] = start, finish
+                forward_dirty.update(graph.successors(i))
+
+        project_duration = max(ef)
+
+        # 2. Backward Pass - wszystko, jeśli zmienił się koniec projektu; inaczej tylko brudne
+        if project_duration != old_duration:
+            backward_dirty = set(range(len(tasks)))
+        else:
+            backward_dirty = set(dirty)
 
-        for tid in node_map:
-            calc_backward(tid)
+        for i in reversed(order):
+            if i not in backward_dirty:
+                continue
+            finish = min((ls[s] for s in graph.successors(i)), default=project_duration)
+            start = finish - duration[i]
+            if finish != lf[i] or start != ls[i]:
+                lf[i], ls[i] = finish, start
+                backward_dirty.update(graph.predecessors(i))
 
-        return node_map
\ No newline at end of file
+        # 3. Zapasy i ścieżka krytyczna (zapas swobodny zależy od ES następników - liczymy dla wszystkich)
+        graph.store(es, ef, ls, lf, project_duration)
+        return {t.task_id: t for t in tasks}
@@ -0,0 +1,52 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from apps.projects.domain.services import CPMService, CPMNode
+
+
+class Command(BaseCommand):
+    help = 'Benchmark CPMService na losowych grafach DAG o rosnącym rozmiarze'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=str, default='1000,10000,100000',
+            help='Liczby węzłów oddzielone przecinkami'
+        )
+        parser.add_argument('--edges-per-node', type=float, default=3.0, help='Średnia liczba poprzedników węzła')
+        parser.add_argument('--chain', action='store_true', help='Dodatkowo jeden długi łańcuch (test głębokości)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        service = CPMService()
+
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            nodes = self._random_dag(rng, size, options['edges_per_node'], options['chain'])
+            edges = sum(len(n.dependencies) for n in nodes)
+
+            start = time.perf_counter()
+            result = service.calculate_critical_path(nodes)
+            elapsed = time.perf_counter() - start
+
+            critical = sum(1 for n in result.values() if n.is_critical)
+            self.stdout.write(
+                f"{size:>9} węzłów, {edges:>9} krawędzi: {elapsed * 1000:8.1f} ms "
+                f"(krytycznych: {critical})"
+            )
+
+    @staticmethod
+    def _random_dag(rng: random.Random, size: int, edges_per_node: float, chain: bool):
+        """DAG: poprzednicy zawsze z mniejszym indeksem; ID przetasowane, żeby kolejność wejścia nie pomagała."""
+        ids = list(range(1, size + 1))
+        rng.shuffle(ids)
+
+        nodes = []
+        for i in range(size):
+            k = min(i, int(rng.expovariate(1 / edges_per_node))) if i and edges_per_node > 0 else 0
+            dependencies = [ids[j] for j in rng.sample(range(i), k)] if k else []
+            if chain and i:
+                dependencies.append(ids[i - 1])
+            nodes.append(CPMNode(task_id=ids[i], duration=rng.randint(5, 240), dependencies=dependencies))
+
+        rng.shuffle(nodes)
+        return nodes
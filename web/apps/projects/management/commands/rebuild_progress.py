@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.projects.services.progress_service import ProgressService
+
+
+class Command(BaseCommand):
+    help = 'Przelicza od zera liczniki postępu projektów i celów (total_tasks / done_tasks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Tylko sprawdź spójność liczników (bez zapisu); kod wyjścia != 0 przy rozbieżnościach'
+        )
+
+    def handle(self, *args, **options):
+        service = ProgressService()
+
+        if options['check']:
+            problems = service.check()
+            for problem in problems:
+                self.stdout.write(f"- {problem}")
+            if problems:
+                raise CommandError(f'Niespójne liczniki postępu: {len(problems)}. Napraw: manage.py rebuild_progress')
+            self.stdout.write(self.style.SUCCESS('Liczniki postępu są spójne.'))
+            return
+
+        with transaction.atomic():
+            fixed = service.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Przeliczono liczniki postępu (poprawiono {fixed} wierszy).'))
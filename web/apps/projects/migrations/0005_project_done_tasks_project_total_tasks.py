@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_alter_project_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="done_tasks",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="total_tasks",
+            field=models.IntegerField(default=0),
+        ),
+    ]
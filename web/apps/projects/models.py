@@ -45,7 +45,51 @@ class Project(models.Model):
 
     tags = models.ManyToManyField('contexts.Tag', blank=True, related_name='projects')
 
+    # Liczniki postępu (utrzymywane przyrostowo przez ProgressService; `manage.py rebuild_progress`)
+    total_tasks = models.IntegerField(default=0)
+    done_tasks = models.IntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    # Pola, których stan sprzed zapisu widzą receivery (stary cel - przeliczenie liczników celów)
+    TRACKED_FIELDS = ('goal_id',)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_tracked(kwargs.get('fields'))
+
+    def _remember_tracked(self, update_fields=None):
+        """Migawka TRACKED_FIELDS "jak w bazie" (brak, jeśli któreś pole jest odroczone)."""
+        if any(f not in self.__dict__ for f in self.TRACKED_FIELDS):
+            self._loaded_values = None
+        elif update_fields is None or getattr(self, '_loaded_values', None) is None:
+            self._loaded_values = {f: self.__dict__[f] for f in self.TRACKED_FIELDS}
+        else:
+            # Zapisana / odświeżona tylko część pól - reszta migawki bez zmian
+            for f in self.TRACKED_FIELDS:
+                if f in update_fields or self._meta.get_field(f).name in update_fields:
+                    self._loaded_values[f] = self.__dict__[f]
+
+    def save(self, *args, **kwargs):
+        # Liczniki zmienia tylko ProgressService (UPDATE z F()) - zwykły zapis ich nie nadpisuje
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('total_tasks', 'done_tasks')
+            ]
+        super().save(*args, **kwargs)
+        self._remember_tracked(kwargs.get('update_fields'))
+
+    @property
+    def progress(self) -> int:
+        """Postęp w procentach (0-100) z liczników - bez zapytania o zadania."""
+        return int((self.done_tasks / self.total_tasks) * 100) if self.total_tasks > 0 else 0
\ No newline at end of file
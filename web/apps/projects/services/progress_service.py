@@ -0,0 +1,138 @@
+# apps/projects/services/progress_service.py
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.lookups import GreaterThan
+from apps.goals.models import Goal
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+
+def _progress(total, done):
+    """Wyrażenie SQL: done * 100 / total (całkowicie, jak int() w Pythonie), 0 dla pustych."""
+    return Case(
+        When(GreaterThan(total, 0), then=done * 100 / total),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+class ProgressService:
+    """
+    Zmaterializowany postęp projektów i celów: liczniki total_tasks / done_tasks.
+
+    Zapis zadania przesuwa liczniki o deltę (UPDATE ... SET x = x + delta, w tej samej
+    transakcji co zapis), więc odczyt postępu to O(1) zamiast agregacji po wszystkich zadaniach.
+    Cel liczy zadania ze wszystkich swoich projektów (jak wcześniejsza agregacja project__goal).
+    rebuild() / check() - przeliczenie od zera i kontrola spójności (manage.py rebuild_progress).
+    """
+
+    def apply_task_change(
+            self,
+            old: Optional[Tuple[Optional[int], bool]],
+            new: Optional[Tuple[Optional[int], bool]]
+        ):
+        """
+        old / new - (project_id, is_done) zadania przed i po zmianie; None = zadania nie było
+        (utworzenie) / już nie ma (usunięcie).
+        """
+        deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        if old and old[0]:
+            deltas[old[0]][0] -= 1
+            deltas[old[0]][1] -= int(old[1])
+        if new and new[0]:
+            deltas[new[0]][0] += 1
+            deltas[new[0]][1] += int(new[1])
+
+        self.apply_deltas(deltas)
+
+    def apply_deltas(self, deltas: Dict[int, List[int]]):
+        """
+        Zbiorcze przesunięcie liczników: {project_id: [delta_total, delta_done]}
+        (np. po bulk_create, które omija sygnały).
+        """
+        for project_id, (total_delta, done_delta) in deltas.items():
+            if not total_delta and not done_delta:
+                continue
+            Project.objects.filter(id=project_id).update(
+                total_tasks=F('total_tasks') + total_delta,
+                done_tasks=F('done_tasks') + done_delta,
+            )
+            # Prawe strony SET widzą wartości sprzed UPDATE - postęp liczymy z (stare + delta)
+            total, done = F('total_tasks') + total_delta, F('done_tasks') + done_delta
+            Goal.objects.filter(projects__id=project_id).update(
+                total_tasks=total,
+                done_tasks=done,
+                progress=_progress(total, done),
+            )
+
+    # --- Przeliczenie od zera / kontrola spójności ---
+
+    def expected_project_counters(self, project_ids: Optional[Iterable[int]] = None) -> Dict[int, Tuple[int, int]]:
+        qs = Project.objects.all()
+        if project_ids is not None:
+            qs = qs.filter(id__in=project_ids)
+        return {
+            row['id']: (row['total'], row['done'])
+            for row in qs.values('id').annotate(
+                total=Count('tasks'), done=Count('tasks', filter=Q(tasks__status='done'))
+            )
+        }
+
+    def expected_goal_counters(self, goal_ids: Optional[Iterable[int]] = None) -> Dict[int, Tuple[int, int]]:
+        qs = Goal.objects.all()
+        if goal_ids is not None:
+            qs = qs.filter(id__in=goal_ids)
+        return {
+            row['id']: (row['total'], row['done'])
+            for row in qs.values('id').annotate(
+                total=Count('projects__tasks'),
+                done=Count('projects__tasks', filter=Q(projects__tasks__status='done')),
+            )
+        }
+
+    def check(self) -> List[str]:
+        """Rozbieżności między licznikami a stanem zadań (pusta lista = spójne)."""
+        problems = []
+        expected = self.expected_project_counters()
+        for pid, total, done in Project.objects.values_list('id', 'total_tasks', 'done_tasks'):
+            if (total, done) != expected.get(pid, (0, 0)):
+                problems.append(f"Projekt {pid}: zapisane {total}/{done}, faktycznie {expected.get(pid)}")
+
+        expected = self.expected_goal_counters()
+        for gid, total, done, progress in Goal.objects.values_list('id', 'total_tasks', 'done_tasks', 'progress'):
+            real_total, real_done = expected.get(gid, (0, 0))
+            real_progress = int((real_done / real_total) * 100) if real_total > 0 else 0
+            if (total, done, progress) != (real_total, real_done, real_progress):
+                problems.append(
+                    f"Cel {gid}: zapisane {total}/{done} ({progress}%), "
+                    f"faktycznie {real_total}/{real_done} ({real_progress}%)"
+                )
+        return problems
+
+    def rebuild(self, project_ids: Optional[Iterable[int]] = None, goal_ids: Optional[Iterable[int]] = None) -> int:
+        """Przelicza liczniki od zera (None = wszystkie). Zwraca liczbę poprawionych wierszy."""
+        fixed = 0
+
+        projects = []
+        expected = self.expected_project_counters(project_ids)
+        for project in Project.objects.filter(id__in=expected.keys()).only('id', 'total_tasks', 'done_tasks'):
+            total, done = expected[project.id]
+            if (project.total_tasks, project.done_tasks) != (total, done):
+                project.total_tasks, project.done_tasks = total, done
+                projects.append(project)
+        Project.objects.bulk_update(projects, ['total_tasks', 'done_tasks'])
+        fixed += len(projects)
+
+        goals = []
+        expected = self.expected_goal_counters(goal_ids)
+        for goal in Goal.objects.filter(id__in=expected.keys()).only('id', 'total_tasks', 'done_tasks', 'progress'):
+            total, done = expected[goal.id]
+            progress = int((done / total) * 100) if total > 0 else 0
+            if (goal.total_tasks, goal.done_tasks, goal.progress) != (total, done, progress):
+                goal.total_tasks, goal.done_tasks, goal.progress = total, done, progress
+                goals.append(goal)
+        Goal.objects.bulk_update(goals, ['total_tasks', 'done_tasks', 'progress'])
+        fixed += len(goals)
+
+        return fixed
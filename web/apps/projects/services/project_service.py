@@ -1,38 +1,106 @@
 # apps/projects/services/project_service.py
+from collections import defaultdict
+from typing import Iterable, Optional
 from apps.tasks.models import Task
-from apps.projects.domain.services import CPMService, CPMNode
+from apps.projects.domain.services import CPMService, CPMNode, CPMCycleError
+
+
+CPM_FIELDS = ['cpm_es', 'cpm_ef', 'cpm_ls', 'cpm_lf', 'is_critical_path']
 
 
 class ProjectService:
-    def recalculate_cpm(self, project_id: int):
-        # 1. Pobierz zadania projektu
-        tasks = Task.objects.filter(project_id=project_id, status__in=['todo', 'scheduled', 'blocked', 'inbox'])
-        if not tasks: return
+    def recalculate_cpm(self, project_id: int, changed_task_ids: Optional[Iterable[int]] = None):
+        """
+        Przelicza ścieżkę krytyczną projektu.
+        changed_task_ids - zadania, których czas trwania/status/krawędzie się zmieniły:
+        wtedy propagujemy zmiany tylko przez dotknięty podgraf (na bazie zapisanych cpm_*).
+        None = pełne przeliczenie.
+        """
+        # 1. Pobierz zadania projektu (jedno zapytanie, tylko potrzebne kolumny)
+        rows = list(Task.objects.filter(project_id=project_id, status__in=Task.CPM_STATUSES).values_list(
+            'id', 'user_id', 'duration_min', 'duration_max', *CPM_FIELDS
+        ))
+        if not rows: return
+
+        task_ids = {row[0] for row in rows}
+        dirty = set(changed_task_ids) if changed_task_ids is not None else None
+
+        # 2. Krawędzie (jedno zapytanie). Obejmujemy też zadania, które właśnie wypadły z projektu/grafu,
+        # żeby oznaczyć ich byłych sąsiadów jako brudnych.
+        edge_sources = task_ids | dirty if dirty else task_ids
+        edges = Task.blocked_by.through.objects.filter(from_task_id__in=edge_sources).values_list(
+            'from_task_id', 'to_task_id'
+        )
+        dependencies = defaultdict(list)
+        for task_id, blocker_id in edges:
+            if task_id in task_ids:
+                dependencies[task_id].append(blocker_id)
+                if dirty is not None and blocker_id in dirty and blocker_id not in task_ids:
+                    dirty.add(task_id)  # Następnik usuniętego węzła
+            elif dirty is not None and blocker_id in task_ids:
+                dirty.add(blocker_id)  # Poprzednik usuniętego węzła
 
-        # 2. Konwersja na nody CPM
+        # 3. Konwersja na nody CPM
         nodes = []
-        for t in tasks:
+        stored = {}
+        owners = {}
+        for task_id, user_id, duration_min, duration_max, es, ef, ls, lf, is_critical in rows:
             # duration w minutach
-            duration = t.duration_max or t.duration_min or 30
-            # dependencies (pobieramy ID)
-            deps = list(t.blocked_by.values_list('id', flat=True))
+            duration = duration_max or duration_min or 30
+            nodes.append(CPMNode(
+                task_id=task_id, duration=duration, dependencies=dependencies[task_id],
+                es=es, ef=ef, ls=ls, lf=lf, is_critical=is_critical
+            ))
+            stored[task_id] = (es, ef, ls, lf, is_critical)
+            owners[task_id] = user_id
 
-            nodes.append(CPMNode(task_id=t.id, duration=duration, dependencies=deps))
-
-        # 3. Oblicz CPM
+        # 4. Oblicz CPM (przyrostowo, jeśli mamy kompletny poprzedni wynik)
         cpm_service = CPMService()
-        result_map = cpm_service.calculate_critical_path(nodes)
+        has_previous = dirty is not None and all(
+            None not in values[:4] for task_id, values in stored.items() if task_id not in dirty
+        )
+
+        try:
+            if has_previous:
+                # Usunięte z grafu zadania mogły wyznaczać koniec projektu - bierzemy ich zapisany EF
+                removed_ids = dirty - task_ids
+                previous_efs = [values[1] for values in stored.values() if values[1] is not None]
+                if removed_ids:
+                    previous_efs += [
+                        ef for ef in Task.objects.filter(id__in=removed_ids).values_list('cpm_ef', flat=True)
+                        if ef is not None
+                    ]
+                result_map = cpm_service.update_critical_path(
+                    nodes, dirty, previous_duration=max(previous_efs, default=0)
+                )
+            else:
+                result_map = cpm_service.calculate_critical_path(nodes)
+        except CPMCycleError as e:
+            # Cykl w zależnościach - nie wpisujemy błędnych wartości; czyścimy zapisane cpm_*,
+            # żeby po usunięciu cyklu policzyć projekt od zera
+            print(f"CPM: Projekt {project_id} - {e}")
+            Task.objects.filter(id__in=task_ids).update(cpm_es=None, cpm_ef=None, cpm_ls=None, cpm_lf=None)
+            return
 
-        # 4. Zapisz wyniki w bazie (Bulk Update dla wydajności)
+        # 5. Zapisz tylko zmienione wiersze (Bulk Update dla wydajności)
         tasks_to_update = []
-        for t in tasks:
-            node = result_map.get(t.id)
-            if node:
-                is_crit = node.is_critical
-                if t.is_critical_path != is_crit:
-                    t.is_critical_path = is_crit
-                    tasks_to_update.append(t)
+        flag_owners = set()
+        for task_id, node in result_map.items():
+            values = (node.es, node.ef, node.ls, node.lf, node.is_critical)
+            if values != stored[task_id]:
+                tasks_to_update.append(Task(
+                    id=task_id, cpm_es=node.es, cpm_ef=node.ef, cpm_ls=node.ls, cpm_lf=node.lf,
+                    is_critical_path=node.is_critical
+                ))
+                if node.is_critical != stored[task_id][4]:
+                    flag_owners.add(owners[task_id])
 
         if tasks_to_update:
-            Task.objects.bulk_update(tasks_to_update, ['is_critical_path'])
-            print(f"CPM: Zaktualizowano {len(tasks_to_update)} zadań w projekcie {project_id}")
\ No newline at end of file
+            Task.objects.bulk_update(tasks_to_update, CPM_FIELDS)
+            print(f"CPM: Zaktualizowano {len(tasks_to_update)} zadań w projekcie {project_id}")
+
+        # bulk_update omija post_save - plany w cache trzymają is_critical_path (bonus CPM w scoringu)
+        if flag_owners:
+            from apps.calendar_app.application.plan_cache import invalidate_user_plans
+            for user_id in flag_owners:
+                invalidate_user_plans(user_id)
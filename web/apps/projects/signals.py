@@ -0,0 +1,34 @@
+# apps/projects/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Project
+from .services.progress_service import ProgressService
+
+
+# Liczniki celu to suma liczników jego projektów - przepięcie/usunięcie projektu
+# przelicza dotknięte cele od zera (rzadkie operacje, więc pełna agregacja jest w porządku).
+
+@receiver(pre_save, sender=Project)
+def remember_project_goal(sender, instance, **kwargs):
+    instance._old_goal_id = None
+    if instance.pk:
+        loaded = getattr(instance, '_loaded_values', None)
+        if loaded is not None and not instance._state.adding:
+            instance._old_goal_id = loaded['goal_id']  # Migawka z odczytu - bez zapytania
+        else:
+            # Instancja zbudowana ręcznie albo z odroczonym goal - jedno zapytanie
+            instance._old_goal_id = Project.objects.filter(pk=instance.pk).values_list('goal_id', flat=True).first()
+
+
+@receiver(post_save, sender=Project)
+def move_project_progress(sender, instance, created, **kwargs):
+    old_goal_id = getattr(instance, '_old_goal_id', None)
+    if old_goal_id != instance.goal_id:
+        ProgressService().rebuild(project_ids=[], goal_ids=[g for g in (old_goal_id, instance.goal_id) if g])
+
+
+@receiver(post_delete, sender=Project)
+def remove_project_progress(sender, instance, **kwargs):
+    # Zadania projektu zostają (SET_NULL przez .update(), bez sygnałów) - cel traci je w całości
+    if instance.goal_id:
+        ProgressService().rebuild(project_ids=[], goal_ids=[instance.goal_id])
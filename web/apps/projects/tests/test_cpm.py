@@ -0,0 +1,181 @@
+import copy
+import random
+
+from django.test import SimpleTestCase
+
+from apps.projects.domain.services import SMALL_GRAPH_NODES, CPMCycleError, CPMNode, CPMService
+
+
+FIELDS = ('es', 'ef', 'ls', 'lf', 'float_val', 'is_critical', 'free_float')
+
+
+def values(result):
+    return {task_id: tuple(getattr(node, f) for f in FIELDS) for task_id, node in result.items()}
+
+
+def random_dag(rng: random.Random, size: int, edges_per_node: float = 2.0, chain: bool = False,
+               increasing_ids: bool = False):
+    """Poprzednicy zawsze z mniejszym indeksem; ID z lukami, przetasowane (albo rosnące wzdłuż krawędzi)."""
+    ids = rng.sample(range(1, 5 * size), size)
+    if increasing_ids:
+        ids.sort()
+    nodes = []
+    for i in range(size):
+        k = min(i, int(rng.expovariate(1 / edges_per_node))) if i else 0
+        dependencies = [ids[j] for j in rng.sample(range(i), k)] if k else []
+        if chain and i:
+            dependencies.append(ids[i - 1])
+        nodes.append(CPMNode(task_id=ids[i], duration=rng.randint(5, 240), dependencies=dependencies))
+    rng.shuffle(nodes)
+    return nodes
+
+
+class CalculateCriticalPathTest(SimpleTestCase):
+    """Pełne przeliczenie: ES/EF/LS/LF, zapasy i cykle."""
+
+    def setUp(self):
+        #  A(3) -> B(2) -> D(4)
+        #  A(3) -> C(1) -> D(4)
+        #          C(1) -> E(2)
+        self.nodes = [
+            CPMNode(task_id=1, duration=3, dependencies=[]),
+            CPMNode(task_id=2, duration=2, dependencies=[1]),
+            CPMNode(task_id=3, duration=1, dependencies=[1]),
+            CPMNode(task_id=4, duration=4, dependencies=[2, 3]),
+            CPMNode(task_id=5, duration=2, dependencies=[3, 99]),  # 99 - spoza grafu, pomijane
+        ]
+
+    def test_schedule_and_floats(self):
+        result = CPMService().calculate_critical_path(self.nodes)
+
+        self.assertEqual(values(result), {
+            #   es  ef  ls  lf  float crit   free
+            1: (0, 3, 0, 3, 0, True, 0),
+            2: (3, 5, 3, 5, 0, True, 0),
+            3: (3, 4, 4, 5, 1, False, 0),  # E startuje zaraz po C
+            4: (5, 9, 5, 9, 0, True, 0),
+            5: (4, 6, 7, 9, 3, False, 3),  # Zadanie końcowe: zapas swobodny do końca projektu
+        })
+
+    def test_empty_graph(self):
+        self.assertEqual(CPMService().calculate_critical_path([]), {})
+
+    def test_cycle_raises_with_cycle_ids(self):
+        self.nodes[0].dependencies = [4]  # D -> A zamyka cykl A -> B/C -> D -> A
+
+        with self.assertRaises(CPMCycleError) as ctx:
+            CPMService().calculate_critical_path(self.nodes)
+
+        cycle = ctx.exception.cycle
+        self.assertIn(cycle, ([1, 2, 4], [2, 4, 1], [4, 1, 2], [1, 3, 4], [3, 4, 1], [4, 1, 3]))
+        # Każdy element cyklu zależy od poprzedniego
+        dependencies = {n.task_id: n.dependencies for n in self.nodes}
+        for before, after in zip(cycle, cycle[1:] + cycle[:1]):
+            self.assertIn(before, dependencies[after])
+
+    def test_self_dependency_is_cycle(self):
+        self.nodes[2].dependencies = [3]
+        with self.assertRaises(CPMCycleError) as ctx:
+            CPMService().calculate_critical_path(self.nodes)
+        self.assertEqual(ctx.exception.cycle, [3])
+
+    def test_large_graph_matches_small_path(self):
+        # Ścieżka NumPy (poziomami i z przejściem na pętlę dla głębokich grafów) = ścieżka na listach
+        rng = random.Random(7)
+        for chain in (False, True):
+            with self.subTest(chain=chain):
+                nodes = random_dag(rng, SMALL_GRAPH_NODES + 500, chain=chain)
+                expected = values(CPMService._calculate_small(copy.deepcopy(nodes)))
+                self.assertEqual(values(CPMService().calculate_critical_path(nodes)), expected)
+
+    def test_large_graph_cycle(self):
+        nodes = random_dag(random.Random(3), SMALL_GRAPH_NODES + 500, chain=True)
+        by_id = {n.task_id: n for n in nodes}
+        first = next(n for n in nodes if not n.dependencies)
+        last = next(n for n in nodes if n.task_id not in {d for m in nodes for d in m.dependencies})
+        first.dependencies = [last.task_id]
+
+        with self.assertRaises(CPMCycleError) as ctx:
+            CPMService().calculate_critical_path(nodes)
+
+        cycle = ctx.exception.cycle
+        for before, after in zip(cycle, cycle[1:] + cycle[:1]):
+            self.assertIn(before, by_id[after].dependencies)
+
+
+class UpdateCriticalPathTest(SimpleTestCase):
+    """Przeliczenie przyrostowe daje to samo co pełne przeliczenie po tej samej zmianie."""
+
+    def edit(self, rng: random.Random, nodes):
+        """Losowa zmiana grafu; zwraca (węzły, brudne ID, poprzedni czas trwania projektu)."""
+        previous_duration = max(n.ef for n in nodes)
+        dirty = set()
+        for _ in range(rng.randint(1, 4)):
+            kind = rng.choice(('duration', 'add_edge', 'remove_edge', 'remove_node', 'new_node'))
+            position = {n.task_id: i for i, n in enumerate(nodes)}
+            node = rng.choice(nodes)
+            if kind == 'duration':
+                node.duration = rng.randint(5, 240)
+                dirty.add(node.task_id)
+            elif kind == 'add_edge':
+                # Tylko do większego ID - graf zostaje acykliczny
+                later = [n for n in nodes if n.task_id > node.task_id]
+                if later:
+                    target = rng.choice(later)
+                    target.dependencies.append(node.task_id)
+                    dirty.update((node.task_id, target.task_id))
+            elif kind == 'remove_edge' and node.dependencies:
+                blocker = node.dependencies.pop(rng.randrange(len(node.dependencies)))
+                dirty.update((node.task_id, blocker))
+            elif kind == 'remove_node' and len(nodes) > 2:
+                nodes.pop(position[node.task_id])
+                dirty.update(node.dependencies)
+                for other in nodes:
+                    if node.task_id in other.dependencies:
+                        other.dependencies.remove(node.task_id)
+                        dirty.add(other.task_id)
+            elif kind == 'new_node':
+                task_id = max(position) + 1
+                blockers = rng.sample([n.task_id for n in nodes], min(len(nodes), rng.randint(0, 2)))
+                nodes.append(CPMNode(
+                    task_id=task_id, duration=rng.randint(5, 240), dependencies=blockers,
+                    es=None, ef=None, ls=None, lf=None,
+                ))
+                dirty.add(task_id)
+                dirty.update(blockers)
+        return nodes, dirty, previous_duration
+
+    def test_matches_full_recompute(self):
+        rng = random.Random(11)
+        service = CPMService()
+        for size in (3, 20, 200):
+            for attempt in range(30):
+                with self.subTest(size=size, attempt=attempt):
+                    # ID rosną wzdłuż krawędzi - nowa krawędź od mniejszego do większego ID nie tworzy cyklu
+                    nodes = random_dag(rng, size, increasing_ids=True)
+                    service.calculate_critical_path(nodes)
+
+                    nodes, dirty, previous_duration = self.edit(rng, nodes)
+                    expected = values(service.calculate_critical_path(copy.deepcopy(nodes)))
+                    result = service.update_critical_path(nodes, dirty, previous_duration=previous_duration)
+
+                    self.assertEqual(values(result), expected)
+
+    def test_unchanged_graph_keeps_values(self):
+        nodes = random_dag(random.Random(5), 100)
+        service = CPMService()
+        expected = values(service.calculate_critical_path(nodes))
+
+        self.assertEqual(values(service.update_critical_path(nodes, set())), expected)
+
+    def test_cycle_raises(self):
+        nodes = [
+            CPMNode(task_id=1, duration=5, dependencies=[]),
+            CPMNode(task_id=2, duration=5, dependencies=[1]),
+        ]
+        service = CPMService()
+        service.calculate_critical_path(nodes)
+        nodes[0].dependencies.append(2)
+
+        with self.assertRaises(CPMCycleError):
+            service.update_critical_path(nodes, {1, 2})
@@ -0,0 +1,147 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.goals.models import Goal
+from apps.projects.models import Project
+from apps.projects.services.progress_service import ProgressService
+from apps.tasks.models import Task
+
+
+# Odczyt starego celu w remember_project_goal (gdy brak migawki)
+GOAL_SNAPSHOT_SQL = 'SELECT "projects_project"."goal_id" AS "goal_id" FROM "projects_project"'
+
+
+class ProgressCountersTest(TestCase):
+    """Liczniki postępu projektów i celów przesuwane o deltę przy zapisie zadań i projektów."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='progress')
+        self.goal = Goal.objects.create(user=self.user, title='Cel A')
+        self.other_goal = Goal.objects.create(user=self.user, title='Cel B')
+        self.project = Project.objects.create(user=self.user, title='Projekt 1', goal=self.goal)
+        self.second = Project.objects.create(user=self.user, title='Projekt 2', goal=self.goal)
+        self.other = Project.objects.create(user=self.user, title='Projekt 3', goal=self.other_goal)
+
+    def task(self, project=None, status='todo'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(user=self.user, title='Zadanie', project=project or self.project, status=status)
+
+    def save(self, obj):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.save()
+
+    def counters(self):
+        projects = dict(
+            (pid, (total, done)) for pid, total, done in
+            Project.objects.values_list('id', 'total_tasks', 'done_tasks')
+        )
+        goals = dict(
+            (gid, (total, done, progress)) for gid, total, done, progress in
+            Goal.objects.values_list('id', 'total_tasks', 'done_tasks', 'progress')
+        )
+        self.assertEqual(ProgressService().check(), [])
+        return projects, goals
+
+    def test_create_and_status_flip(self):
+        first = self.task()
+        self.task(project=self.second, status='done')
+        self.task(project=self.other)
+
+        projects, goals = self.counters()
+        self.assertEqual(
+            (projects[self.project.id], projects[self.second.id], projects[self.other.id]), ((1, 0), (1, 1), (1, 0))
+        )
+        self.assertEqual((goals[self.goal.id], goals[self.other_goal.id]), ((2, 1, 50), (1, 0, 0)))
+
+        first.status = 'done'
+        self.save(first)
+        projects, goals = self.counters()
+        self.assertEqual((projects[self.project.id], goals[self.goal.id]), ((1, 1), (2, 2, 100)))
+
+        first.status = 'todo'
+        self.save(first)
+        projects, goals = self.counters()
+        self.assertEqual((projects[self.project.id], goals[self.goal.id]), ((1, 0), (2, 1, 50)))
+
+    def test_task_moved_between_projects(self):
+        task = self.task(status='done')
+
+        task.project = self.other
+        self.save(task)
+
+        projects, goals = self.counters()
+        self.assertEqual((projects[self.project.id], projects[self.other.id]), ((0, 0), (1, 1)))
+        self.assertEqual((goals[self.goal.id], goals[self.other_goal.id]), ((0, 0, 0), (1, 1, 100)))
+
+        task.project = None
+        self.save(task)
+        projects, goals = self.counters()
+        self.assertEqual((projects[self.other.id], goals[self.other_goal.id]), ((0, 0), (0, 0, 0)))
+
+    def test_task_deleted(self):
+        done = self.task(status='done')
+        self.task()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            done.delete()
+
+        projects, goals = self.counters()
+        self.assertEqual((projects[self.project.id], goals[self.goal.id]), ((1, 0), (1, 0, 0)))
+
+    def test_project_moved_between_goals(self):
+        self.task(status='done')
+        self.task(project=self.second)
+        self.task(project=self.other)
+
+        self.project.goal = self.other_goal
+        self.save(self.project)
+
+        projects, goals = self.counters()
+        self.assertEqual((goals[self.goal.id], goals[self.other_goal.id]), ((1, 0, 0), (2, 1, 50)))
+
+        self.second.goal = None
+        self.save(self.second)
+        projects, goals = self.counters()
+        self.assertEqual(goals[self.goal.id], (0, 0, 0))
+
+    def test_project_deleted(self):
+        self.task(status='done')
+        self.task(project=self.second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+
+        projects, goals = self.counters()
+        self.assertEqual(goals[self.goal.id], (1, 0, 0))
+
+    def test_project_save_reads_no_goal_snapshot(self):
+        project = Project.objects.get(pk=self.project.pk)
+        project.title = 'Nowa nazwa'
+
+        with CaptureQueriesContext(connection) as queries:
+            self.save(project)
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith(GOAL_SNAPSHOT_SQL)])
+
+        # Zmiana celu na tej samej instancji - stary cel z odświeżonej migawki
+        self.task(project=project)
+        project.goal = self.other_goal
+        with CaptureQueriesContext(connection) as queries:
+            self.save(project)
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith(GOAL_SNAPSHOT_SQL)])
+        projects, goals = self.counters()
+        self.assertEqual((goals[self.goal.id], goals[self.other_goal.id]), ((0, 0, 0), (1, 0, 0)))
+
+    def test_project_without_snapshot_reads_goal_once(self):
+        self.task()
+        loaded = Project.objects.get(pk=self.project.pk)
+        project = Project(**{f.attname: getattr(loaded, f.attname) for f in Project._meta.concrete_fields})
+        project.goal = self.other_goal
+
+        with CaptureQueriesContext(connection) as queries:
+            self.save(project)
+
+        self.assertEqual(len([q for q in queries.captured_queries if q['sql'].startswith(GOAL_SNAPSHOT_SQL)]), 1)
+        projects, goals = self.counters()
+        self.assertEqual((goals[self.goal.id], goals[self.other_goal.id]), ((0, 0, 0), (1, 0, 0)))
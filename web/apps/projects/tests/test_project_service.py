@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.calendar_app.application.plan_cache import get_plan_cache
+from apps.projects.models import Project
+from apps.projects.services.project_service import ProjectService
+from apps.tasks.models import Task
+
+
+class RecalculateCpmPlanCacheTest(TestCase):
+    """Zbiorczy zapis cpm_* omija sygnały - zmiana flag ścieżki krytycznej musi unieważnić plany."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='cpm-cache')
+        self.project = Project.objects.create(user=self.user, title='Projekt')
+        first = Task.objects.create(user=self.user, project=self.project, title='A', status='todo', duration_min=60)
+        second = Task.objects.create(user=self.user, project=self.project, title='B', status='todo', duration_min=30)
+        Task.objects.create(user=self.user, project=self.project, title='C', status='todo', duration_min=15)
+        second.blocked_by.add(first)
+
+    def plan_key(self):
+        return get_plan_cache().make_key(self.user.id, date(2025, 3, 10), 'day', None)
+
+    def test_changed_critical_flags_invalidate_plans(self):
+        # Flagi "z przeszłości" ustawione z pominięciem sygnałów
+        Task.objects.filter(project=self.project).update(is_critical_path=False)
+        key = self.plan_key()
+
+        ProjectService().recalculate_cpm(self.project.id)
+
+        self.assertEqual(
+            set(Task.objects.filter(project=self.project, is_critical_path=True).values_list('title', flat=True)),
+            {'A', 'B'},
+        )
+        self.assertNotEqual(self.plan_key(), key)
+
+    def test_unchanged_flags_keep_plans(self):
+        ProjectService().recalculate_cpm(self.project.id)
+        key = self.plan_key()
+
+        ProjectService().recalculate_cpm(self.project.id)
+
+        self.assertEqual(self.plan_key(), key)
@@ -28,10 +28,8 @@ def project_detail_view(request, pk):
     # Pobierz zadania tego projektu
     tasks = project.tasks.all().order_by('is_critical_path', '-priority')
 
-    # Oblicz postęp (Prosty wariant, później użyjemy serwisu domenowego)
-    total = tasks.count()
-    completed = tasks.filter(status='done').count()
-    progress = int((completed / total) * 100) if total > 0 else 0
+    # Postęp z liczników projektu (ProgressService) - bez zliczania zadań
+    progress = project.progress
 
     # --- NOWE: Pobierz notatki ---
     # Używamy related_name='notes' zdefiniowanego w modelu Note
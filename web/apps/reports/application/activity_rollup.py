@@ -0,0 +1,223 @@
+# apps/reports/application/activity_rollup.py
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+
+
+RollupKey = Tuple[int, date]  # (user_id, dzień)
+
+
+@dataclass
+class RollupDelta:
+    """Przyrost dziennego podsumowania - wynik zliczenia wpisów logu jednego użytkownika z jednego dnia."""
+    created: int = 0
+    completed: int = 0
+    status_changes: int = 0
+    minutes_completed: int = 0
+    minutes_by_area: Counter = field(default_factory=Counter)
+    minutes_by_context: Counter = field(default_factory=Counter)
+
+    def add(self, action_type: str, details: Optional[dict]):
+        from apps.reports.models import ActivityLog
+
+        if action_type == ActivityLog.ActionType.CREATED:
+            self.created += 1
+        elif action_type == ActivityLog.ActionType.STATUS_CHANGE:
+            self.status_changes += 1
+        elif action_type == ActivityLog.ActionType.COMPLETED:
+            self.completed += 1
+            details = details or {}
+            minutes = details.get('minutes') or 0
+            self.minutes_completed += minutes
+            # Klucze JSON są stringami - tak samo trzymamy je w Counterach
+            if minutes and details.get('area_id'):
+                self.minutes_by_area[str(details['area_id'])] += minutes
+            if minutes and details.get('context_id'):
+                self.minutes_by_context[str(details['context_id'])] += minutes
+
+    def apply_to(self, rollup):
+        rollup.created += self.created
+        rollup.completed += self.completed
+        rollup.status_changes += self.status_changes
+        rollup.minutes_completed += self.minutes_completed
+        rollup.minutes_by_area = dict(Counter(rollup.minutes_by_area) + self.minutes_by_area)
+        rollup.minutes_by_context = dict(Counter(rollup.minutes_by_context) + self.minutes_by_context)
+
+    def as_values(self) -> tuple:
+        return (
+            self.created, self.completed, self.status_changes, self.minutes_completed,
+            dict(self.minutes_by_area), dict(self.minutes_by_context),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.completed or self.status_changes)
+
+
+class ActivityRollupService:
+    """
+    Dzienne podsumowania ActivityLog (DailyActivityRollup).
+
+    record() - przyrostowo, po dopisaniu wpisów do logu (ActivityLogger.log, bulk_create generatora):
+    wiersz dnia blokowany (SELECT ... FOR UPDATE) i zwiększany o deltę w tej samej transakcji.
+    Minuty ukończonych zadań pochodzą z details wpisu COMPLETED ('minutes', 'area_id', 'context_id'),
+    więc podsumowanie nie zmienia się, gdy zadanie zostanie później edytowane lub usunięte.
+    rebuild() / check() - przeliczenie od zera z logu (manage.py rebuild_activity_rollups).
+    """
+
+    FIELDS = ['created', 'completed', 'status_changes', 'minutes_completed', 'minutes_by_area', 'minutes_by_context']
+
+    @staticmethod
+    def day_of(timestamp) -> date:
+        return timezone.localdate(timestamp)
+
+    def record(self, logs: Iterable):
+        """Dolicza wpisy logu (zapisane instancje ActivityLog) do podsumowań ich dni."""
+        deltas: Dict[RollupKey, RollupDelta] = defaultdict(RollupDelta)
+        for log in logs:
+            deltas[(log.user_id, self.day_of(log.timestamp))].add(log.action_type, log.details)
+        self.apply_deltas(deltas)
+
+    def apply_deltas(self, deltas: Dict[RollupKey, RollupDelta]):
+        """
+        Dolicza przyrosty do podsumowań - stała liczba zapytań niezależnie od liczby dni i użytkowników:
+        brakujące wiersze jednym INSERT, blokada wszystkich naraz, zapis jednym bulk_update.
+        """
+        from apps.reports.application.stats_report import ACTIVITY, invalidate_user_stats
+        from apps.reports.models import DailyActivityRollup
+
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        with transaction.atomic():
+            # ignore_conflicts: wiersz dnia mógł już istnieć (albo właśnie powstać w równoległej transakcji)
+            DailyActivityRollup.objects.bulk_create(
+                [DailyActivityRollup(user_id=user_id, date=day) for user_id, day in deltas],
+                ignore_conflicts=True,
+            )
+            rows = DailyActivityRollup.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in deltas},
+                date__in={day for _, day in deltas},
+            ).order_by('user_id', 'date')  # Stała kolejność blokad
+            rollups = [rollup for rollup in rows if (rollup.user_id, rollup.date) in deltas]
+            for rollup in rollups:
+                deltas[(rollup.user_id, rollup.date)].apply_to(rollup)
+            DailyActivityRollup.objects.bulk_update(rollups, self.FIELDS)
+
+        # bulk_update omija post_save - sekcje aktywności w StatsReport unieważniamy sami
+        for user_id in {user_id for user_id, _ in deltas}:
+            invalidate_user_stats(user_id, ACTIVITY)
+
+    # --- Odczyt ---
+
+    def summary(self, user, start: date, end: date) -> RollupDelta:
+        """Suma podsumowań z dni [start, end] (włącznie)."""
+        from apps.reports.models import DailyActivityRollup
+
+        total = RollupDelta()
+        for rollup in DailyActivityRollup.objects.filter(user=user, date__range=(start, end)):
+            total.created += rollup.created
+            total.completed += rollup.completed
+            total.status_changes += rollup.status_changes
+            total.minutes_completed += rollup.minutes_completed
+            total.minutes_by_area.update(rollup.minutes_by_area)
+            total.minutes_by_context.update(rollup.minutes_by_context)
+        return total
+
+    # --- Przeliczenie od zera / kontrola spójności ---
+
+    def expected(self, user_ids: Optional[Iterable[int]] = None) -> Dict[RollupKey, RollupDelta]:
+        """Podsumowania policzone wprost z logu."""
+        from django.contrib.contenttypes.models import ContentType
+        from apps.reports.models import ActivityLog
+        from apps.tasks.models import Task
+
+        logs = ActivityLog.objects.order_by()
+        if user_ids is not None:
+            logs = logs.filter(user_id__in=user_ids)
+
+        deltas: Dict[RollupKey, RollupDelta] = defaultdict(RollupDelta)
+        legacy = []  # Ukończenia zalogowane bez minut (sprzed podsumowań) - uzupełniamy z zadań
+        task_type_id = ContentType.objects.get_for_model(Task).id
+        rows = logs.values_list('user_id', 'timestamp', 'action_type', 'content_type_id', 'object_id', 'details')
+        for user_id, timestamp, action_type, content_type_id, object_id, details in rows.iterator(chunk_size=2000):
+            if (
+                action_type == ActivityLog.ActionType.COMPLETED
+                and content_type_id == task_type_id
+                and 'minutes' not in (details or {})
+            ):
+                legacy.append((user_id, timestamp, object_id))
+                continue
+            deltas[(user_id, self.day_of(timestamp))].add(action_type, details)
+
+        if legacy:
+            tasks = {
+                task.id: task
+                for task in Task.objects.filter(id__in={object_id for _, _, object_id in legacy})
+                .only('id', 'duration_min', 'duration_max', 'area_id', 'context_id')
+            }
+            for user_id, timestamp, object_id in legacy:
+                task = tasks.get(object_id)
+                details = completion_details(task) if task else {}
+                deltas[(user_id, self.day_of(timestamp))].add(ActivityLog.ActionType.COMPLETED, details)
+
+        return deltas
+
+    def check(self, user_ids: Optional[Iterable[int]] = None) -> List[str]:
+        """Rozbieżności między podsumowaniami a logiem (pusta lista = spójne)."""
+        from apps.reports.models import DailyActivityRollup
+
+        expected = self.expected(user_ids)
+        stored = DailyActivityRollup.objects.all()
+        if user_ids is not None:
+            stored = stored.filter(user_id__in=user_ids)
+
+        problems = []
+        seen = set()
+        for rollup in stored:
+            key = (rollup.user_id, rollup.date)
+            seen.add(key)
+            delta = expected.get(key, RollupDelta())
+            values = tuple(getattr(rollup, f) for f in self.FIELDS)
+            if values != delta.as_values():
+                problems.append(f"Użytkownik {key[0]}, {key[1]}: zapisane {values}, faktycznie {delta.as_values()}")
+        for key, delta in expected.items():
+            if key not in seen and delta:
+                problems.append(f"Użytkownik {key[0]}, {key[1]}: brak podsumowania, faktycznie {delta.as_values()}")
+        return problems
+
+    def rebuild(self, user_ids: Optional[Iterable[int]] = None) -> int:
+        """Odtwarza podsumowania z logu (None = wszyscy użytkownicy). Zwraca liczbę wierszy."""
+        from apps.reports.models import DailyActivityRollup
+
+        user_ids = list(user_ids) if user_ids is not None else None
+
+        # Jedna transakcja: odczyt nigdy nie widzi pustych podsumowań, a błąd w trakcie niczego nie kasuje.
+        # Najpierw DELETE - blokuje wiersze, więc równoległe record() tych dni czeka i dolicza się do nowych
+        with transaction.atomic():
+            stored = DailyActivityRollup.objects.all()
+            if user_ids is not None:
+                stored = stored.filter(user_id__in=user_ids)
+            stored.delete()
+
+            rollups = []
+            for (user_id, day), delta in self.expected(user_ids).items():
+                if not delta:
+                    continue
+                rollup = DailyActivityRollup(user_id=user_id, date=day)
+                delta.apply_to(rollup)
+                rollups.append(rollup)
+            DailyActivityRollup.objects.bulk_create(rollups, batch_size=1000)
+        return len(rollups)
+
+
+def completion_details(task) -> dict:
+    """Dane ukończonego zadania zapisywane we wpisie COMPLETED (na potrzeby podsumowań)."""
+    return {
+        'minutes': task.duration_expected,
+        'area_id': task.area_id,
+        'context_id': task.context_id,
+    }
@@ -0,0 +1,185 @@
+# apps/reports/application/stats_report.py
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from django.core.cache import cache
+from django.utils import timezone
+from apps.core.application.cache_generations import bump_generation
+
+
+# Tematy zmian: zapis w danym obszarze (signals.py) unieważnia sekcje, które od niego zależą
+TASKS = 'tasks'  # zadania, obszary, konteksty
+ACTIVITY = 'activity'  # dzienne podsumowania ActivityLog
+HABITS = 'habits'
+RECURRING = 'recurring'
+
+
+# --- Loadery sekcji: (user, today, deps) -> fragment odpowiedzi. deps = {nazwa zależności: jej wynik}. ---
+
+def _service():
+    from apps.reports.domain.services import ReportService
+    return ReportService()
+
+
+def load_activity(user, today: date, deps: dict) -> dict:
+    return _service().get_activity_stats(user, today)
+
+
+def load_task_groups(user, today: date, deps: dict) -> dict:
+    # Jedno zapytanie grupujące - wspólne dla breakdown, area_chart i context_chart
+    return {'task_groups': _service().get_task_groups(user)}
+
+
+def load_breakdown(user, today: date, deps: dict) -> dict:
+    return {'breakdown': _service().status_breakdown(deps['task_groups']['task_groups'])}
+
+
+def load_area_chart(user, today: date, deps: dict) -> dict:
+    return {'area_chart': _service().area_distribution(deps['task_groups']['task_groups'])}
+
+
+def load_context_chart(user, today: date, deps: dict) -> dict:
+    return {'context_chart': _service().context_distribution(deps['task_groups']['task_groups'])}
+
+
+def load_habit_stats(user, today: date, deps: dict) -> dict:
+    return {'habit_stats': _service().get_habit_stats(user, today)}
+
+
+def load_recurring_stats(user, today: date, deps: dict) -> dict:
+    return {'recurring_stats': _service().get_recurring_health(user)}
+
+
+def load_heatmap(user, today: date, deps: dict) -> dict:
+    return {'heatmap': _service().get_productivity_heatmap(user)}
+
+
+@dataclass(frozen=True)
+class StatsSection:
+    name: str
+    loader: Callable[..., dict]
+    topics: Tuple[str, ...] = ()  # zmiany, po których wynik jest nieaktualny
+    depends_on: Tuple[str, ...] = ()
+    timeout: int = 5 * 60  # 0 = bez cache (tanie sekcje liczone z zależności)
+    public: bool = True  # False - tylko jako zależność, nie trafia do odpowiedzi
+
+
+SECTIONS: List[StatsSection] = [
+    StatsSection('activity', load_activity, topics=(ACTIVITY, TASKS)),
+    StatsSection('task_groups', load_task_groups, topics=(TASKS,), public=False),
+    StatsSection('breakdown', load_breakdown, depends_on=('task_groups',), timeout=0),
+    StatsSection('area_chart', load_area_chart, depends_on=('task_groups',), timeout=0),
+    StatsSection('context_chart', load_context_chart, depends_on=('task_groups',), timeout=0),
+    StatsSection('habit_stats', load_habit_stats, topics=(HABITS,), timeout=10 * 60),
+    StatsSection('recurring_stats', load_recurring_stats, topics=(RECURRING,), timeout=10 * 60),
+    # Okno 30 dni przesuwa się z czasem - krótszy TTL niż dzień z klucza
+    StatsSection('heatmap', load_heatmap, topics=(TASKS,), timeout=15 * 60),
+]
+
+
+class StatsReport:
+    """
+    Dane dashboardu raportów (stats_api_view) składane z sekcji.
+
+    Sekcja deklaruje zależności, tematy zmian i TTL. Wynik każdej cache'owanej sekcji leży
+    w cache pod kluczem (użytkownik, sekcja, generacje jej tematów, dzień) - zapis w danym
+    temacie podbija generację tylko tego tematu (signals.py), więc np. odhaczenie nawyku
+    przelicza habit_stats, a wykresy zadań zostają z cache. Zależności liczone są leniwie:
+    sekcja z cache nie potrzebuje swoich zależności. Breakdown statusów, wykres obszarów
+    i kontekstów pochodzą z jednego zapytania grupującego (task_groups).
+    """
+
+    def __init__(self, sections: List[StatsSection] = SECTIONS, cache_backend=None):
+        self.sections = {section.name: section for section in sections}
+        self.cache = cache_backend or cache
+
+    @property
+    def public_names(self) -> List[str]:
+        return [name for name, section in self.sections.items() if section.public]
+
+    @staticmethod
+    def _generation_key(user_id: int, topic: str) -> str:
+        return f'stats:gen:{user_id}:{topic}'
+
+    def invalidate_user(self, user_id: int, topics: Iterable[str]):
+        for topic in topics:
+            bump_generation(self.cache, self._generation_key(user_id, topic))
+
+    def _topics(self, section: StatsSection) -> Tuple[str, ...]:
+        """Tematy sekcji razem z tematami jej zależności."""
+        topics = set(section.topics)
+        for name in section.depends_on:
+            topics.update(self._topics(self.sections[name]))
+        return tuple(sorted(topics))
+
+    def _needed(self, names: Iterable[str]) -> List[StatsSection]:
+        needed, seen = [], set()
+
+        def visit(name):
+            if name not in seen:
+                seen.add(name)
+                for dependency in self.sections[name].depends_on:
+                    visit(dependency)
+                needed.append(self.sections[name])
+
+        for name in names:
+            visit(name)
+        return needed
+
+    def build(self, user, names: Optional[Iterable[str]] = None, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Odpowiedź JSON z wybranych sekcji (None = wszystkie publiczne).
+        Nieznana albo niepubliczna nazwa sekcji -> ValueError.
+        """
+        names = list(names) if names is not None else self.public_names
+        unknown = [name for name in names if name not in self.sections or not self.sections[name].public]
+        if unknown:
+            raise ValueError(f"Nieznane sekcje: {', '.join(unknown)}")
+
+        today = today or timezone.localdate()
+        needed = self._needed(names)
+
+        # Jeden odczyt generacji i jeden odczyt wyników z cache dla wszystkich sekcji
+        topics = sorted({topic for section in needed for topic in self._topics(section)})
+        generations = self.cache.get_many([self._generation_key(user.id, t) for t in topics])
+        keys = {}
+        for section in needed:
+            if section.timeout != 0:
+                version = '.'.join(str(generations.get(self._generation_key(user.id, t), 0)) for t in self._topics(section))
+                keys[section.name] = f'stats:{user.id}:{section.name}:{version}:{today.isoformat()}'
+        cached = self.cache.get_many(keys.values())
+
+        results: Dict[str, dict] = {}
+
+        def resolve(section: StatsSection) -> dict:
+            if section.name in results:
+                return results[section.name]
+            key = keys.get(section.name)
+            if key in cached:
+                results[section.name] = cached[key]
+            else:
+                deps = {name: resolve(self.sections[name]) for name in section.depends_on}
+                results[section.name] = section.loader(user, today, deps)
+                if key:
+                    self.cache.set(key, results[section.name], section.timeout)
+            return results[section.name]
+
+        response = {}
+        for name in names:
+            response.update(resolve(self.sections[name]))
+        return response
+
+
+_report: Optional[StatsReport] = None
+
+
+def get_stats_report() -> StatsReport:
+    global _report
+    if _report is None:
+        _report = StatsReport()
+    return _report
+
+
+def invalidate_user_stats(user_id: Optional[int], *topics: str):
+    if user_id:
+        get_stats_report().invalidate_user(user_id, topics)
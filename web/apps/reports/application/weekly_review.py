@@ -0,0 +1,196 @@
+# apps/reports/application/weekly_review.py
+import asyncio
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from apps.core.application.cache_generations import bump_generation
+
+
+DEFAULT_TIMEOUT = 5 * 60  # Zbiorcze .update() omijają sygnały - dłużej niż tyle fragment nie będzie nieaktualny
+
+
+# --- Loadery sekcji: (user, today) -> kontekst fragmentu. Niezależne od siebie - mogą iść równolegle. ---
+
+def load_strategic(user, today: date) -> dict:
+    from apps.goals.models import Goal
+    from apps.projects.models import Project
+
+    # Puste Projekty (licznik zadań utrzymywany przez ProgressService)
+    empty_projects = Project.objects.filter(user=user, status='active', total_tasks=0)
+
+    # Cele bez postępu (Stagnant)
+    # Deadline < 14 dni i Progress < 20%
+    warning_date = today + timedelta(days=14)
+    stagnant_goals = Goal.objects.filter(
+        user=user,
+        deadline__lte=warning_date,
+        progress__lt=20
+    )
+    return {'empty_projects': empty_projects, 'stagnant_goals': stagnant_goals}
+
+
+def load_broken_cycles(user, today: date) -> dict:
+    from apps.reports.domain.services import ReportService
+    return {'broken_cycles': ReportService().get_broken_cycles(user, today)}
+
+
+def load_wip(user, today: date) -> dict:
+    from apps.tasks.models import Task
+
+    active_tasks_count = Task.objects.filter(user=user, status__in=['scheduled', 'paused']).count()
+    wip_limit = getattr(user.profile, 'wip_limit', 5)
+    wip_alert = None
+    if active_tasks_count > wip_limit:
+        wip_alert = f"Masz {active_tasks_count} aktywnych zadań (Limit: {wip_limit})."
+    return {'wip_alert': wip_alert}
+
+
+def load_neglected_areas(user, today: date) -> dict:
+    from apps.reports.domain.services import ReportService
+
+    # Obszary, w których nie ukończono żadnego zadania w ostatnich 7 dniach
+    return {'neglected_areas': ReportService().get_neglected_areas(user, days=7, today=today)}
+
+
+def _tasks_with_status(status: str) -> Callable:
+    def load(user, today: date) -> dict:
+        from apps.tasks.models import Task
+        return {'tasks': Task.objects.filter(user=user, status=status)}
+    return load
+
+
+def load_projects_on_hold(user, today: date) -> dict:
+    from apps.projects.models import Project
+    return {'projects_on_hold': Project.objects.filter(user=user, status='on_hold')}
+
+
+def load_loose_notes(user, today: date) -> dict:
+    from apps.notes.models import Note
+
+    # Notatki bez projektu i bez zadania
+    loose_notes = Note.objects.filter(
+        user=user,
+        project__isnull=True,
+        task__isnull=True
+    ).order_by('-created_at')
+    return {'loose_notes': loose_notes}
+
+
+def load_blocking_chains(user, today: date) -> dict:
+    from apps.reports.domain.services import ReportService
+    return {'blocking_chains': ReportService().get_blocking_chains(user)}
+
+
+def load_tickler(user, today: date) -> dict:
+    from apps.tasks.domain.services.tickler import TicklerService
+    return {'due_review': TicklerService().get_tasks_for_review(user)}
+
+
+def load_last_review(user, today: date) -> dict:
+    from apps.reports.models import ReviewSession
+    return {'last_review': ReviewSession.objects.filter(user=user).order_by('-date').first()}
+
+
+@dataclass(frozen=True)
+class ReviewSection:
+    name: str
+    loader: Callable[..., dict]
+    template: str
+    timeout: Optional[int] = DEFAULT_TIMEOUT  # 0 = bez cache
+
+
+SECTIONS: List[ReviewSection] = [
+    ReviewSection('strategic', load_strategic, 'reports/partials/review_strategic.html'),
+    ReviewSection('broken_cycles', load_broken_cycles, 'reports/partials/review_broken_cycles.html'),
+    ReviewSection('wip', load_wip, 'reports/partials/review_wip.html'),
+    ReviewSection('neglected_areas', load_neglected_areas, 'reports/partials/review_neglected_areas.html'),
+    ReviewSection('waiting', _tasks_with_status('waiting'), 'reports/partials/review_waiting.html'),
+    ReviewSection('delegated', _tasks_with_status('delegated'), 'reports/partials/review_delegated.html'),
+    ReviewSection('postponed', _tasks_with_status('postponed'), 'reports/partials/review_postponed.html'),
+    ReviewSection('projects_on_hold', load_projects_on_hold, 'reports/partials/review_projects_on_hold.html'),
+    ReviewSection('loose_notes', load_loose_notes, 'reports/partials/review_loose_notes.html'),
+    ReviewSection('blocking_chains', load_blocking_chains, 'reports/partials/review_blocking_chains.html'),
+    ReviewSection('tickler', load_tickler, 'reports/partials/review_tickler.html'),
+    ReviewSection('last_review', load_last_review, 'reports/partials/review_last_review.html'),
+]
+
+
+class WeeklyReviewPage:
+    """
+    Przegląd tygodniowy składany z niezależnych fragmentów HTML.
+
+    Każda sekcja ma własny loader i szablon; brakujące fragmenty liczone są równolegle
+    (wątki z puli, każdy z własnym połączeniem do bazy), więc czas strony to czas
+    najwolniejszej sekcji, a nie suma wszystkich. Gotowe fragmenty trafiają do cache
+    (klucz: użytkownik, generacja, sekcja, dzień) - zmiana danych użytkownika podbija
+    generację (signals.py) i wszystkie jego fragmenty przestają być osiągalne.
+    """
+
+    def __init__(self, sections: List[ReviewSection] = SECTIONS, cache_backend=None):
+        self.sections = sections
+        self.cache = cache_backend or cache
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f'review:gen:{user_id}'
+
+    def invalidate_user(self, user_id: int):
+        bump_generation(self.cache, self._generation_key(user_id))
+
+    def _key(self, user_id: int, generation: int, section: ReviewSection, today: date) -> str:
+        return f'review:{user_id}:{generation}:{section.name}:{today.isoformat()}'
+
+    def render_section(self, section: ReviewSection, user, today: date) -> str:
+        """Loader + szablon jednej sekcji (synchronicznie - wołane w wątku z puli)."""
+        try:
+            # Zapytania (także leniwe querysety w szablonie) idą na połączeniu tego wątku
+            return render_to_string(section.template, section.loader(user, today))
+        finally:
+            close_old_connections()
+
+    async def render(self, user, today: date) -> Dict[str, str]:
+        """{nazwa sekcji: HTML} - z cache albo liczone równolegle."""
+        generation = await self.cache.aget(self._generation_key(user.id), 0)
+        keys = {s.name: self._key(user.id, generation, s, today) for s in self.sections}
+        cached = await self.cache.aget_many(keys.values())
+
+        fragments = {}
+        missing = []
+        for section in self.sections:
+            html = cached.get(keys[section.name])
+            if html is not None:
+                fragments[section.name] = html
+            else:
+                missing.append(section)
+
+        rendered = await asyncio.gather(*(
+            sync_to_async(self.render_section, thread_sensitive=False)(section, user, today)
+            for section in missing
+        ))
+
+        for section, html in zip(missing, rendered):
+            fragments[section.name] = html
+            if section.timeout != 0:
+                await self.cache.aset(keys[section.name], html, section.timeout)
+
+        return {name: mark_safe(html) for name, html in fragments.items()}
+
+
+_page: Optional[WeeklyReviewPage] = None
+
+
+def get_weekly_review_page() -> WeeklyReviewPage:
+    global _page
+    if _page is None:
+        _page = WeeklyReviewPage()
+    return _page
+
+
+def invalidate_user_review(user_id: Optional[int]):
+    if user_id:
+        get_weekly_review_page().invalidate_user(user_id)
@@ -3,4 +3,6 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reports'  # <-- WAŻNE: pełna ścieżka
-    label = 'reports'      # <-- WAŻNE: krótka nazwa
\ No newline at end of file
+    label = 'reports'      # <-- WAŻNE: krótka nazwa
+    def ready(self):
+        import apps.reports.signals  # Unieważnianie fragmentów przeglądu tygodniowego
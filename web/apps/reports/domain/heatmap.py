@@ -0,0 +1,88 @@
+# apps/reports/domain/heatmap.py
+from datetime import datetime, timezone as dt_timezone
+from typing import List, Sequence, Tuple
+import numpy as np
+
+
+EPOCH_WEEKDAY = 3  # 1970-01-01 to czwartek (Monday = 0)
+
+
+def _utc_offset_minutes(tz, seconds: int) -> int:
+    return int(datetime.fromtimestamp(seconds, dt_timezone.utc).astimezone(tz).utcoffset().total_seconds() // 60)
+
+
+def local_minutes(end_times: Sequence[datetime], tz) -> np.ndarray:
+    """
+    Aware datetime -> minuty od epoki w czasie lokalnym strefy tz (int64, sekundy obcięte).
+    Przesunięcie strefy liczymy raz na dobę UTC (na początku i końcu doby), a godzina po godzinie
+    tylko w dniach zmiany czasu - nie raz na zadanie.
+    """
+    utc = np.fromiter((dt.timestamp() for dt in end_times), dtype=np.float64, count=len(end_times))
+    utc_minutes = np.floor(utc / 60).astype(np.int64)
+
+    days, inverse = np.unique(utc_minutes // 1440, return_inverse=True)
+    inverse = inverse.ravel()
+    first = np.array([_utc_offset_minutes(tz, int(d) * 86400) for d in days], dtype=np.int64)
+    last = np.array([_utc_offset_minutes(tz, int(d) * 86400 + 86399) for d in days], dtype=np.int64)
+    offsets = first[inverse]
+
+    for day in np.flatnonzero(first != last):
+        rows = np.flatnonzero(inverse == day)
+        hours, hour_inverse = np.unique(utc_minutes[rows] // 60, return_inverse=True)
+        hour_offsets = np.array([_utc_offset_minutes(tz, int(h) * 3600) for h in hours], dtype=np.int64)
+        offsets[rows] = hour_offsets[hour_inverse.ravel()]
+
+    return utc_minutes + offsets
+
+
+def hourly_timeline(end: np.ndarray, duration: np.ndarray, weight: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Obciążenie na osi kolejnych godzin: zadanie zajmuje minuty [end - duration, end)
+    i każda godzina dostaje (minuty wspólne z tym przedziałem) × weight.
+
+    end - minuty od epoki (koniec pracy), duration - minuty, weight - mnożnik (energia).
+    Zwraca (load, h0): load[i] to obciążenie godziny h0 + i (godziny od epoki).
+    """
+    if len(end) == 0:
+        return np.zeros(0), 0
+
+    start = end - duration
+    first = start // 60
+    last = (end - 1) // 60
+    h0 = int(first.min())
+    n = int(last.max()) - h0 + 1
+    first, last = first - h0, last - h0
+
+    # Przedział w jednej godzinie
+    single = first == last
+    load = np.zeros(n)
+    load += np.bincount(first[single], weights=(duration * weight)[single], minlength=n)
+
+    # Dłuższe: niepełna pierwsza i ostatnia godzina + pełne godziny pomiędzy (tablica różnic)
+    multi = ~single
+    first, last, start, end, w = first[multi], last[multi], start[multi] - h0 * 60, end[multi] - h0 * 60, weight[multi]
+    load += np.bincount(first, weights=((first + 1) * 60 - start) * w, minlength=n)
+    load += np.bincount(last, weights=(end - last * 60) * w, minlength=n)
+    full = np.bincount(first + 1, weights=60 * w, minlength=n) - np.bincount(last, weights=60 * w, minlength=n)
+    load += np.cumsum(full)[:n]
+    return load, h0
+
+
+def hour_of_day_load(end: np.ndarray, duration: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    """Obciążenie zsumowane po godzinach doby: tablica 24."""
+    load, h0 = hourly_timeline(end, duration, weight)
+    hours = (h0 + np.arange(len(load))) % 24
+    return np.bincount(hours, weights=load, minlength=24)
+
+
+def weekday_hour_load(end: np.ndarray, duration: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    """Obciążenie dzień tygodnia × godzina: tablica 7 × 24 (wiersz 0 = poniedziałek)."""
+    load, h0 = hourly_timeline(end, duration, weight)
+    absolute = h0 + np.arange(len(load))
+    weekday = (absolute // 24 + EPOCH_WEEKDAY) % 7
+    return np.bincount(weekday * 24 + absolute % 24, weights=load, minlength=7 * 24).reshape(7, 24)
+
+
+def to_points(load: np.ndarray) -> List:
+    """Wynik dla JSON / Chart.js: liczby całkowite (punkty to minuty × energia)."""
+    return np.rint(load).astype(np.int64).tolist()
@@ -1,133 +1,191 @@
 # apps/reports/domain/services.py
-from datetime import timedelta
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
 from django.utils import timezone
-from django.db.models import Count
-from apps.reports.models import ActivityLog
+from django.db.models import Count, Exists, OuterRef, Prefetch
 from apps.tasks.models import Task
 
 
 class ReportService:
 
-    def get_weekly_stats(self, user):
-        """Zwraca statystyki z ostatnich 7 dni."""
-        now = timezone.now()
-        week_ago = now - timedelta(days=7)
+    def get_weekly_stats(self, user, today: Optional[date] = None):
+        """Zwraca statystyki z ostatnich 7 dni (dziś i 6 poprzednich) i obecny stan zadań."""
+        stats = self.get_activity_stats(user, today)
 
-        # 1. Ile zadań ukończono?
-        completed_count = ActivityLog.objects.filter(
-            user=user,
-            action_type=ActivityLog.ActionType.COMPLETED,
-            timestamp__gte=week_ago
-        ).count()
+        # 3. Stan obecny (Snapshot)
+        stats['breakdown'] = self.status_breakdown(self.get_task_groups(user))
+        return stats
 
-        # 2. Ile zadań dodano?
-        created_count = ActivityLog.objects.filter(
-            user=user,
-            action_type=ActivityLog.ActionType.CREATED,
-            timestamp__gte=week_ago
-        ).count()
+    def get_activity_stats(self, user, today: Optional[date] = None):
+        """
+        Aktywność z ostatnich 7 dni (dziś i 6 poprzednich).
+        Liczby pochodzą z dziennych podsumowań logu - 7 wierszy niezależnie od rozmiaru ActivityLog.
+        """
+        from apps.areas.models import Area
+        from apps.contexts.models import Context
+        from apps.reports.application.activity_rollup import ActivityRollupService
 
-        # 3. Stan obecny (Snapshot)
-        status_breakdown = Task.objects.filter(user=user).values('status').annotate(total=Count('status'))
+        today = today or timezone.localdate()
+        activity = ActivityRollupService().summary(user, today - timedelta(days=6), today)
+
+        # 1. Ile zadań ukończono? 2. Ile zadań dodano?
+        completed_count = activity.completed
+        created_count = activity.created
 
         return {
             'period': 'Last 7 Days',
             'completed': completed_count,
             'created': created_count,
             'velocity': completed_count / 7.0,  # zadania na dzień
-            'breakdown': {item['status']: item['total'] for item in status_breakdown}
+            'status_changes': activity.status_changes,
+            'minutes_completed': activity.minutes_completed,
+            'minutes_by_area': self._minutes_by_name(Area, user, activity.minutes_by_area),
+            'minutes_by_context': self._minutes_by_name(Context, user, activity.minutes_by_context),
         }
 
+    @staticmethod
+    def _minutes_by_name(model, user, minutes: dict) -> dict:
+        """{id jako string: minuty} z podsumowań -> {nazwa: minuty} (usunięte obiekty pomijamy)."""
+        if not minutes:
+            return {}
+        names = dict(model.objects.filter(user=user, id__in=[int(pk) for pk in minutes]).values_list('id', 'name'))
+        return {names[int(pk)]: total for pk, total in minutes.items() if int(pk) in names}
 
-    def get_area_distribution(self, user):
-        """Zwraca liczbę zadań per Area (dla aktywnych zadań)."""
-        from apps.tasks.models import Task
-        from django.db.models import Count
 
-        # Grupuj po nazwie obszaru i kolorze
-        data = Task.objects.filter(user=user, status__in=['todo', 'scheduled', 'done']) \
-            .values('area__name', 'area__color') \
+    # Statusy liczone na wykresach obszarów i kontekstów
+    CHART_STATUSES = ('todo', 'scheduled', 'done')
+
+    def get_task_groups(self, user) -> List[dict]:
+        """
+        Liczba zadań w grupach (status, obszar, kontekst) - jedno zapytanie, z którego
+        składamy breakdown statusów oraz wykresy obszarów i kontekstów.
+        """
+        return list(
+            Task.objects.filter(user=user)
+            .values('status', 'area__name', 'area__color', 'context__name', 'context__color')
             .annotate(count=Count('id'))
+            .order_by()
+        )
+
+    @staticmethod
+    def status_breakdown(groups: List[dict]) -> Dict[str, int]:
+        breakdown = defaultdict(int)
+        for item in groups:
+            breakdown[item['status']] += item['count']
+        return dict(breakdown)
+
+    def _distribution(self, groups: List[dict], field: str, default_name: str, default_color: str) -> dict:
+        """Grupy zadań -> dane Chart.js dla obszarów / kontekstów (po nazwie i kolorze)."""
+        totals = defaultdict(int)
+        for item in groups:
+            if item['status'] in self.CHART_STATUSES:
+                totals[(item[f'{field}__name'], item[f'{field}__color'])] += item['count']
 
         # Formatowanie dla Chart.js
         labels = []
         counts = []
         colors = []
 
-        for item in data:
-            name = item['area__name'] or "Bez obszaru"
-            color = item['area__color'] or "#cccccc"
-            labels.append(name)
-            counts.append(item['count'])
-            colors.append(color)
+        for (name, color), count in totals.items():
+            labels.append(name or default_name)
+            counts.append(count)
+            colors.append(color or default_color)
 
         return {'labels': labels, 'data': counts, 'colors': colors}
 
+    def area_distribution(self, groups: List[dict]) -> dict:
+        return self._distribution(groups, 'area', "Bez obszaru", "#cccccc")
 
-    def get_habit_stats(self, user):
-        """Zwraca skuteczność nawyków w ostatnich 30 dniach."""
-        from apps.habits.models import Habit, HabitLog
+    def context_distribution(self, groups: List[dict]) -> dict:
+        return self._distribution(groups, 'context', "Bez kontekstu", "#6c757d")  # Szary domyślny
 
-        habits = Habit.objects.filter(user=user, is_active=True)
-        stats = []
+    def get_area_distribution(self, user):
+        """Zwraca liczbę zadań per Area (dla aktywnych zadań)."""
+        return self.area_distribution(self.get_task_groups(user))
 
-        # Zakres: ostatnie 30 dni
-        today = timezone.now().date()
-        start_date = today - timedelta(days=30)
-        days_count = 30
 
-        for h in habits:
-            # Ile razy wykonano w tym okresie?
-            logs_count = HabitLog.objects.filter(
-                habit=h,
-                date__gte=start_date
-            ).count()
+    def get_habit_stats(self, user, today: Optional[date] = None):
+        """Zwraca skuteczność nawyków (30/90/365 dni) i serie - jednym zapytaniem dla wszystkich."""
+        from apps.habits.application.analytics import HabitAnalytics
+        from apps.habits.models import Habit
 
-            # Prosta skuteczność (logs / 30 dni) * 100
-            # (Dla nawyków 'co 2 dni' to będzie max 50%, ale dla codziennych działa dobrze)
-            rate = int((logs_count / days_count) * 100)
+        habits = list(Habit.objects.filter(user=user, is_active=True))
+        today = today or timezone.localdate()
+        analytics = HabitAnalytics().stats([h.id for h in habits], today)
 
+        stats = []
+        for h in habits:
+            # Skuteczność = wykonania / dni okna * 100
+            # (Dla nawyków 'co 2 dni' to będzie max 50%, ale dla codziennych działa dobrze)
+            habit_stats = analytics[h.id]
             stats.append({
                 'title': h.title,
-                'streak': h.current_streak,
-                'rate_30d': rate
+                'streak': habit_stats.current_streak,
+                'longest_streak': habit_stats.longest_streak,
+                'rate_30d': habit_stats.rate(30),
+                'rate_90d': habit_stats.rate(90),
+                'rate_365d': habit_stats.rate(365),
             })
 
         return stats
 
 
-    def get_recurring_health(self, user):
-        """Zwraca średnie opóźnienie dla zadań cyklicznych."""
-        from apps.tasks.models import RecurringPattern, Task
-        from django.db.models import F, Avg
+    RECURRING_HEALTH_SAMPLE = 5  # Ile ostatnich ukończonych instancji szablonu bierzemy pod uwagę
 
-        patterns = RecurringPattern.objects.filter(user=user, is_active=True)
-        stats = []
+    def get_recurring_health(self, user, sample_size: Optional[int] = None):
+        """
+        Zwraca średnie opóźnienie dla zadań cyklicznych - dla wszystkich aktywnych szablonów
+        jednym zapytaniem: ROW_NUMBER() OVER (PARTITION BY szablon ORDER BY completed_at DESC)
+        wybiera sample_size ostatnich ukończonych instancji każdego szablonu.
 
-        for pat in patterns:
-            # Pobierz zadania ukończone
-            # Oblicz delay: completed_at - due_date
-            # To trudne w czystym ORM SQLite/Postgres bez funkcji DB,
-            # więc zrobimy to w Pythonie (na małej próbce np. 5 ostatnich).
+        Na szablon: avg_delay (dni po terminie, 0 jeśli przed czasem), on_time_rate (% instancji
+        ukończonych najpóźniej w dniu terminu), trend (średnie opóźnienie nowszej połowy próbki
+        minus starszej: < 0 - poprawa, > 0 - pogorszenie).
+        """
+        from django.db.models import F, Window
+        from django.db.models.functions import RowNumber
+        from apps.tasks.models import Task
 
-            tasks = Task.objects.filter(recurring_pattern=pat, status='done').order_by('-completed_at')[:5]
-            if not tasks: continue
+        sample_size = sample_size or self.RECURRING_HEALTH_SAMPLE
+        rows = (
+            Task.objects
+            .filter(recurring_pattern__user=user, recurring_pattern__is_active=True, status='done')
+            .annotate(sample_rank=Window(
+                RowNumber(),
+                partition_by=[F('recurring_pattern_id')],
+                order_by=[F('completed_at').desc(nulls_last=True), F('id').desc()],
+            ))
+            .filter(sample_rank__lte=sample_size)
+            .order_by('recurring_pattern_id', 'sample_rank')
+            .values_list(
+                'recurring_pattern_id', 'recurring_pattern__title',
+                'recurring_pattern__generated_count', 'recurring_pattern__completed_count',
+                'due_date', 'completed_at',
+            )
+        )
 
-            delays = []
-            for t in tasks:
-                if t.due_date and t.completed_at:
-                    # completed_at to datetime, due_date to date (lub datetime)
-                    # Ujednolicamy do date()
-                    delta = (t.completed_at.date() - t.due_date.date()).days
-                    delays.append(max(0, delta))  # 0 jeśli przed czasem
+        patterns = {}
+        delays = defaultdict(list)  # Od najnowszej instancji
+        for pattern_id, title, generated, completed, due_date, completed_at in rows:
+            patterns[pattern_id] = (title, generated, completed)
+            if due_date and completed_at:
+                # completed_at i due_date to datetime - ujednolicamy do date()
+                delays[pattern_id].append((completed_at.date() - due_date.date()).days)
 
-            avg_delay = sum(delays) / len(delays) if delays else 0
+        stats = []
+        for pattern_id, (title, generated, completed) in patterns.items():
+            sample = delays[pattern_id]
+            late = [max(0, d) for d in sample]  # 0 jeśli przed czasem
+            half = len(late) // 2
 
             stats.append({
-                'title': pat.title,
-                'avg_delay': round(avg_delay, 1),
-                'rate': pat.completion_rate,
-                'total': pat.generated_count
+                'title': title,
+                'avg_delay': round(sum(late) / len(late), 1) if late else 0,
+                'on_time_rate': int(sum(1 for d in sample if d <= 0) / len(sample) * 100) if sample else None,
+                'trend': round(sum(late[:half]) / half - sum(late[-half:]) / half, 1) if half else None,
+                'rate': int((completed / generated) * 100) if generated else 0,  # RecurringPattern.completion_rate
+                'total': generated
             })
 
         return stats
@@ -135,131 +193,115 @@ class ReportService:
 
     def get_context_distribution(self, user):
         """Zwraca liczbę zadań per Context."""
-        from apps.tasks.models import Task
-        from django.db.models import Count
-
-        # Grupuj po nazwie kontekstu
-        data = Task.objects.filter(user=user, status__in=['todo', 'scheduled', 'done']) \
-            .values('context__name', 'context__color') \
-            .annotate(count=Count('id'))
-
-        labels = []
-        counts = []
-        colors = []
-
-        for item in data:
-            name = item['context__name'] or "Bez kontekstu"
-            color = item['context__color'] or "#6c757d"  # Szary domyślny
-            labels.append(name)
-            counts.append(item['count'])
-            colors.append(color)
-
-        return {'labels': labels, 'data': counts, 'colors': colors}
+        return self.context_distribution(self.get_task_groups(user))
 
 
     def get_blocking_chains(self, user):
         """
         Zwraca listę 'łańcuchów': Zadania aktywne, które blokują inne zadania.
-        Struktura: [{ 'root': task, 'blocked_children': [task, task...] }]
+        Struktura: [{ 'root': task, 'children': [task, task...] }]
+        Dwa zapytania niezależnie od liczby blokerów: korzenie (EXISTS) + dzieci (prefetch).
         """
         from apps.tasks.models import Task
 
-        # 1. Znajdź zadania, które są blokerami (są w polu blocked_by innych zadań)
-        # i same są aktywne (TODO/SCHEDULED).
-        # To są nasze "Korki".
-
+        # Blokery ("korki"): zadania aktywne (TODO/SCHEDULED), od których zależy
+        # choć jedno zadanie zablokowane. blocking to related_name dla 'blocked_by'.
+        blocked_children = Task.objects.filter(status='blocked').order_by('id')
         blockers = Task.objects.filter(
             user=user,
             status__in=['todo', 'scheduled'],
-            blocking__status='blocked'  # blocking to related_name dla 'blocked_by' (zdefiniowane w modelu Task?)
-        ).distinct()
+        ).filter(
+            Exists(blocked_children.filter(blocked_by=OuterRef('pk')))
+        ).prefetch_related(
+            Prefetch('blocking', queryset=blocked_children, to_attr='blocked_children')
+        ).order_by('id')
 
-        # Sprawdźmy related_name w modelu Task.
-        # W kroku 2.5 (Faza 2) zdefiniowaliśmy: related_name='blocking'.
+        return [{'root': root, 'children': root.blocked_children} for root in blockers]
 
-        chains = []
-        for root in blockers:
-            # Znajdź zadania, które ten root bezpośrednio blokuje
-            children = root.blocking.filter(status='blocked')
-
-            if children.exists():
-                chains.append({
-                    'root': root,
-                    'children': children
-                })
+    def get_broken_cycles(self, user, today: Optional[date] = None):
+        """
+        Przerwane cykle: aktywne szablony po terminie (next_run_date < dziś), które nie mają
+        żadnej otwartej instancji. Jedno zapytanie (NOT EXISTS) zamiast exists() na szablon.
+        """
+        from apps.tasks.models import RecurringPattern, Task
 
-        return chains
+        today = today or date.today()
+        open_instances = Task.objects.filter(
+            recurring_pattern=OuterRef('pk'),
+            status__in=['todo', 'scheduled', 'overdue']
+        )
+        return list(
+            RecurringPattern.objects.filter(user=user, is_active=True, next_run_date__lt=today)
+            .filter(~Exists(open_instances))
+            .order_by('id')
+        )
 
-    def get_productivity_heatmap(self, user):
+    def get_neglected_areas(self, user, days: int = 7, today: Optional[date] = None):
         """
-        Generuje heatmapę godzinową (0-23) obciążenia pracą.
-        Uwzględnia duration i energy zadania (Back-filling).
+        Zaniedbane obszary: bez żadnego zadania ukończonego w ostatnich `days` dniach.
+        Jedno zapytanie (NOT EXISTS) zamiast count() na obszar.
         """
-        from apps.reports.models import ActivityLog
+        from apps.areas.models import Area
         from apps.tasks.models import Task
 
-        # Inicjalizacja wiaderek (0-23h)
-        # hourly_load[14] = suma punktów obciążenia o 14:00
-        hourly_load = [0] * 24
-
-        # Zakres: ostatnie 30 dni
-        month_ago = timezone.now() - timedelta(days=30)
-
-        # Pobierz logi ukończenia
-        # Optymalizacja: select_related nie zadziała dla GenericForeignKey w prosty sposób,
-        # więc pobieramy logi, a potem zadania w pętli (dla 30 dni to akceptowalne w MVP)
-        # LUB: Pobieramy zadania DONE z updated_at > 30 dni (szybciej)
-
-        tasks = Task.objects.filter(
-            user=user,
-            status='done',
-            # Używamy completed_at jeśli jest, lub updated_at
-            # Zakładamy, że completed_at zostało wdrożone w poprzedniej fazie
+        today = today or date.today()
+        since = timezone.make_aware(datetime.combine(today - timedelta(days=days), time.min))
+        completed_recently = Task.objects.filter(area=OuterRef('pk'), status='done', updated_at__gte=since)
+        return list(
+            Area.objects.filter(user=user)
+            .filter(~Exists(completed_recently))
+            .order_by('id')
         )
 
-        for task in tasks:
-            # Data ukończenia
-            end_time = task.completed_at or task.updated_at
-            if not end_time or end_time < month_ago:
-                continue
-
-            # Ustal duration (minuty)
-            duration = task.duration_expected
-            if not duration or duration < 5: duration = 30  # Default dla zadań bez czasu
-
-            # Ustal energię (mnożnik)
-            # Energy: 1 (Low), 2 (Mid), 3 (High)
-            energy_mult = task.energy_required or 1
-
-            # Algorytm Back-filling
-            # Symulujemy pracę wstecz od end_time
-            current_time = end_time
-            minutes_left = duration
-
-            while minutes_left > 0:
-                # Która to godzina? (0-23)
-                hour_idx = current_time.hour
-
-                # Ile minut w tej godzinie zajęło zadanie?
-                # Np. jest 14:15. Do początku godziny (14:00) jest 15 min.
-                minutes_in_hour = current_time.minute
-
-                # Jeśli zadanie trwało krócej niż to co upłynęło w godzinie
-                step = min(minutes_left, minutes_in_hour)
-
-                # Jeśli step == 0 (np. jest 14:00:00), cofamy się do poprzedniej godziny 13:59
-                if step == 0:
-                    current_time -= timedelta(minutes=1)
-                    continue
-
-                # Dodaj punkty do wiaderka
-                # Punkty = Minuty * Energia
-                hourly_load[hour_idx] += step * energy_mult
+    def get_productivity_heatmap(
+            self,
+            user,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            by_weekday: bool = False
+        ):
+        """
+        Generuje heatmapę godzinową (0-23) obciążenia pracą.
+        Uwzględnia duration i energy zadania (Back-filling): zadanie ukończone o end_time
+        zajmuje minuty [end_time - duration, end_time), a każda godzina dostaje minuty × energia.
 
-                # Odejmij czas
-                minutes_left -= step
-                current_time -= timedelta(minutes=step)
+        Zakres [start, end] po completed_at (domyślnie ostatnie 30 dni) filtruje baza (indeks
+        user + completed_at); rozkład przedziałów na godziny liczy NumPy na tablicach, bez pętli po zadaniach.
+        by_weekday=True - heatmapa 7 × 24 (dzień tygodnia × godzina, wiersz 0 = poniedziałek).
+        """
+        import numpy as np
+        from django.db.models.functions import Coalesce
+        from apps.reports.domain import heatmap
+        from apps.tasks.models import Task
 
-        # Normalizacja wyników (opcjonalnie, żeby wykres był czytelny)
+        # Zakres: domyślnie ostatnie 30 dni
+        start = start or timezone.now() - timedelta(days=30)
+        tasks = Task.objects.filter(user=user, status='done', completed_at__gte=start)
+        if end is not None:
+            tasks = tasks.filter(completed_at__lte=end)
+
+        rows = list(
+            tasks.annotate(
+                # Jak Task.duration_expected
+                d_min=Coalesce('duration_min', 30),
+                d_max=Coalesce('duration_max', 'duration_min', 30),
+            ).values_list('completed_at', 'd_min', 'd_max', 'energy_required')
+        )
+        if not rows:
+            return heatmap.to_points(np.zeros((7, 24) if by_weekday else 24))
+
+        end_times, d_min, d_max, energy = zip(*rows)
+        # Ustal duration (minuty) - domyślnie 30 dla zadań bez czasu
+        duration = (np.array(d_min, dtype=np.int64) + np.array(d_max, dtype=np.int64)) // 2
+        duration[duration < 5] = 30
+        # Ustal energię (mnożnik) - Energy: 1 (Low), 2 (Mid), 3 (High)
+        energy = np.array(energy, dtype=np.int64)
+        energy[energy == 0] = 1
+
+        end_minutes = heatmap.local_minutes(end_times, timezone.get_current_timezone())
+        if by_weekday:
+            load = heatmap.weekday_hour_load(end_minutes, duration, energy)
+        else:
+            load = heatmap.hour_of_day_load(end_minutes, duration, energy)
         # Zwracamy surowe punkty, Chart.js sobie poradzi
-        return hourly_load
\ No newline at end of file
+        return heatmap.to_points(load)
\ No newline at end of file
@@ -0,0 +1,106 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.reports.domain import heatmap
+
+
+def legacy_backfill(hourly_load, end_time, duration, energy_mult):
+    """Poprzedni algorytm: cofanie się od end_time minutami w pętli (referencja do porównania)."""
+    current_time = end_time
+    minutes_left = duration
+    while minutes_left > 0:
+        hour_idx = current_time.hour
+        step = min(minutes_left, current_time.minute)
+        if step == 0:
+            current_time -= timedelta(minutes=1)
+            continue
+        hourly_load[hour_idx] += step * energy_mult
+        minutes_left -= step
+        current_time -= timedelta(minutes=step)
+
+
+def exact_minutes(end, duration, weight):
+    """Referencja minuta po minucie (rozwinięcie każdego przedziału) - sprawdza wynik NumPy."""
+    minutes = np.repeat(end, duration) - (np.arange(duration.sum()) - np.repeat(np.cumsum(duration) - duration, duration)) - 1
+    return np.bincount((minutes // 60) % 24, weights=np.repeat(weight, duration), minlength=24)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark heatmapy obciążenia: NumPy vs poprzednia pętla back-fillingu'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=str, default='1000,20000,100000',
+            help='Liczby ukończonych zadań oddzielone przecinkami (dane syntetyczne)'
+        )
+        parser.add_argument('--days', type=int, default=30, help='Zakres dat ukończenia')
+        parser.add_argument('--user', type=int, help='Zamiast danych syntetycznych: zadania użytkownika z bazy')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['user']:
+            self._benchmark_user(options['user'])
+            return
+
+        rng = random.Random(options['seed'])
+        now = datetime.now(dt_timezone.utc).replace(second=0, microsecond=0)
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            end_times = [now - timedelta(minutes=rng.randint(0, options['days'] * 1440)) for _ in range(size)]
+            duration = np.array([rng.randint(5, 480) for _ in range(size)], dtype=np.int64)
+            energy = np.array([rng.randint(1, 3) for _ in range(size)], dtype=np.int64)
+
+            start = time.perf_counter()
+            legacy = [0] * 24
+            for end_time, d, e in zip(end_times, duration.tolist(), energy.tolist()):
+                legacy_backfill(legacy, end_time, d, e)
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            end = heatmap.local_minutes(end_times, dt_timezone.utc)
+            result = heatmap.hour_of_day_load(end, duration, energy)
+            numpy_ms = (time.perf_counter() - start) * 1000
+
+            exact = np.array_equal(result, exact_minutes(end, duration, energy))
+            drift = np.abs(result - np.array(legacy)).max() / max(result.max(), 1) * 100
+            self.stdout.write(
+                f"{size:>8} zadań: pętla {legacy_ms:9.1f} ms, NumPy {numpy_ms:7.2f} ms "
+                f"(x{legacy_ms / max(numpy_ms, 1e-6):.0f}); zgodność z referencją minutową: {'tak' if exact else 'NIE'}, "
+                f"maks. różnica vs pętla {drift:.2f}%"
+            )
+
+    def _benchmark_user(self, user_id: int):
+        from django.contrib.auth import get_user_model
+        from apps.reports.domain.services import ReportService
+        from apps.tasks.models import Task
+
+        user = get_user_model().objects.filter(id=user_id).first()
+        if user is None:
+            raise CommandError(f'Brak użytkownika {user_id}')
+
+        # Poprzednia ścieżka: wszystkie ukończone zadania, filtr dat w Pythonie, pętla po minutach
+        start = time.perf_counter()
+        month_ago = timezone.now() - timedelta(days=30)
+        legacy = [0] * 24
+        total = 0
+        for task in Task.objects.filter(user=user, status='done'):
+            total += 1
+            end_time = task.completed_at or task.updated_at
+            if not end_time or end_time < month_ago:
+                continue
+            duration = task.duration_expected
+            if not duration or duration < 5: duration = 30
+            legacy_backfill(legacy, timezone.localtime(end_time), duration, task.energy_required or 1)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        result = ReportService().get_productivity_heatmap(user)
+        numpy_ms = (time.perf_counter() - start) * 1000
+
+        drift = max(abs(a - b) for a, b in zip(result, legacy)) / max(max(result), 1) * 100
+        self.stdout.write(
+            f"Użytkownik {user_id} ({total} ukończonych zadań): poprzednio {legacy_ms:.1f} ms, "
+            f"teraz {numpy_ms:.1f} ms; maks. różnica {drift:.2f}%"
+        )
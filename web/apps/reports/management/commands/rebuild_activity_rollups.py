@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.reports.application.activity_rollup import ActivityRollupService
+
+
+class Command(BaseCommand):
+    help = 'Odtwarza od zera dzienne podsumowania aktywności (DailyActivityRollup) z ActivityLog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='ID użytkownika (można podać wielokrotnie); domyślnie wszyscy'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Tylko sprawdź spójność podsumowań (bez zapisu); kod wyjścia != 0 przy rozbieżnościach'
+        )
+
+    def handle(self, *args, **options):
+        service = ActivityRollupService()
+        user_ids = options['user_ids']
+
+        if options['check']:
+            problems = service.check(user_ids)
+            for problem in problems:
+                self.stdout.write(f"- {problem}")
+            if problems:
+                raise CommandError(
+                    f'Niespójne podsumowania aktywności: {len(problems)}. Napraw: manage.py rebuild_activity_rollups'
+                )
+            self.stdout.write(self.style.SUCCESS('Podsumowania aktywności są spójne.'))
+            return
+
+        rows = service.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'Odtworzono podsumowania aktywności ({rows} dni).'))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("reports", "0002_reviewsession"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyActivityRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("created", models.PositiveIntegerField(default=0)),
+                ("completed", models.PositiveIntegerField(default=0)),
+                ("status_changes", models.PositiveIntegerField(default=0)),
+                ("minutes_completed", models.PositiveIntegerField(default=0)),
+                ("minutes_by_area", models.JSONField(blank=True, default=dict)),
+                ("minutes_by_context", models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                "ordering": ["date"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(fields=["user", "timestamp"], name="reports_act_user_id_8be292_idx"),
+        ),
+        migrations.AddField(
+            model_name="dailyactivityrollup",
+            name="user",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="activity_rollups", to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyactivityrollup",
+            constraint=models.UniqueConstraint(fields=("user", "date"), name="unique_activity_rollup_per_day"),
+        ),
+    ]
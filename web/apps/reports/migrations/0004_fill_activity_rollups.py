@@ -0,0 +1,80 @@
+# Wypełnienie dziennych podsumowań aktywności z istniejącego logu
+# (starsze wpisy COMPLETED nie mają minut - bierzemy je z obecnego stanu zadania)
+
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def fill_rollups(apps, schema_editor):
+    ActivityLog = apps.get_model("reports", "ActivityLog")
+    DailyActivityRollup = apps.get_model("reports", "DailyActivityRollup")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Task = apps.get_model("tasks", "Task")
+
+    task_type = ContentType.objects.filter(app_label="tasks", model="task").first()
+    counters = defaultdict(Counter)
+    completions = []
+    for user_id, timestamp, action_type, content_type_id, object_id in ActivityLog.objects.order_by().values_list(
+        "user_id", "timestamp", "action_type", "content_type_id", "object_id"
+    ).iterator(chunk_size=2000):
+        key = (user_id, timezone.localdate(timestamp))
+        if action_type == "created":
+            counters[key]["created"] += 1
+        elif action_type == "status_change":
+            counters[key]["status_changes"] += 1
+        elif action_type == "completed":
+            counters[key]["completed"] += 1
+            if task_type and content_type_id == task_type.id:
+                completions.append((key, object_id))
+
+    tasks = {
+        task.id: task
+        for task in Task.objects.filter(id__in={object_id for _, object_id in completions}).only(
+            "id", "duration_min", "duration_max", "area_id", "context_id"
+        )
+    }
+    by_area, by_context = defaultdict(Counter), defaultdict(Counter)
+    for key, object_id in completions:
+        task = tasks.get(object_id)
+        if task is None:
+            continue
+        # Jak Task.duration_expected
+        d_min = task.duration_min or 30
+        d_max = task.duration_max or d_min
+        minutes = int((d_min + d_max) / 2)
+        counters[key]["minutes_completed"] += minutes
+        if task.area_id:
+            by_area[key][str(task.area_id)] += minutes
+        if task.context_id:
+            by_context[key][str(task.context_id)] += minutes
+
+    DailyActivityRollup.objects.bulk_create(
+        [
+            DailyActivityRollup(
+                user_id=user_id,
+                date=day,
+                created=counts["created"],
+                completed=counts["completed"],
+                status_changes=counts["status_changes"],
+                minutes_completed=counts["minutes_completed"],
+                minutes_by_area=dict(by_area[(user_id, day)]),
+                minutes_by_context=dict(by_context[(user_id, day)]),
+            )
+            for (user_id, day), counts in counters.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0003_daily_activity_rollup"),
+        ("tasks", "0018_recurringpattern_start_date"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -36,12 +36,43 @@ class ActivityLog(models.Model):
         ordering = ['-timestamp']
         indexes = [
             models.Index(fields=['content_type', 'object_id']),
+            models.Index(fields=['user', 'timestamp']),
         ]
 
     def __str__(self):
         return f"{self.user} - {self.action_type} - {self.timestamp}"
 
 
+class DailyActivityRollup(models.Model):
+    """
+    Dzienne podsumowanie ActivityLog użytkownika (jeden wiersz na użytkownika i dzień).
+
+    Utrzymywane przyrostowo przy każdym wpisie do logu (ActivityRollupService), więc raporty
+    czytają tyle wierszy, ile dni obejmują - niezależnie od rozmiaru logu.
+    Przeliczenie od zera: manage.py rebuild_activity_rollups.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_rollups')
+    date = models.DateField()
+
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    status_changes = models.PositiveIntegerField(default=0)
+
+    # Minuty ukończonych zadań (duration_expected): suma i podział {id obszaru/kontekstu: minuty}
+    minutes_completed = models.PositiveIntegerField(default=0)
+    minutes_by_area = models.JSONField(default=dict, blank=True)
+    minutes_by_context = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_activity_rollup_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.date}"
+
+
 class ReviewSession(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     date = models.DateTimeField(auto_now_add=True)
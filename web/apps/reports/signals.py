@@ -0,0 +1,92 @@
+# apps/reports/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from apps.areas.models import Area
+from apps.contexts.models import Context
+from apps.core.models import UserProfile
+from apps.goals.models import Goal
+from apps.habits.models import Habit, HabitLog
+from apps.notes.models import Note
+from apps.projects.models import Project
+from apps.reports.application import stats_report
+from apps.reports.application.stats_report import invalidate_user_stats
+from apps.reports.application.weekly_review import invalidate_user_review
+from apps.reports.models import DailyActivityRollup, ReviewSession
+from apps.tasks.models import RecurringPattern, Task
+
+
+# Zmiana czegokolwiek, co pokazuje przegląd tygodniowy -> nowa generacja fragmentów użytkownika.
+# (Zbiorcze .update() omijają sygnały - tam fragment wygasa po WeeklyReviewPage DEFAULT_TIMEOUT.)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=RecurringPattern)
+@receiver(post_delete, sender=RecurringPattern)
+@receiver(post_save, sender=ReviewSession)
+@receiver(post_save, sender=UserProfile)  # wip_limit
+def invalidate_review_on_change(sender, instance, **kwargs):
+    invalidate_user_review(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Task.blocked_by.through)
+def invalidate_review_on_dependencies_change(sender, instance, action, **kwargs):
+    if action in ["post_add", "post_remove", "post_clear"]:
+        invalidate_user_review(instance.user_id)
+
+
+# Sekcje dashboardu raportów (StatsReport) - unieważniany tylko temat, którego dotyczy zmiana.
+# (rebuild_activity_rollups / bulk_create omijają sygnały - tam sekcja wygasa po swoim TTL.)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_stats_on_task_change(sender, instance, **kwargs):
+    topics = [stats_report.TASKS]
+    if instance.recurring_pattern_id:
+        topics.append(stats_report.RECURRING)
+    invalidate_user_stats(instance.user_id, *topics)
+
+
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+@receiver(post_save, sender=Context)
+@receiver(post_delete, sender=Context)
+def invalidate_stats_on_label_change(sender, instance, **kwargs):
+    invalidate_user_stats(instance.user_id, stats_report.TASKS)
+
+
+@receiver(post_save, sender=RecurringPattern)
+@receiver(post_delete, sender=RecurringPattern)
+def invalidate_stats_on_pattern_change(sender, instance, **kwargs):
+    invalidate_user_stats(instance.user_id, stats_report.RECURRING)
+
+
+@receiver(post_save, sender=DailyActivityRollup)
+def invalidate_stats_on_rollup_change(sender, instance, **kwargs):
+    invalidate_user_stats(instance.user_id, stats_report.ACTIVITY)
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_delete, sender=Habit)
+def invalidate_stats_on_habit_change(sender, instance, **kwargs):
+    invalidate_user_stats(instance.user_id, stats_report.HABITS)
+
+
+@receiver(post_save, sender=HabitLog)
+@receiver(post_delete, sender=HabitLog)
+def invalidate_stats_on_habit_log_change(sender, instance, origin=None, **kwargs):
+    # Kaskada z usuwanego nawyku / użytkownika - temat unieważnia już post_delete nawyku
+    if origin is not None and not (isinstance(origin, HabitLog) or getattr(origin, 'model', None) is HabitLog):
+        return
+    if HabitLog.habit.is_cached(instance):
+        user_id = instance.habit.user_id
+    else:
+        user_id = Habit.objects.filter(id=instance.habit_id).values_list('user_id', flat=True).first()
+    invalidate_user_stats(user_id, stats_report.HABITS)
@@ -0,0 +1,253 @@
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import pytz
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.areas.models import Area
+from apps.contexts.models import Context
+from apps.core.tests.migration_test_case import MigrationTestCase
+from apps.reports.application.activity_rollup import ActivityRollupService, RollupDelta
+from apps.reports.models import ActivityLog, DailyActivityRollup
+from apps.tasks.domain.services import RecurrenceService
+from apps.tasks.models import RecurringPattern, Task
+
+
+DAY = date(2025, 3, 10)
+
+
+def delta(action_type, count=1, **details):
+    result = RollupDelta()
+    for _ in range(count):
+        result.add(action_type, details)
+    return result
+
+
+class ApplyDeltasTest(TestCase):
+    """Zbiorcze dopisanie przyrostów do podsumowań dni."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [get_user_model().objects.create_user(username=f'rollup-{i}') for i in range(3)]
+
+    def test_query_count_does_not_grow_with_keys(self):
+        service = ActivityRollupService()
+        for days in (1, 20):
+            with self.subTest(days=days):
+                deltas = {
+                    (user.id, DAY + timedelta(days=offset)): delta(ActivityLog.ActionType.CREATED)
+                    for user in self.users for offset in range(days)
+                }
+                # INSERT brakujących, SELECT ... FOR UPDATE, bulk_update (+ savepoint)
+                with self.assertNumQueries(5):
+                    service.apply_deltas(deltas)
+
+    def test_adds_to_existing_rows(self):
+        user = self.users[0]
+        DailyActivityRollup.objects.create(
+            user=user, date=DAY, created=2, completed=1, minutes_completed=30, minutes_by_area={'7': 30}
+        )
+
+        ActivityRollupService().apply_deltas({
+            (user.id, DAY): delta(ActivityLog.ActionType.COMPLETED, 2, minutes=15, area_id=7, context_id=3),
+            (user.id, DAY + timedelta(days=1)): delta(ActivityLog.ActionType.STATUS_CHANGE),
+            (self.users[1].id, DAY): RollupDelta(),  # Pusty przyrost nie tworzy wiersza
+        })
+
+        rows = {
+            (r.user_id, r.date): (r.created, r.completed, r.status_changes, r.minutes_completed,
+                                  r.minutes_by_area, r.minutes_by_context)
+            for r in DailyActivityRollup.objects.all()
+        }
+        self.assertEqual(rows, {
+            (user.id, DAY): (2, 3, 0, 60, {'7': 60}, {'3': 30}),
+            (user.id, DAY + timedelta(days=1)): (0, 0, 1, 0, {}, {}),
+        })
+
+
+def stored_rollups(user):
+    return {
+        r.date: (r.created, r.completed, r.status_changes, r.minutes_completed, r.minutes_by_area, r.minutes_by_context)
+        for r in DailyActivityRollup.objects.filter(user=user)
+    }
+
+
+class IncrementalRollupTest(TestCase):
+    """Podsumowania utrzymywane przyrostowo = podsumowania policzone od zera z logu (expected())."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='rollup-incremental')
+        cls.area = Area.objects.create(user=cls.user, name='Praca')
+        cls.context = Context.objects.create(user=cls.user, name='@biuro')
+
+    def assertMatchesLog(self):
+        service = ActivityRollupService()
+        self.assertEqual(service.check([self.user.id]), [])
+        expected = {day: delta.as_values() for (_, day), delta in service.expected([self.user.id]).items()}
+        self.assertEqual(stored_rollups(self.user), expected)
+
+    def test_task_lifecycle(self):
+        today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = Task.objects.create(user=self.user, title='Raport', status='todo', duration_min=30, duration_max=60,
+                                        area=self.area, context=self.context)
+            second = Task.objects.create(user=self.user, title='Telefon', status='inbox', duration_min=15)
+            second.status = 'waiting'
+            second.save()
+            first.title = 'Raport kwartalny'  # Bez zmiany statusu - bez wpisu w logu
+            first.save()
+            first.status = 'done'
+            first.save()
+            second.status = 'done'
+            second.save()
+
+        self.assertMatchesLog()
+        self.assertEqual(
+            stored_rollups(self.user)[today],
+            (2, 2, 1, 45 + 15, {str(self.area.id): 45}, {str(self.context.id): 45}),
+        )
+
+        # Późniejsza edycja ukończonego zadania nie zmienia podsumowania
+        first.duration_min = 240
+        first.save()
+        self.assertMatchesLog()
+
+    def test_recurrence_bulk_path(self):
+        RecurringPattern.objects.create(
+            user=self.user, title='Podlać kwiaty', frequency='DAILY',
+            next_run_date=date.today() - timedelta(days=2),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            result = RecurrenceService().generate_daily_instances()
+            task = Task.objects.filter(user=self.user).first()
+            task.status = 'done'
+            task.save()
+
+        self.assertEqual(result.generated, 3)
+        self.assertMatchesLog()
+        self.assertEqual(stored_rollups(self.user)[timezone.localdate()][:3], (3, 1, 0))
+
+    def test_record_groups_logs_by_day(self):
+        ActivityRollupService().record([
+            ActivityLog(user=self.user, action_type=ActivityLog.ActionType.CREATED,
+                        timestamp=datetime(2025, 3, 10, 22, 30, tzinfo=pytz.UTC)),
+            ActivityLog(user=self.user, action_type=ActivityLog.ActionType.COMPLETED,
+                        timestamp=datetime(2025, 3, 10, 8, tzinfo=pytz.UTC), details={'minutes': 20}),
+            ActivityLog(user=self.user, action_type=ActivityLog.ActionType.UPDATED,
+                        timestamp=datetime(2025, 3, 9, 8, tzinfo=pytz.UTC)),
+        ])
+
+        # UPDATED nie jest liczony (TIME_ZONE = UTC)
+        self.assertEqual(stored_rollups(self.user), {date(2025, 3, 10): (1, 1, 0, 20, {}, {})})
+
+
+class CheckAndRebuildTest(TestCase):
+    """check() wykrywa rozbieżności, rebuild() odtwarza podsumowania z logu (atomowo)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='rollup-rebuild')
+        cls.other = get_user_model().objects.create_user(username='rollup-rebuild-other')
+
+    def setUp(self):
+        for user in (self.user, self.other):
+            task = Task.objects.create(user=user, title='Zadanie', status='todo', duration_min=40)
+            task.status = 'done'
+            task.save()
+        self.expected = {user.id: stored_rollups(user) for user in (self.user, self.other)}
+
+    def test_check_reports_drift(self):
+        service = ActivityRollupService()
+        self.assertEqual(service.check(), [])
+
+        DailyActivityRollup.objects.filter(user=self.user).update(completed=5)
+        DailyActivityRollup.objects.filter(user=self.other).delete()
+
+        problems = service.check()
+        self.assertEqual(len(problems), 2)
+        self.assertIn('brak podsumowania', problems[1])
+        self.assertEqual(len(service.check([self.user.id])), 1)
+
+    def test_rebuild_restores_selected_users(self):
+        DailyActivityRollup.objects.update(completed=5)
+
+        rows = ActivityRollupService().rebuild([self.user.id])
+
+        self.assertEqual(rows, 1)
+        self.assertEqual(stored_rollups(self.user), self.expected[self.user.id])
+        self.assertEqual(DailyActivityRollup.objects.get(user=self.other).completed, 5)  # Poza zakresem
+
+        ActivityRollupService().rebuild()
+        self.assertEqual(ActivityRollupService().check(), [])
+
+    def test_rebuild_fills_legacy_completions_from_task(self):
+        # Wpis COMPLETED sprzed podsumowań: bez minut - bierzemy je z zadania
+        task = Task.objects.filter(user=self.user).get()
+        ActivityLog.objects.filter(user=self.user, action_type=ActivityLog.ActionType.COMPLETED).update(details={})
+
+        ActivityRollupService().rebuild()
+
+        self.assertEqual(stored_rollups(self.user), self.expected[self.user.id])
+        self.assertEqual(task.duration_expected, 40)
+
+    def test_rebuild_is_atomic(self):
+        DailyActivityRollup.objects.update(completed=5)
+
+        with mock.patch.object(DailyActivityRollup.objects, 'bulk_create', side_effect=RuntimeError('awaria')):
+            with self.assertRaises(RuntimeError):
+                ActivityRollupService().rebuild()
+
+        # Usunięcie wycofane razem z nieudanym zapisem
+        self.assertEqual(DailyActivityRollup.objects.count(), 2)
+        self.assertEqual(set(DailyActivityRollup.objects.values_list('completed', flat=True)), {5})
+
+
+class FillActivityRollupsMigrationTest(MigrationTestCase):
+    """Migracja 0004 wypełnia podsumowania z istniejącego logu - tak jak rebuild()."""
+
+    migrate_from = [('reports', '0003_daily_activity_rollup')]
+    migrate_to = [('reports', '0004_fill_activity_rollups')]
+
+    def setUpBeforeMigration(self, apps):
+        User = apps.get_model('auth', 'User')
+        Task = apps.get_model('tasks', 'Task')
+        ActivityLog = apps.get_model('reports', 'ActivityLog')
+        task_type = ContentType.objects.get_for_model(Task)
+
+        self.user = User.objects.create(username='migration-0004')
+        area = apps.get_model('areas', 'Area').objects.create(user=self.user, name='Dom')
+        tasks = [
+            Task.objects.create(user=self.user, title='Pranie', status='done', duration_min=20, duration_max=40,
+                                area=area),
+            Task.objects.create(user=self.user, title='Zakupy', status='done'),
+        ]
+        logs = [
+            ('created', tasks[0], datetime(2025, 3, 10, 9, tzinfo=pytz.UTC)),
+            ('created', tasks[1], datetime(2025, 3, 10, 10, tzinfo=pytz.UTC)),
+            ('status_change', tasks[0], datetime(2025, 3, 11, 9, tzinfo=pytz.UTC)),
+            ('completed', tasks[0], datetime(2025, 3, 11, 12, tzinfo=pytz.UTC)),
+            ('completed', tasks[1], datetime(2025, 3, 12, 12, tzinfo=pytz.UTC)),
+        ]
+        for action_type, task, timestamp in logs:
+            log = ActivityLog.objects.create(
+                user=self.user, action_type=action_type, content_type_id=task_type.id, object_id=task.id,
+            )
+            ActivityLog.objects.filter(pk=log.pk).update(timestamp=timestamp)  # auto_now_add
+        self.area_id = area.id
+
+    def test_rollups_match_log(self):
+        self.assertEqual(ActivityRollupService().check([self.user.id]), [])
+        rollups = {
+            r.date: (r.created, r.completed, r.status_changes, r.minutes_completed, r.minutes_by_area)
+            for r in self.apps.get_model('reports', 'DailyActivityRollup').objects.filter(user_id=self.user.id)
+        }
+        day = ActivityRollupService.day_of
+        self.assertEqual(rollups, {
+            day(datetime(2025, 3, 10, 9, tzinfo=pytz.UTC)): (2, 0, 0, 0, {}),
+            day(datetime(2025, 3, 11, 12, tzinfo=pytz.UTC)): (0, 1, 1, 30, {str(self.area_id): 30}),
+            day(datetime(2025, 3, 12, 12, tzinfo=pytz.UTC)): (0, 1, 0, 30, {}),
+        })
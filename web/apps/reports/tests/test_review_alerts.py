@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.areas.models import Area
+from apps.reports.domain.services import ReportService
+from apps.tasks.models import RecurringPattern, Task
+
+
+TODAY = date(2025, 3, 10)
+
+
+class ReviewAlertsQueryCountTest(TestCase):
+    """Alerty przeglądu tygodniowego: stała liczba zapytań niezależnie od liczby szablonów i obszarów."""
+
+    def make_user(self, patterns, areas, blockers):
+        user = get_user_model().objects.create_user(username=f'review-{patterns}-{areas}-{blockers}')
+
+        # Co drugi szablon po terminie ma otwartą instancję, reszta jest przerwana
+        pattern_objs = RecurringPattern.objects.bulk_create([
+            RecurringPattern(user=user, title=f'Cykl {i}', next_run_date=TODAY - timedelta(days=1 + i % 5))
+            for i in range(patterns)
+        ])
+        Task.objects.bulk_create([
+            Task(user=user, title=f'Instancja {i}', status='todo', recurring_pattern=pattern)
+            for i, pattern in enumerate(pattern_objs) if i % 2 == 0
+        ])
+
+        # Co trzeci obszar ma zadanie ukończone w ostatnim tygodniu
+        area_objs = Area.objects.bulk_create([Area(user=user, name=f'Obszar {i}') for i in range(areas)])
+        Task.objects.bulk_create([
+            Task(user=user, title=f'Zrobione {i}', status='done', area=area)
+            for i, area in enumerate(area_objs) if i % 3 == 0
+        ])
+
+        # Każdy bloker trzyma dwa zablokowane zadania
+        roots = Task.objects.bulk_create([
+            Task(user=user, title=f'Bloker {i}', status='todo') for i in range(blockers)
+        ])
+        children = Task.objects.bulk_create([
+            Task(user=user, title=f'Czeka {i}', status='blocked') for i in range(2 * blockers)
+        ])
+        Task.blocked_by.through.objects.bulk_create([
+            Task.blocked_by.through(from_task_id=child.id, to_task_id=roots[i // 2].id)
+            for i, child in enumerate(children)
+        ])
+        return user
+
+    def test_query_count_does_not_grow_with_data(self):
+        service = ReportService()
+
+        for patterns, areas, blockers in ((5, 3, 2), (500, 50, 40)):
+            with self.subTest(patterns=patterns, areas=areas):
+                user = self.make_user(patterns, areas, blockers)
+
+                with self.assertNumQueries(1):
+                    broken = service.get_broken_cycles(user, today=TODAY)
+                with self.assertNumQueries(1):
+                    neglected = service.get_neglected_areas(user, today=TODAY)
+                with self.assertNumQueries(2):
+                    chains = service.get_blocking_chains(user)
+                    children = [len(chain['children']) for chain in chains]
+
+                self.assertEqual(len(broken), patterns // 2)
+                self.assertEqual(len(neglected), areas - len(range(0, areas, 3)))
+                self.assertEqual(children, [2] * blockers)
+
+    def test_results_ignore_other_users(self):
+        user = self.make_user(10, 6, 3)
+        other = self.make_user(20, 9, 4)
+        service = ReportService()
+
+        self.assertTrue(all(p.user_id == user.id for p in service.get_broken_cycles(user, today=TODAY)))
+        self.assertTrue(all(a.user_id == user.id for a in service.get_neglected_areas(user, today=TODAY)))
+        self.assertEqual(len(service.get_blocking_chains(other)), 4)
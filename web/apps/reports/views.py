@@ -1,19 +1,12 @@
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
-from apps.tasks.models import Task
-from apps.projects.models import Project
-from apps.goals.models import Goal
-from .domain.services import ReportService
-from apps.tasks.domain.services.tickler import TicklerService
-from django.utils import timezone
-from datetime import date, timedelta
-from apps.tasks.models import RecurringPattern
+from .application.stats_report import get_stats_report
+from .application.weekly_review import get_weekly_review_page
+from datetime import date
 from .models import ReviewSession
 from django import forms
-from apps.areas.models import Area
-from apps.notes.models import Note
 
 
 # Prosty formularz (można w forms.py, ale tu szybciej dla MVP)
@@ -31,43 +24,29 @@ class ReviewForm(forms.ModelForm):
 @login_required
 def stats_api_view(request):
     """
-    API zwracające dane do wykresów (Activity, Status, Areas).
+    API zwracające dane do wykresów (Activity, Status, Areas, Contexts, Habits, Recurring, Heatmap).
+    ?sections=activity,breakdown - tylko wybrane sekcje (domyślnie wszystkie); sekcje z cache
+    per użytkownik, unieważniane przy zapisie (StatsReport).
     """
-    service = ReportService()
+    report = get_stats_report()
+    names = [name for name in request.GET.get('sections', '').split(',') if name] or None
 
-    # 1. Pobierz podstawowe statystyki
-    stats_data = service.get_weekly_stats(request.user)
-
-    # 2. Pobierz dane o obszarach
-    area_data = service.get_area_distribution(request.user)
-
-    # 3. Pobierz skuteczność nawyków
-    habit_data = service.get_habit_stats(request.user)
-
-    # 4. NOWE: Pobierz zdrowie zadań cyklicznych
-    recurring_data = service.get_recurring_health(request.user)
-
-    # Zbuduj odpowiedź
-    response_data = {
-        'period': stats_data['period'],
-        'completed': stats_data['completed'],
-        'created': stats_data['created'],
-        'velocity': stats_data['velocity'],
-        'breakdown': stats_data['breakdown'],
-        'area_chart': area_data,
-        'habit_stats': habit_data,
-        'recurring_stats': recurring_data
-    }
+    try:
+        response_data = report.build(request.user, names)
+    except ValueError as e:
+        return JsonResponse({'error': str(e), 'sections': report.public_names}, status=400)
 
     return JsonResponse(response_data)
 
 
 @login_required
-def weekly_review_view(request):
-    user = request.user
+async def weekly_review_view(request):
+    """
+    Przegląd tygodniowy. Sekcje (tickler, alerty, listy statusów, łańcuchy blokad...) są od siebie
+    niezależne - WeeklyReviewPage liczy je równolegle i trzyma jako fragmenty HTML w cache.
+    """
+    user = await request.auser()
     today = date.today()
-    tickler = TicklerService()
-    service = ReportService()
 
     # ----------------------------------------------------
     # 1. Obsługa Zapisu Sesji (Formularz)
@@ -77,119 +56,20 @@ def weekly_review_view(request):
         if form.is_valid():
             session = form.save(commit=False)
             session.user = user
-            session.save()
+            await session.asave()
             return redirect('weekly_review')  # PRG pattern
     else:
         form = ReviewForm()
 
-    last_review = ReviewSession.objects.filter(user=user).order_by('-date').first()
-
     # ----------------------------------------------------
-    # 2. Tickler File & Stale Tasks
+    # 2. Sekcje przeglądu (application/weekly_review.py)
     # ----------------------------------------------------
-    tasks_due_for_review = tickler.get_tasks_for_review(user)
-    stale_tasks = tickler.get_stale_waiting_tasks(user)
-
-    # ----------------------------------------------------
-    # 3. Alerty Operacyjne (WIP, Recurring)
-    # ----------------------------------------------------
-    # WIP Limit
-    active_tasks_count = Task.objects.filter(user=user, status__in=['scheduled', 'paused']).count()
-    wip_limit = getattr(user.profile, 'wip_limit', 5)
-    wip_alert = None
-    if active_tasks_count > wip_limit:
-        wip_alert = f"Masz {active_tasks_count} aktywnych zadań (Limit: {wip_limit})."
-
-    # Broken Recurring Cycles
-    broken_cycles = []
-    active_patterns = RecurringPattern.objects.filter(user=user, is_active=True)
-    for pat in active_patterns:
-        if pat.next_run_date < today:
-            has_active = Task.objects.filter(
-                recurring_pattern=pat,
-                status__in=['todo', 'scheduled', 'overdue']
-            ).exists()
-            if not has_active:
-                broken_cycles.append(pat)
-
-    # ----------------------------------------------------
-    # 4. Alerty Strategiczne (Projekty, Cele, Obszary)
-    # ----------------------------------------------------
-
-    # Puste Projekty
-    empty_projects = Project.objects.filter(user=user, status='active').annotate(
-        total_tasks=Count('tasks')
-    ).filter(total_tasks=0)
+    sections = await get_weekly_review_page().render(user, today)
 
-    # Cele bez postępu (Stagnant)
-    # Deadline < 14 dni i Progress < 20%
-    warning_date = today + timedelta(days=14)
-    # Zakładamy, że pole progress istnieje w modelu Goal (dodane w poprzednim kroku)
-    stagnant_goals = Goal.objects.filter(
-        user=user,
-        deadline__lte=warning_date,
-        progress__lt=20
-    )
-
-    # Zaniedbane Obszary (Neglected Areas) - NOWE
-    # Obszary, w których nie ukończono żadnego zadania w ostatnich 7 dniach
-    week_ago = today - timedelta(days=7)
-    neglected_areas = []
-    all_areas = Area.objects.filter(user=user)  # Można dodać is_active=True
-
-    for area in all_areas:
-        completed_count = Task.objects.filter(
-            area=area,
-            status='done',
-            updated_at__gte=week_ago
-        ).count()
-
-        if completed_count == 0:
-            neglected_areas.append(area)
-
-    # 5. Łańcuchy Blokad (Dependency Chains)
-    service = ReportService() # Jeśli nie masz instancji
-    blocking_chains = service.get_blocking_chains(user)
-
-    context_data = service.get_context_distribution(request.user)
-
-    # 6. Projekty Wstrzymane (On Hold)
-    projects_on_hold = Project.objects.filter(user=user, status='on_hold')
-    delegated_tasks = Task.objects.filter(user=user, status='delegated')
-    postponed_tasks = Task.objects.filter(user=user, status='postponed')
-    waiting_tasks = Task.objects.filter(user=user, status='waiting')
-
-    # 6. Luźne Notatki (Inbox Notatek)
-    # Notatki bez projektu i bez zadania
-    loose_notes = Note.objects.filter(
-        user=user,
-        project__isnull=True,
-        task__isnull=True
-    ).order_by('-created_at')
-
-
-    return render(request, 'reports/weekly_review.html', {
+    # Szablon bazowy sięga po request.user (sesja, baza) - renderujemy w kontekście synchronicznym
+    return await sync_to_async(render)(request, 'reports/weekly_review.html', {
         'review_form': form,
-        'last_review': last_review,
-
-        'due_review': tasks_due_for_review,
-        'stale_tasks': stale_tasks,
-
-        'wip_alert': wip_alert,
-        'broken_cycles': broken_cycles,
-
-        'empty_projects': empty_projects,
-        'stagnant_goals': stagnant_goals,
-        'neglected_areas': neglected_areas,
-        'context_data': context_data,
-        'blocking_chains': blocking_chains,
-
-        'delegated_tasks': delegated_tasks,
-        'postponed_tasks': postponed_tasks,
-        'waiting_tasks': waiting_tasks,
-        'projects_on_hold': projects_on_hold,
-        'loose_notes': loose_notes,
-
+        'sections': sections,
     })
 
 
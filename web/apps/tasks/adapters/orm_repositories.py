@@ -1,31 +1,54 @@
 # apps/tasks/adapters/orm_repositories.py
+from datetime import datetime, time
 from typing import List, Optional
-from apps.tasks.domain.entities import TaskEntity, TaskStatus
+import pytz
+from apps.tasks.domain.entities import TaskEntity, TaskSnapshot, TaskStatus
 from apps.tasks.ports.repositories import ITaskRepository
 from apps.tasks.models import Task as TaskModel
+from apps.tasks.application.unit_of_work import task_saved
+from apps.tasks.changes import TaskChanges
+
+
+def _end_of_day(d) -> Optional[datetime]:
+    """Konwersja date -> datetime (koniec dnia, UTC)."""
+    if not d:
+        return None
+    return datetime.combine(d, time.max).replace(tzinfo=pytz.UTC)
+
+
+# Kolumny dla TaskSnapshot (kolejność = TaskSnapshot.FIELDS)
+SNAPSHOT_COLUMNS = (
+    'id', 'status', 'duration_min', 'duration_max', 'due_date',
+    'priority', 'energy_required', 'complexity',
+    'is_private', 'percent_complete', 'is_critical_path', 'is_milestone',
+    'project_id', 'context_id', 'area_id', 'area__color',
+    'project__goal__deadline', 'project__deadline', 'ready_since', 'created_at',
+)
+
 
 class DjangoTaskRepository(ITaskRepository):
-    def to_entity(self, model: TaskModel) -> TaskEntity:
-        """Konwertuje Model Django -> Czystą Encję."""
+    def __init__(self):
+        # Memo puli aktywnych zadań na czas życia repozytorium (w widokach: jeden request).
+        # Klucz: (rodzaj, user_id, is_private, context_id, area_id)
+        self._active_memo = {}
 
-        # Logika pobierania deadline'u celu
+    def to_entity(self, model: TaskModel, blocked_by: Optional[List[int]] = None) -> TaskEntity:
+        """
+        Konwertuje Model Django -> Czystą Encję.
+        blocked_by można podać z góry (odczyty zbiorcze); bez niego robimy osobne zapytanie.
+        """
+        if blocked_by is None:
+            blocked_by = list(model.blocked_by.values_list('id', flat=True))
+
+        # Logika pobierania deadline'u celu (date -> datetime, koniec dnia)
         goal_deadline = None
-        if model.project and model.project.goal and model.project.goal.deadline:
-            from datetime import datetime, time
-            import pytz
-            # Konwersja date -> datetime (koniec dnia)
-            # Używamy UTC lub strefy z settings, dla uproszczenia tutaj naive lub UTC
-            d = model.project.goal.deadline
-            goal_deadline = datetime.combine(d, time.max).replace(tzinfo=pytz.UTC)
+        if model.project and model.project.goal:
+            goal_deadline = _end_of_day(model.project.goal.deadline)
 
         # NOWY KOD: Project Deadline
         project_deadline = None
-        if model.project and model.project.deadline:
-            from datetime import datetime, time
-            import pytz
-            # Konwersja date -> datetime (koniec dnia)
-            d = model.project.deadline
-            project_deadline = datetime.combine(d, time.max).replace(tzinfo=pytz.UTC)
+        if model.project:
+            project_deadline = _end_of_day(model.project.deadline)
 
         return TaskEntity(
             id=model.id,
@@ -56,11 +79,29 @@ class DjangoTaskRepository(ITaskRepository):
             project_deadline=project_deadline,
             is_milestone=model.is_milestone,
             ready_since=model.ready_since,
-            blocked_by=list(model.blocked_by.values_list('id', flat=True)),
+            blocked_by=blocked_by,
             created_at=model.created_at,
 
         )
 
+    def to_entities(self, qs) -> List[TaskEntity]:
+        """
+        Zbiorcza konwersja: wszystkie krawędzie zależności dla zestawu wyników
+        pobieramy jednym zapytaniem i składamy blocked_by w pamięci (zamiast N+1).
+        """
+        models = list(qs)
+        if not models:
+            return []
+
+        blocked_by_map = {m.id: [] for m in models}
+        edges = TaskModel.blocked_by.through.objects.filter(
+            from_task_id__in=blocked_by_map.keys()
+        ).values_list('from_task_id', 'to_task_id')
+        for task_id, blocker_id in edges:
+            blocked_by_map[task_id].append(blocker_id)
+
+        return [self.to_entity(m, blocked_by=blocked_by_map[m.id]) for m in models]
+
     def get_by_id(self, task_id: int) -> Optional[TaskEntity]:
         try:
             task = TaskModel.objects.get(id=task_id)
@@ -69,6 +110,7 @@ class DjangoTaskRepository(ITaskRepository):
             return None
 
     def save(self, task: TaskEntity, user_id: int = None) -> TaskEntity:
+        self._active_memo.clear()  # Zapis unieważnia zapamiętaną pulę
         data = {
             'title': task.title,
             'description': task.description,
@@ -94,8 +136,14 @@ class DjangoTaskRepository(ITaskRepository):
 
         if task.id:
             # Aktualizacja istniejącego
+            old_values = TaskModel.objects.filter(id=task.id).values(*TaskModel.TRACKED_FIELDS).first()
             TaskModel.objects.filter(id=task.id).update(**data)
             obj = TaskModel.objects.get(id=task.id)
+
+            # .update() omija post_save - plany unieważniamy, a przeliczenia (CPM, cel) zlecamy ręcznie
+            from apps.calendar_app.application.plan_cache import invalidate_user_plans
+            invalidate_user_plans(obj.user_id)
+            task_saved(obj, TaskChanges(obj, old_values))
         else:
             # Tworzenie nowego (wymaga user_id)
             if user_id is None:
@@ -114,22 +162,79 @@ class DjangoTaskRepository(ITaskRepository):
         return self.to_entity(obj)
 
     def filter_by_status(self, status: TaskStatus) -> List[TaskEntity]:
-        qs = TaskModel.objects.filter(status=status.value)
-        return [self.to_entity(t) for t in qs]
+        qs = TaskModel.objects.filter(status=status.value).select_related('area', 'project__goal')
+        return self.to_entities(qs)
 
-    def get_active_tasks(self) -> List[TaskEntity]:
-        # Active = To Do lub Scheduled
-        # Dodajemy select_related('area'), żeby Django pobrało dane obszaru w jednym zapytaniu JOIN
+    def _active_queryset(self, user_id=None, is_private=None, context_id=None, area_id=None):
+        """Aktywne zadania (todo/scheduled) z filtrami zepchniętymi do SQL."""
         qs = TaskModel.objects.filter(
             status__in=[TaskStatus.TODO.value, TaskStatus.SCHEDULED.value]
-        ).select_related('area', 'project__goal')
+        )
+        if user_id is not None:
+            qs = qs.filter(user_id=user_id)
+        if is_private is not None:
+            qs = qs.filter(is_private=is_private)
+        if context_id is not None:
+            qs = qs.filter(context_id=context_id)
+        if area_id is not None:
+            qs = qs.filter(area_id=area_id)
+        return qs
+
+    def get_active_tasks(
+            self,
+            user_id: Optional[int] = None,
+            is_private: Optional[bool] = None,
+            context_id: Optional[int] = None,
+            area_id: Optional[int] = None
+        ) -> List[TaskEntity]:
+        key = ('tasks', user_id, is_private, context_id, area_id)
+        if key not in self._active_memo:
+            # select_related: area (kolor) i project__goal (deadline) w jednym zapytaniu
+            qs = self._active_queryset(user_id, is_private, context_id, area_id).select_related(
+                'area', 'project__goal'
+            )
+            self._active_memo[key] = self.to_entities(qs)
+        return list(self._active_memo[key])
+
+    def get_active_snapshots(
+            self,
+            user_id: Optional[int] = None,
+            is_private: Optional[bool] = None,
+            context_id: Optional[int] = None,
+            area_id: Optional[int] = None
+        ) -> List[TaskSnapshot]:
+        """
+        Aktywne zadania jako lekkie TaskSnapshot (jedno zapytanie .values_list(), bez tytułów).
+        Tytuły dociągamy przez resolve_titles() tylko dla zadań, które trafią do planu.
+        """
+        key = ('snapshots', user_id, is_private, context_id, area_id)
+        if key not in self._active_memo:
+            rows = self._active_queryset(user_id, is_private, context_id, area_id).values_list(*SNAPSHOT_COLUMNS)
+
+            snapshots = []
+            for row in rows:
+                snapshot = TaskSnapshot(*row)
+                # Terminy celu/projektu to daty -> koniec dnia (jak w to_entity)
+                snapshot.goal_deadline = _end_of_day(snapshot.goal_deadline)
+                snapshot.project_deadline = _end_of_day(snapshot.project_deadline)
+                snapshots.append(snapshot)
+            self._active_memo[key] = snapshots
+        return list(self._active_memo[key])
 
-        return [self.to_entity(t) for t in qs]
+    def resolve_titles(self, snapshots: List[TaskSnapshot]) -> None:
+        """Uzupełnia tytuły podanych snapshotów jednym zapytaniem."""
+        missing = {s.id for s in snapshots if s.title is None}
+        if not missing:
+            return
+        titles = dict(TaskModel.objects.filter(id__in=missing).values_list('id', 'title'))
+        for s in snapshots:
+            if s.title is None:
+                s.title = titles.get(s.id, "")
 
     def get_dependent_tasks(self, blocker_id: int) -> List[TaskEntity]:
         # Szukamy zadań, które mają w polu 'blocked_by' nasze zadanie (blocker_id)
-        qs = TaskModel.objects.filter(blocked_by__id=blocker_id)
-        return [self.to_entity(t) for t in qs]
+        qs = TaskModel.objects.filter(blocked_by__id=blocker_id).select_related('area', 'project__goal')
+        return self.to_entities(qs)
 
     def has_active_blockers(self, task_id: int) -> bool:
         """
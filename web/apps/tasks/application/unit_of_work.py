@@ -0,0 +1,173 @@
+# apps/tasks/application/unit_of_work.py
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Set
+from django.db import transaction
+
+
+_local = threading.local()
+
+
+class TaskUnitOfWork:
+    """
+    Skutki uboczne zapisów zadań, zbierane i wykonywane raz - po commicie transakcji.
+
+    Zamiast przeliczać CPM przy każdym Task.save(), receivery tylko dopisują tu,
+    co trzeba przeliczyć. Duplikaty się scalają: dziesięć ukończonych zadań
+    w jednym projekcie to jedno przeliczenie CPM.
+    """
+
+    def __init__(self):
+        # {project_id: ID zmienionych zadań albo None = pełne przeliczenie}
+        self.cpm: Dict[int, Optional[Set[int]]] = {}
+        self.completed_task_ids: Set[int] = set()  # obsługa zadań cyklicznych (tryb dynamiczny)
+
+    def __bool__(self) -> bool:
+        return bool(self.cpm or self.completed_task_ids)
+
+    def recalculate_cpm(self, project_id: int, task_ids: Optional[Iterable[int]] = None):
+        if project_id in self.cpm and self.cpm[project_id] is None:
+            return
+        if task_ids is None:
+            self.cpm[project_id] = None
+        else:
+            self.cpm.setdefault(project_id, set()).update(task_ids)
+
+    def handle_completion(self, task_id: int):
+        self.completed_task_ids.add(task_id)
+
+    def merge(self, other: 'TaskUnitOfWork'):
+        for project_id, task_ids in other.cpm.items():
+            self.recalculate_cpm(project_id, task_ids)
+        self.completed_task_ids |= other.completed_task_ids
+
+    def run(self):
+        """Wykonuje zebrane skutki (wołane z transaction.on_commit)."""
+        if getattr(_local, 'pending', None) is self:
+            _local.pending = None
+
+        cpm, completed_task_ids = self.cpm, self.completed_task_ids
+        self.cpm, self.completed_task_ids = {}, set()
+
+        if cpm:
+            from apps.projects.services.project_service import ProjectService
+            service = ProjectService()
+            for project_id, task_ids in cpm.items():
+                service.recalculate_cpm(project_id, changed_task_ids=task_ids)
+
+        if completed_task_ids:
+            self._handle_completions(completed_task_ids)
+
+    def is_scheduled_on(self, connection) -> bool:
+        """Czy run() wciąż czeka w kolejce on_commit (rollback savepointu ją czyści)."""
+        return any(entry[1] == self.run for entry in connection.run_on_commit)
+
+    @staticmethod
+    def _handle_completions(task_ids: Set[int]):
+        from apps.tasks.domain.services import RecurrenceService
+        from apps.tasks.models import Task
+
+        # Stan sprzed commitu mógł się zmienić (ponowne otwarcie, rollback savepointu) - czytamy z bazy
+        tasks = Task.objects.filter(
+            id__in=task_ids, status='done', recurring_pattern__isnull=False
+        ).select_related('recurring_pattern')
+
+        service = RecurrenceService()
+        for task in tasks:
+            service.handle_task_completion(task)
+
+
+def _stack() -> list:
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def current_unit_of_work() -> TaskUnitOfWork:
+    """
+    Jednostka pracy, do której trafiają skutki bieżącego zapisu.
+
+    - wewnątrz task_unit_of_work(): ta otwarta (wykonanie przy wyjściu / po commicie),
+    - w transakcji: jedna na transakcję, podpięta pod transaction.on_commit,
+    - w autocommit: nowa, wykonywana od razu po dopisaniu (zob. defer).
+    """
+    stack = _stack()
+    if stack:
+        return stack[-1]
+
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        pending = getattr(_local, 'pending', None)
+        if pending is None or not pending.is_scheduled_on(connection):
+            pending = _local.pending = TaskUnitOfWork()
+            transaction.on_commit(pending.run)
+        return pending
+
+    return TaskUnitOfWork()
+
+
+@contextmanager
+def defer():
+    """
+    Dopisywanie skutków do bieżącej jednostki pracy:
+
+        with defer() as uow:
+            uow.recalculate_cpm(project_id, {task_id})
+
+    Poza transakcją i poza task_unit_of_work() skutki wykonują się od razu po bloku.
+    """
+    uow = current_unit_of_work()
+    yield uow
+    if uow is not getattr(_local, 'pending', None) and uow not in _stack():
+        uow.run()
+
+
+@contextmanager
+def task_unit_of_work():
+    """
+    Zbiera skutki uboczne wszystkich zapisów zadań w bloku i wykonuje je raz:
+    po commicie otaczającej transakcji albo (w autocommit) przy wyjściu z bloku.
+    Bloki mogą się zagnieżdżać - wewnętrzny oddaje skutki zewnętrznemu.
+    """
+    uow = TaskUnitOfWork()
+    stack = _stack()
+    stack.append(uow)
+    try:
+        yield uow
+    finally:
+        stack.pop()
+        if uow:
+            if stack:
+                stack[-1].merge(uow)
+            else:
+                # W transakcji - po commicie (rollback je odrzuca); w autocommit - od razu
+                transaction.on_commit(uow.run)
+
+
+def task_saved(task, changes):
+    """
+    Skutki zapisu zadania (receiver post_save oraz DjangoTaskRepository.save, który omija sygnały).
+    changes - TaskChanges: stan sprzed zapisu vs bieżący.
+    """
+    created = changes.created
+    old_project_id = changes.old('project_id')
+
+    # Liczniki postępu projektu/celu - od razu, w transakcji zapisu (delta, bez agregacji)
+    if changes.has_changed('status', 'project_id'):
+        from apps.projects.services.progress_service import ProgressService
+        ProgressService().apply_task_change(
+            old=None if created else (old_project_id, changes.old('status') == 'done'),
+            new=(task.project_id, task.status == 'done'),
+        )
+
+    with defer() as uow:
+        # CPM tylko, gdy zmieniły się pola wpływające na graf
+        if created or changes.old_cpm_key() != task.cpm_key():
+            if old_project_id and old_project_id != task.project_id:
+                # Zadanie przeniesione - stary projekt też traci węzeł
+                uow.recalculate_cpm(old_project_id, {task.id})
+            if task.project_id:
+                uow.recalculate_cpm(task.project_id, {task.id})
+
+        if task.status == 'done' and changes.old('status') != 'done' and task.recurring_pattern_id:
+            uow.handle_completion(task.id)
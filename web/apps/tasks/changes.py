@@ -0,0 +1,53 @@
+# apps/tasks/changes.py
+from typing import Any, Dict, Optional, Set
+
+
+class TaskChanges:
+    """
+    Różnica stanu zadania: sprzed zapisu vs bieżący.
+
+    Tworzona raz na zapis (receiver pre_save track_task_changes) i dostępna dla wszystkich
+    receiverów jako instance.changes. Stan "przed" pochodzi z migawki zrobionej przy odczycie
+    zadania z bazy (Task.from_db), więc typowy zapis nie wymaga dodatkowego SELECT-a.
+    Porównania są leniwe - widzą też zmiany wprowadzone przez późniejsze receivery pre_save.
+    """
+
+    def __init__(self, instance, old_values: Optional[Dict[str, Any]]):
+        self.instance = instance
+        self.old_values = old_values  # None = zadania nie było w bazie
+
+    @classmethod
+    def capture(cls, instance) -> 'TaskChanges':
+        """Migawka z odczytu, a gdy jej brak (instancja zbudowana ręcznie, only()) - jedno zapytanie."""
+        if instance.pk is None:
+            return cls(instance, None)
+
+        old_values = getattr(instance, '_loaded_values', None)
+        if old_values is None or instance._state.adding:
+            old_values = type(instance).objects.filter(pk=instance.pk).values(*instance.TRACKED_FIELDS).first()
+            return cls(instance, old_values)
+        return cls(instance, dict(old_values))  # kopia - migawka instancji odświeża się po zapisie
+
+    @property
+    def created(self) -> bool:
+        return self.old_values is None
+
+    def old(self, field: str) -> Any:
+        """Wartość pola sprzed zapisu (None dla nowego zadania)."""
+        return None if self.old_values is None else self.old_values[field]
+
+    def has_changed(self, *fields: str) -> bool:
+        """Czy którekolwiek z pól się zmieniło (dla nowego zadania - zawsze)."""
+        if self.old_values is None:
+            return True
+        return any(self.old_values[f] != getattr(self.instance, f) for f in fields)
+
+    @property
+    def changed_fields(self) -> Set[str]:
+        return {f for f in self.instance.TRACKED_FIELDS if self.has_changed(f)}
+
+    def old_cpm_key(self) -> Optional[tuple]:
+        """Task.cpm_key() sprzed zapisu."""
+        if self.old_values is None:
+            return None
+        return self.instance.cpm_key_from(**{f: self.old_values[f] for f in self.instance.CPM_INPUT_FIELDS})
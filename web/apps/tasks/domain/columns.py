@@ -0,0 +1,102 @@
+# apps/tasks/domain/columns.py
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_us(dt: Optional[datetime]) -> int:
+    """Datetime -> mikrosekundy od epoki (dokładnie, bez floatów). Naive traktujemy jako UTC."""
+    if dt is None:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@dataclass
+class TaskColumns:
+    """
+    Kolumnowa (struct-of-arrays) reprezentacja zadań dla scoringu wektorowego.
+    Daty trzymamy jako int64 mikrosekund od epoki, więc różnice czasu są dokładne
+    i dają te same wartości co timedelta.total_seconds() w ścieżce skalarnej.
+    """
+    priority: np.ndarray
+    duration: np.ndarray  # duration_expected
+    complexity: np.ndarray
+    energy: np.ndarray
+    project_id: np.ndarray  # 0 = brak projektu
+    is_critical: np.ndarray
+    is_milestone: np.ndarray
+
+    has_due: np.ndarray
+    due_us: np.ndarray
+    due_ordinal: np.ndarray  # due_date.date().toordinal() (dla EOD)
+    has_goal_deadline: np.ndarray
+    goal_deadline_us: np.ndarray
+    has_project_deadline: np.ndarray
+    project_deadline_us: np.ndarray
+    has_start: np.ndarray  # ready_since lub created_at
+    start_us: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.priority)
+
+    @classmethod
+    def from_tasks(cls, tasks: List) -> 'TaskColumns':
+        """Pakuje listę encji (TaskEntity lub zgodnych) w kolumny."""
+        n = len(tasks)
+        priority = np.empty(n, dtype=np.float64)
+        duration = np.empty(n, dtype=np.float64)
+        complexity = np.empty(n, dtype=np.float64)
+        energy = np.empty(n, dtype=np.float64)
+        project_id = np.zeros(n, dtype=np.int64)
+        is_critical = np.zeros(n, dtype=bool)
+        is_milestone = np.zeros(n, dtype=bool)
+        has_due = np.zeros(n, dtype=bool)
+        due_us = np.zeros(n, dtype=np.int64)
+        due_ordinal = np.zeros(n, dtype=np.int64)
+        has_goal = np.zeros(n, dtype=bool)
+        goal_us = np.zeros(n, dtype=np.int64)
+        has_project = np.zeros(n, dtype=bool)
+        project_us = np.zeros(n, dtype=np.int64)
+        has_start = np.zeros(n, dtype=bool)
+        start_us = np.zeros(n, dtype=np.int64)
+
+        for i, task in enumerate(tasks):
+            priority[i] = task.priority
+            duration[i] = task.duration_expected
+            complexity[i] = task.complexity
+            energy[i] = task.energy_required
+            project_id[i] = task.project_id or 0
+            is_critical[i] = bool(getattr(task, 'is_critical_path', False))
+            is_milestone[i] = bool(task.is_milestone)
+
+            if task.due_date:
+                has_due[i] = True
+                due_us[i] = epoch_us(task.due_date)
+                due_ordinal[i] = task.due_date.date().toordinal()
+            if task.goal_deadline:
+                has_goal[i] = True
+                goal_us[i] = epoch_us(task.goal_deadline)
+            if task.project_deadline:
+                has_project[i] = True
+                project_us[i] = epoch_us(task.project_deadline)
+
+            start_time = task.ready_since if task.ready_since else task.created_at
+            if start_time:
+                has_start[i] = True
+                start_us[i] = epoch_us(start_time)
+
+        return cls(
+            priority=priority, duration=duration, complexity=complexity, energy=energy,
+            project_id=project_id, is_critical=is_critical, is_milestone=is_milestone,
+            has_due=has_due, due_us=due_us, due_ordinal=due_ordinal,
+            has_goal_deadline=has_goal, goal_deadline_us=goal_us,
+            has_project_deadline=has_project, project_deadline_us=project_us,
+            has_start=has_start, start_us=start_us,
+        )
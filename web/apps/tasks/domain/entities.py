@@ -1,6 +1,6 @@
 # apps/tasks/domain/entities.py
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Optional
 from enum import Enum
 
@@ -77,4 +77,57 @@ class TaskEntity:
         return base
 
     def is_active(self) -> bool:
-        return self.status in [TaskStatus.TODO, TaskStatus.SCHEDULED]
\ No newline at end of file
+        return self.status in [TaskStatus.TODO, TaskStatus.SCHEDULED]
+
+class TaskSnapshot:
+    """
+    Lekki model odczytu dla Schedulera i TaskScorer.
+    Zawiera tylko pola liczbowe/terminy potrzebne do planowania (bez opisu i blocked_by).
+    Tytuł dociągany jest osobno - tylko dla zadań, które faktycznie trafiły do planu.
+    """
+    __slots__ = (
+        'id', 'status', 'duration_min', 'duration_max', 'due_date',
+        'priority', 'energy_required', 'complexity',
+        'is_private', 'percent_complete', 'is_critical_path', 'is_milestone',
+        'project_id', 'context_id', 'area_id', 'area_color',
+        'goal_deadline', 'project_deadline', 'ready_since', 'created_at',
+        'title',
+    )
+
+    # Kolejność pól w krotce z repozytorium (values_list)
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, *values, title: Optional[str] = None):
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+        self.title = title
+
+    def __repr__(self):
+        return f"TaskSnapshot(id={self.id}, title={self.title!r})"
+
+    # Ta sama logika co w encji
+    duration_expected = TaskEntity.duration_expected
+    effective_duration = TaskEntity.effective_duration
+    is_active = TaskEntity.is_active
+
+
+@dataclass(frozen=True)
+class RecurringOccurrence:
+    """
+    Wirtualne wystąpienie zadania cyklicznego: projekcja szablonu na przyszły dzień, bez wiersza Task.
+    Tylko do odczytu - widoki planu liczą je do obciążenia dnia; zadanie powstaje dopiero
+    w run_daily_recurrence.
+    """
+    pattern_id: int
+    title: str
+    day: date
+    duration_min: Optional[int] = None
+    priority: int = 3
+    project_id: Optional[int] = None
+
+    is_virtual = True  # Odróżnienie od ScheduledItem / FixedEvent w szablonach
+
+    @property
+    def duration_expected(self) -> int:
+        # Instancja dostaje duration_min = duration_max = default_duration_min
+        return self.duration_min or 30
@@ -0,0 +1,75 @@
+# apps/tasks/domain/rules.py
+import threading
+from datetime import date, datetime, time
+from typing import Dict, Hashable, List, Optional, Tuple
+from dateutil.rrule import rrulebase, rrulestr
+
+
+def as_datetime(day: date) -> datetime:
+    """Data -> północ tego dnia (naive, jak DTSTART reguły)."""
+    return datetime.combine(day, time.min)
+
+
+# Liczba skompilowanych reguł w cache (każda z własnym cache wystąpień dateutil)
+RULE_CACHE_SIZE = 512
+
+
+class RuleCache:
+    """
+    Skompilowane reguły RRULE, kluczowane ID szablonu i odciskiem pól cyklu.
+
+    rrulestr() parsuje string od nowa przy każdym wywołaniu; tu reguła szablonu
+    jest budowana raz i trzymana, dopóki nie zmienią się pola, z których powstała
+    (inny odcisk = nowa kompilacja w miejscu starej, więc na szablon przypada jeden wpis).
+    Reguły mają włączony wewnętrzny cache dateutil - kolejne wystąpienia liczone są raz.
+    Ten cache trzyma każde policzone wystąpienie od DTSTART (reguła dzienna sprzed roku
+    to ~365 dat, ~20 KB), dlatego liczba reguł jest mała i wypierane są najdawniej używane (LRU).
+    Przy większej liczbie szablonów reguła jest po prostu kompilowana ponownie.
+    """
+
+    def __init__(self, maxsize: int = RULE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._rules: Dict[int, Tuple[Hashable, rrulebase]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pattern_id: Optional[int], fingerprint: Hashable, rrule_string: str, start: date) -> rrulebase:
+        if pattern_id is not None:
+            entry = self._rules.get(pattern_id)
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                with self._lock:
+                    # Ostatnio używany na koniec (kolejność wstawiania = kolejność LRU)
+                    self._rules[pattern_id] = self._rules.pop(pattern_id, entry)
+                return entry[1]
+
+        self.misses += 1
+        rule = rrulestr(rrule_string, dtstart=as_datetime(start), cache=True)
+        if pattern_id is not None:
+            with self._lock:
+                if pattern_id not in self._rules and len(self._rules) >= self.maxsize:
+                    # Najdawniej używany wpis
+                    self._rules.pop(next(iter(self._rules)))
+                self._rules[pattern_id] = (fingerprint, rule)
+        return rule
+
+    def clear(self):
+        with self._lock:
+            self._rules.clear()
+
+
+rule_cache = RuleCache()
+
+
+def occurrences_between(rule: rrulebase, start: date, end: date) -> List[date]:
+    """Dni wystąpień reguły w przedziale [start, end] (włącznie)."""
+    if end < start:
+        return []
+    return [dt.date() for dt in rule.between(as_datetime(start), as_datetime(end), inc=True)]
+
+
+def next_occurrence(rule: rrulebase, after: date) -> Optional[date]:
+    """Pierwszy dzień wystąpienia ściśle po dniu after (None = koniec serii)."""
+    dt = rule.after(as_datetime(after))
+    return dt.date() if dt else None
@@ -1,85 +1,214 @@
 #apps/tasks/domain/services/recurrence.py
-from datetime import date, datetime, timedelta
-from typing import List
-from dateutil.rrule import rrulestr
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from apps.tasks.models import Task, RecurringPattern
-from apps.tasks.domain.entities import TaskStatus
+from apps.tasks.domain.entities import RecurringOccurrence, TaskStatus
 from apps.tasks.models import ChecklistItem
 
 
+@dataclass
+class RecurrenceRunResult:
+    """Podsumowanie przebiegu generatora (w trybie dry_run - co zostałoby zrobione)."""
+    patterns: int = 0  # przetworzone szablony
+    generated: int = 0  # nowe zadania
+    checklist_items: int = 0
+    duplicates: int = 0  # instancja na ten termin już istniała - tylko przesunięcie terminu
+    deactivated: int = 0  # koniec serii (end_date / max_occurrences / brak kolejnego terminu)
+    errors: int = 0  # błędne RRULE (termin szablonu bez zmian)
+    batches: int = 0
+
+
 class RecurrenceService:
-    def generate_daily_instances(self) -> List[Task]:
-        """Sprawdza aktywne szablony (Fixed) i generuje zadania na dziś."""
+    # Statusy, przy których instancja na dany termin "już jest"
+    EXISTING_STATUSES = [TaskStatus.TODO, TaskStatus.SCHEDULED, TaskStatus.OVERDUE, TaskStatus.DONE]
+
+    def generate_daily_instances(self, batch_size: int = 1000, dry_run: bool = False) -> RecurrenceRunResult:
+        """
+        Sprawdza aktywne szablony (Fixed) i generuje zadania na dziś - razem z zaległymi
+        terminami, jeśli generator nie chodził (wszystkie wystąpienia od next_run_date naraz).
+
+        Szablony przetwarzane są partiami (po id): na partię przypada stała liczba zapytań -
+        duplikaty i checklisty pobierane hurtem, zadania/punkty/logi przez bulk_create,
+        szablony kilkoma UPDATE-ami pogrupowanymi po nowych wartościach. Każda partia to osobna
+        transakcja; skutki uboczne, które bulk_create omija (liczniki postępu, log aktywności,
+        cache planów), wykonujemy zbiorczo na partię, a CPM - raz na projekt po całym przebiegu.
+        """
         today = date.today()
-        generated = []
+        result = RecurrenceRunResult()
 
         # Pobierz szablony FIXED, które mają termin <= dzisiaj
         patterns = RecurringPattern.objects.filter(
             is_active=True,
             is_dynamic=False,  # Tylko sztywne (kalendarzowe)
             next_run_date__lte=today
+        ).select_related('project').order_by('id')
+
+        # CPM nowych zadań przeliczamy raz na projekt - po wszystkich partiach
+        from apps.tasks.application.unit_of_work import task_unit_of_work
+        with task_unit_of_work():
+            last_id = 0
+            while True:
+                batch = list(patterns.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                if dry_run:
+                    self._generate_batch(batch, today, result, dry_run=True)
+                else:
+                    with transaction.atomic():
+                        self._generate_batch(batch, today, result)
+                result.batches += 1
+
+        return result
+
+    def _generate_batch(self, patterns: List[RecurringPattern], today: date, result: RecurrenceRunResult,
+                        dry_run: bool = False):
+        # 1. Zaległe terminy każdego szablonu (nadrabiamy wszystkie naraz) i następny termin
+        plans = {p.id: self._due_days(p, today) for p in patterns}
+
+        # 2. Duplikaty (czy już nie wygenerowano na ten termin) - jedno zapytanie na partię
+        due = {pid: [self._due_datetime(day) for day in plan[0]] for pid, plan in plans.items()}
+        existing = set(
+            Task.objects.filter(
+                recurring_pattern_id__in=due.keys(),
+                due_date__in={d for dates in due.values() for d in dates},
+                status__in=self.EXISTING_STATUSES,
+            ).values_list('recurring_pattern_id', 'due_date')
         )
 
+        # 3. Punkty checklist z szablonów - jedno zapytanie na partię
+        template_items = defaultdict(list)
+        for item in ChecklistItem.objects.filter(recurring_pattern_id__in=due.keys()).order_by('order', 'id'):
+            template_items[item.recurring_pattern_id].append(item)
+
+        now = timezone.now()
+        new_tasks = []
+        # Zmiany szablonów pogrupowane po wartościach: {(is_active, next_run_date, +generated): [id, ...]}
+        pattern_updates = defaultdict(list)
         for pattern in patterns:
-            # 1. Sprawdź warunki końca (End Date / Max Occurrences)
-            if pattern.end_date and pattern.end_date < today:
-                pattern.is_active = False
-                pattern.save()
-                continue
+            result.patterns += 1
+            days, next_date, error = plans[pattern.id]
+            if error:
+                print(f"Błąd RRULE dla {pattern.title}: {error}")
+                result.errors += 1
 
-            if pattern.max_occurrences and pattern.generated_count >= pattern.max_occurrences:
-                pattern.is_active = False
-                pattern.save()
-                continue
+            # Limit wystąpień (Max Occurrences) - ile instancji jeszcze wolno utworzyć
+            remaining = None
+            if pattern.max_occurrences:
+                remaining = max(0, pattern.max_occurrences - pattern.generated_count)
+
+            generated = 0
+            for due_date in due[pattern.id]:
+                if (pattern.id, due_date) in existing:
+                    # Jeśli zadanie na tę datę już jest, to tylko przesuwamy termin (naprawa stanu)
+                    result.duplicates += 1
+                    continue
+                if remaining is not None and generated >= remaining:
+                    break
+                # 4. Instancja zadania (pola jak przy Task.objects.create + to, co robią sygnały pre_save)
+                new_tasks.append(Task(
+                    user_id=pattern.user_id,
+                    title=pattern.title,
+                    project_id=pattern.project_id,
+                    area_id=pattern.project.area_id if pattern.project_id else None,
+                    priority=pattern.default_priority,
+                    duration_min=pattern.default_duration_min,
+                    duration_max=pattern.default_duration_min,
+                    status=TaskStatus.TODO,
+                    recurring_pattern=pattern,
+                    due_date=due_date,
+                    ready_since=now,
+                ))
+                generated += 1
 
-            # 2. Sprawdź duplikaty (czy już nie wygenerowano na dziś)
-            # To ważne przy rrule, żeby nie spamować
-            active_exists = Task.objects.filter(
-                recurring_pattern=pattern,
-                due_date=pattern.next_run_date,  # Sprawdzamy konkretną datę
-                status__in=[TaskStatus.TODO, TaskStatus.SCHEDULED, TaskStatus.OVERDUE, TaskStatus.DONE]
-            ).exists()
-
-            if active_exists:
-                # Jeśli zadanie na tę datę już jest, to tylko przeliczamy następną datę (naprawa stanu)
-                self._update_next_run_date(pattern)
+            if error:
+                # Termin zostaje; licznik utworzonych instancji i tak zapisujemy
+                if generated:
+                    pattern_updates[(True, pattern.next_run_date, generated)].append(pattern.id)
                 continue
 
-                # 3. Utwórz instancję zadania
-            new_task = Task.objects.create(
-                user=pattern.user,
-                title=pattern.title,
-                project=pattern.project,
-                priority=pattern.default_priority,
-                duration_min=pattern.default_duration_min,
-                duration_max=pattern.default_duration_min,
-                status=TaskStatus.TODO,
-                recurring_pattern=pattern,
-                due_date=pattern.next_run_date
+            # 5. Koniec serii: brak kolejnego terminu (End Date / COUNT) albo wyczerpany limit
+            if next_date and (remaining is None or generated < remaining):
+                pattern_updates[(True, next_date, generated)].append(pattern.id)
+            else:
+                pattern_updates[(False, pattern.next_run_date, generated)].append(pattern.id)
+                result.deactivated += 1
+
+        result.generated += len(new_tasks)
+        result.checklist_items += sum(len(template_items[t.recurring_pattern.id]) for t in new_tasks)
+        if dry_run:
+            return
+
+        # 6. Zapis hurtem
+        Task.objects.bulk_create(new_tasks)
+        ChecklistItem.objects.bulk_create([
+            # WAŻNE: is_completed=False (resetujemy ptaszki!)
+            ChecklistItem(task=task, text=item.text, order=item.order, is_completed=False)
+            for task in new_tasks
+            for item in template_items[task.recurring_pattern.id]
+        ])
+        # Kilka UPDATE ... WHERE id IN (...) zamiast bulk_update (CASE WHEN na każdy wiersz)
+        for (is_active, next_run_date, generated), ids in pattern_updates.items():
+            RecurringPattern.objects.filter(id__in=ids).update(
+                is_active=is_active,
+                next_run_date=next_run_date,
+                generated_count=F('generated_count') + generated,
             )
-            # --- NOWE: Kopiowanie Checklisty ---
-            # Pobierz punkty z szablonu
-            template_items = pattern.template_items.all()
-            for item in template_items:
-                # Utwórz kopię dla nowego zadania
-                # WAŻNE: is_completed=False (resetujemy ptaszki!)
-                ChecklistItem.objects.create(
-                    task=new_task,
-                    text=item.text,
-                    order=item.order,
-                    is_completed=False
-                )
-            # -----------------------------------
-            generated.append(new_task)
-
-            # Statystyki
-            pattern.generated_count += 1
-
-            # 4. Oblicz następną datę używając RRULE
-            self._update_next_run_date(pattern)
-
-        return generated
+
+        self._after_bulk_create(new_tasks)
+
+    @staticmethod
+    def _due_datetime(day: date) -> datetime:
+        """Termin instancji: północ dnia (tak, jak Django zapisuje date w DateTimeField)."""
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def _after_bulk_create(tasks: List[Task]):
+        """Skutki uboczne, które przy Task.objects.create robią sygnały - w formie zbiorczej."""
+        if not tasks:
+            return
+        from django.contrib.contenttypes.models import ContentType
+        from apps.calendar_app.application.plan_cache import invalidate_user_plans
+        from apps.projects.services.progress_service import ProgressService
+        from apps.reports.application import stats_report
+        from apps.reports.application.activity_rollup import ActivityRollupService
+        from apps.reports.application.stats_report import invalidate_user_stats
+        from apps.reports.application.weekly_review import invalidate_user_review
+        from apps.reports.models import ActivityLog
+        from apps.tasks.application.unit_of_work import defer
+
+        content_type = ContentType.objects.get_for_model(Task)
+        logs = ActivityLog.objects.bulk_create([
+            ActivityLog(
+                user_id=task.user_id, content_type=content_type, object_id=task.id,
+                action_type=ActivityLog.ActionType.CREATED,
+                description=f"Utworzono zadanie: {task.title}",
+            )
+            for task in tasks
+        ])
+        ActivityRollupService().record(logs)
+
+        by_project = defaultdict(set)
+        for task in tasks:
+            if task.project_id:
+                by_project[task.project_id].add(task.id)
+
+        ProgressService().apply_deltas({pid: [len(ids), 0] for pid, ids in by_project.items()})
+        with defer() as uow:
+            for project_id, task_ids in by_project.items():
+                uow.recalculate_cpm(project_id, task_ids)
+
+        # Cache planów, przeglądu tygodniowego i statystyk (receivery post_save zadania)
+        for user_id in {task.user_id for task in tasks}:
+            invalidate_user_plans(user_id)
+            invalidate_user_review(user_id)
+            invalidate_user_stats(user_id, stats_report.TASKS, stats_report.RECURRING)
 
     def handle_task_completion(self, task: Task):
         """Obsługa trybu DYNAMICZNEGO (po wykonaniu)."""
@@ -104,34 +233,86 @@ class RecurrenceService:
         pattern.next_run_date = today + delta
         pattern.save()
 
-    def _update_next_run_date(self, pattern: RecurringPattern):
-        """Używa dateutil.rrule do wyznaczenia następnej daty kalendarzowej."""
-        try:
-            # Budujemy string RRULE
-            rrule_str = pattern.get_rrule_string()
+    def project_occurrences(
+            self,
+            user_id: int,
+            start: date,
+            end: date,
+            area_id: Optional[int] = None,
+            today: Optional[date] = None
+        ) -> Dict[date, List[RecurringOccurrence]]:
+        """
+        Wirtualne wystąpienia szablonów (Fixed) w dniach [start, end], bez zapisu do bazy:
+        {dzień: [RecurringOccurrence, ...]}. Tylko od dziś w przód i tylko terminy, dla których
+        zadanie jeszcze nie istnieje (wygenerowane instancje są już zwykłymi zadaniami planu).
+        Reguły pochodzą z cache (RecurringPattern.get_rule), więc projekcja to dwa zapytania.
+        """
+        start = max(start, today or date.today())
+        by_day = defaultdict(list)
+        if end < start:
+            return by_day
+
+        patterns = RecurringPattern.objects.filter(
+            user_id=user_id, is_active=True, is_dynamic=False, next_run_date__lte=end
+        )
+        if area_id is not None:
+            patterns = patterns.filter(project__area_id=area_id)
+        patterns = list(patterns)
+        if not patterns:
+            return by_day
 
-            # Musimy dodać DTSTART, żeby rrule wiedziało od kiedy liczyć
-            # Używamy dzisiejszej daty jako punktu odniesienia, żeby znaleźć *przyszłe* wystąpienie
-            # Albo używamy created_at jako startu.
-            # Najbezpieczniej: DTSTART = today
+        existing = {
+            (pattern_id, timezone.localtime(due_date).date())
+            for pattern_id, due_date in Task.objects.filter(
+                recurring_pattern_id__in=[p.id for p in patterns],
+                due_date__gte=self._due_datetime(start),
+                due_date__lt=self._due_datetime(end + timedelta(days=1)),
+            ).values_list('recurring_pattern_id', 'due_date')
+        }
 
-            dtstart = f"DTSTART:{datetime.now().strftime('%Y%m%dT%H%M%S')}"
-            full_rule = f"{dtstart}\nRRULE:{rrule_str}"
+        for pattern in patterns:
+            days, _, error = self._due_days(pattern, end)
+            if error:
+                continue  # Błędne RRULE - nie zgadujemy terminów
 
-            # Wyznaczamy terminy
-            rule = rrulestr(full_rule)
+            remaining = None
+            if pattern.max_occurrences:
+                remaining = max(0, pattern.max_occurrences - pattern.generated_count)
 
-            # Bierzemy pierwsze wystąpienie PO dzisiejszym dniu (lub po obecnym next_run_date)
-            # after() zwraca datetime
-            next_date = rule.after(datetime.combine(pattern.next_run_date, datetime.min.time()))
+            for day in days:
+                if (pattern.id, day) in existing:
+                    continue
+                if remaining is not None:
+                    if remaining <= 0:
+                        break
+                    remaining -= 1
+                if day >= start:
+                    by_day[day].append(RecurringOccurrence(
+                        pattern_id=pattern.id,
+                        title=pattern.title,
+                        day=day,
+                        duration_min=pattern.default_duration_min,
+                        priority=pattern.default_priority,
+                        project_id=pattern.project_id,
+                    ))
+        return by_day
 
-            if next_date:
-                pattern.next_run_date = next_date.date()
-                pattern.save()
-            else:
-                # Koniec cyklu (np. limit wystąpień)
-                pattern.is_active = False
-                pattern.save()
+    @staticmethod
+    def _due_days(pattern: RecurringPattern, until: date) -> Tuple[List[date], Optional[date], Optional[Exception]]:
+        """
+        Terminy serii do dnia until: next_run_date i wszystkie wystąpienia reguły od niego
+        (nie dalej niż end_date), następny termin po until (None = koniec serii) oraz ewentualny
+        błąd reguły - wtedy tylko next_run_date, jak dotąd.
+        """
+        if pattern.next_run_date > until:
+            return [], pattern.next_run_date, None  # Nic zaległego - termin szablonu jest kolejnym
 
+        last_day = min(until, pattern.end_date) if pattern.end_date else until
+        days = [pattern.next_run_date] if pattern.next_run_date <= last_day else []
+        try:
+            # Jedno rozwinięcie zamiast kroku na przebieg - szablon wstrzymany na miesiąc nadrabia od razu
+            days += [d for d in pattern.occurrences_between(pattern.next_run_date, last_day)
+                     if d != pattern.next_run_date]
+            return days, pattern.next_occurrence(until), None
         except Exception as e:
-            print(f"Błąd RRULE dla {pattern.title}: {e}")
\ No newline at end of file
+            return days, None, e
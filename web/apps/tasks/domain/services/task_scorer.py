@@ -1,11 +1,31 @@
 # apps/tasks/domain/services/task_scorer.py
+from dataclasses import dataclass
 from typing import List, Optional
 from apps.tasks.domain.entities import TaskEntity, TaskStatus
 from apps.tasks.ports.repositories import ITaskRepository
 from datetime import date, datetime, timezone, timedelta
+import numpy as np
+from apps.tasks.domain.columns import TaskColumns, epoch_us
 from apps.tasks.models import Task, RecurringPattern
 
 
+# Bonus EOD działa tylko w ostatnich godzinach dnia ("strefa śmierci")
+EOD_WINDOW_HOURS = 2.0
+
+
+@dataclass
+class ScoreComponents:
+    """Składowe wyniku niezależne od slotu (energia, sekwencja, pora dnia)."""
+    base: float
+    urgency: float
+    goal_urgency: float
+    project_urgency: float
+    cpm: float
+    milestone: float
+    aging: float
+    eod: float  # Bonus EOD, doliczany tylko gdy do końca dnia < EOD_WINDOW_HOURS
+
+
 class TaskScorer:
     def __init__(self, weights: dict = None):
         # Domyślne wagi, jeśli nie podano
@@ -31,6 +51,25 @@ class TaskScorer:
             hours_to_end_of_day: Optional[float] = None
         ) -> float:
 
+        components = self.static_components(task, now)
+
+        eod_bonus = 0.0
+        if hours_to_end_of_day is not None and hours_to_end_of_day < EOD_WINDOW_HOURS:
+            eod_bonus = components.eod
+
+        return self.combine(
+            components,
+            energy_bonus=self.energy_bonus(task, slot_energy_level),
+            seq_bonus=self.sequence_bonus(task, last_project_id, sequence_count),
+            eod_bonus=eod_bonus
+        )
+
+    def static_components(self, task: TaskEntity, now: datetime) -> ScoreComponents:
+        """
+        Składowe wyniku, które nie zależą od slotu ani od historii planowania.
+        Scheduler liczy je raz na przebieg, a nie przy każdym umieszczeniu zadania.
+        """
+
         # 1. Normalizacja Priorytetu (skala 1-5 -> 0.0-1.0)
         norm_priority = (task.priority - 1) / 4.0
 
@@ -78,33 +117,6 @@ class TaskScorer:
         if getattr(task, 'is_critical_path', False):
             cpm_bonus = 2.0  # Bardzo wysoki bonus!
 
-        # ----------------------------------------------------
-        # NOWY KOD: Bonus Energetyczny
-        # ----------------------------------------------------
-        energy_bonus = 0.0
-
-        # Założenie: task.energy_required (1-3), slot_energy_level (1-3)
-        # Jeśli wymagana energia <= dostępna energia -> Bonus!
-        if task.energy_required <= slot_energy_level:
-            # Im trudniejsze zadanie (wymaga więcej energii), tym większy bonus za dopasowanie
-            # Np. Zrobienie trudnego zadania (3) w slocie (3) jest cenniejsze
-            # niż zrobienie łatwego (1) w slocie (3).
-            energy_bonus = self.weights['bonus_energy_match'] * (task.energy_required / 3.0)
-
-        # Jeśli zadanie wymaga więcej niż mamy (np. 3 > 1), można dać karę (opcjonalnie)
-        # elif task.energy_required > slot_energy_level:
-        #     energy_bonus = -0.5
-
-        # --- NOWE: Sequence Bonus ---
-        seq_bonus = 0.0
-        if last_project_id and task.project_id == last_project_id:
-            # Jeśli to ten sam projekt -> Daj bonus
-            seq_bonus = self.weights.get('bonus_sequence', 0.5)
-
-            # Opcjonalnie: Tutaj można by dodać logikę "malejącego bonusu"
-            # (diminishing returns), jeśli przekazalibyśmy licznik "k".
-            # Na start stały bonus 0.5 jest wystarczający, by "przyciągnąć" kolegów.
-
         # --- NOWE: Goal Urgency ---
         goal_urgency = 0.0
         if task.goal_deadline:
@@ -170,14 +182,6 @@ class TaskScorer:
         if task.is_milestone:
             milestone_bonus = self.weights['bonus_milestone']
 
-        # --- NOWE: Diminishing Sequence Bonus ---
-        seq_bonus = 0.0
-        if last_project_id and task.project_id == last_project_id:
-            base_bonus = self.weights.get('bonus_sequence', 0.5)
-            # Spadek wykładniczy: 100% -> 80% -> 64% -> 51% ...
-            decay_factor = 0.8
-            seq_bonus = base_bonus * (decay_factor ** sequence_count)
-
         # --- AGING BONUS ---
         aging_bonus = 0.0
 
@@ -198,40 +202,209 @@ class TaskScorer:
                 aging_bonus = 1.0 * min(1.0, hours_waiting / max_wait_hours)
 
         # --- End of Day (EOD) Factor ---
+        # Liczymy go zawsze, a stosujemy tylko w "strefie śmierci" (ostatnie 2h dnia)
         eod_bonus = 0.0
 
-        if hours_to_end_of_day is not None and hours_to_end_of_day < 2.0:
-            # Jesteśmy w "strefie śmierci" (ostatnie 2h dnia)
-
-            # 1. Promuj zadania krótkie (<= 30 min)
-            if task.duration_expected <= 30:
-                eod_bonus += 0.5
-
-            # 2. Promuj zadania z dzisiejszym deadline (Last Minute)
-            if task.due_date:
-                # Sprawdź czy deadline jest dziś
-                # (Uproszczenie: porównujemy daty, zakładając zgodność stref)
-                if task.due_date.date() <= now.date():
-                    eod_bonus += 1.0
-
-            # 3. Zniechęcaj do zadań trudnych (Mental Fatigue)
-            if task.complexity >= 4:
-                eod_bonus -= 0.5
-
-        # Sumowanie
-        total_score = base_score + \
-                      (self.weights['w_urgency'] * urgency_score) + \
-                      (1.0 * goal_urgency) + \
-                      (1.0 * project_urgency_score) + \
+        # 1. Promuj zadania krótkie (<= 30 min)
+        if task.duration_expected <= 30:
+            eod_bonus += 0.5
+
+        # 2. Promuj zadania z dzisiejszym deadline (Last Minute)
+        if task.due_date:
+            # Sprawdź czy deadline jest dziś
+            # (Uproszczenie: porównujemy daty, zakładając zgodność stref)
+            if task.due_date.date() <= now.date():
+                eod_bonus += 1.0
+
+        # 3. Zniechęcaj do zadań trudnych (Mental Fatigue)
+        if task.complexity >= 4:
+            eod_bonus -= 0.5
+
+        return ScoreComponents(
+            base=base_score,
+            urgency=urgency_score,
+            goal_urgency=goal_urgency,
+            project_urgency=project_urgency_score,
+            cpm=cpm_bonus,
+            milestone=milestone_bonus,
+            aging=aging_bonus,
+            eod=eod_bonus
+        )
+
+    def energy_bonus(self, task: TaskEntity, slot_energy_level: int) -> float:
+        """Bonus Energetyczny (zależy od poziomu energii slotu)."""
+        # Założenie: task.energy_required (1-3), slot_energy_level (1-3)
+        # Jeśli wymagana energia <= dostępna energia -> Bonus!
+        if task.energy_required <= slot_energy_level:
+            # Im trudniejsze zadanie (wymaga więcej energii), tym większy bonus za dopasowanie
+            # Np. Zrobienie trudnego zadania (3) w slocie (3) jest cenniejsze
+            # niż zrobienie łatwego (1) w slocie (3).
+            return self.weights['bonus_energy_match'] * (task.energy_required / 3.0)
+
+        # Jeśli zadanie wymaga więcej niż mamy (np. 3 > 1), można dać karę (opcjonalnie)
+        return 0.0
+
+    def sequence_bonus(self, task: TaskEntity, last_project_id: Optional[int], sequence_count: int) -> float:
+        """Diminishing Sequence Bonus (ciągłość projektu)."""
+        if last_project_id and task.project_id == last_project_id:
+            base_bonus = self.weights.get('bonus_sequence', 0.5)
+            # Spadek wykładniczy: 100% -> 80% -> 64% -> 51% ...
+            decay_factor = 0.8
+            return base_bonus * (decay_factor ** sequence_count)
+        return 0.0
+
+    def combine(
+            self,
+            components: ScoreComponents,
+            energy_bonus: float = 0.0,
+            seq_bonus: float = 0.0,
+            eod_bonus: float = 0.0
+        ) -> float:
+        """Składa wynik końcowy (kolejność sumowania jak w calculate_score)."""
+        total_score = components.base + \
+                      (self.weights['w_urgency'] * components.urgency) + \
+                      (1.0 * components.goal_urgency) + \
+                      (1.0 * components.project_urgency) + \
                       energy_bonus + \
-                      cpm_bonus + \
-                      milestone_bonus + \
+                      components.cpm + \
+                      components.milestone + \
                       seq_bonus + \
-                      aging_bonus + \
+                      components.aging + \
                       eod_bonus
 
         return round(total_score, 4)
 
+    def static_total(self, components: ScoreComponents) -> float:
+        """Suma części statycznej (bez zaokrąglenia) - klucz porządkujący kandydatów."""
+        return components.base + \
+            (self.weights['w_urgency'] * components.urgency) + \
+            components.goal_urgency + \
+            components.project_urgency + \
+            components.cpm + \
+            components.milestone + \
+            components.aging
+
+
+    # ----------------------------------------------------
+    # Scoring wektorowy (NumPy) - cała pula w jednym przebiegu
+    # ----------------------------------------------------
+
+    def static_components_batch(self, columns: TaskColumns, now: datetime) -> ScoreComponents:
+        """
+        Wektorowy odpowiednik static_components(): pola ScoreComponents są tablicami.
+        Daty naive traktujemy jako UTC.
+        """
+        now_us = epoch_us(now)
+        now_ordinal = now.date().toordinal()
+
+        # Wynik bazowy
+        norm_priority = (columns.priority - 1) / 4.0
+        norm_duration = np.maximum(0.0, 1.0 - (columns.duration / 240.0))
+        norm_complexity = 1.0 - ((columns.complexity - 1) / 4.0)
+        base_score = (
+            self.weights['w_priority'] * norm_priority +
+            self.weights['w_duration'] * norm_duration +
+            self.weights['w_complexity'] * norm_complexity
+        )
+
+        # Urgency (Pilność)
+        hours_left = ((columns.due_us - now_us) / 1e6) / 3600
+        urgency = np.where(
+            hours_left <= 0, 2.0,
+            np.where(
+                hours_left <= 24, 1.0 + (1.0 - (hours_left / 24.0)),
+                np.where(hours_left <= 72, 0.5 * (1.0 - ((hours_left - 24) / 48.0)), 0.1)
+            )
+        )
+        urgency = np.where(columns.has_due, urgency, 0.0)
+
+        # Goal / Project Urgency (ten sam wzór, horyzont 14 dni)
+        def deadline_pressure(has_deadline, deadline_us):
+            days_left = ((deadline_us - now_us) / 1e6) / 86400
+            pressure = np.where(days_left <= 0, 1.0, np.where(days_left <= 14, 1.0 - (days_left / 14.0), 0.0))
+            return np.where(has_deadline, pressure, 0.0)
+
+        goal_urgency = deadline_pressure(columns.has_goal_deadline, columns.goal_deadline_us)
+        project_urgency = deadline_pressure(columns.has_project_deadline, columns.project_deadline_us)
+
+        # CPM i Milestone
+        cpm = np.where(columns.is_critical, 2.0, 0.0)
+        milestone = np.where(columns.is_milestone, self.weights['bonus_milestone'], 0.0)
+
+        # Aging
+        hours_waiting = ((now_us - columns.start_us) / 1e6) / 3600
+        aging = np.where(hours_waiting > 0, 1.0 * np.minimum(1.0, hours_waiting / 72.0), 0.0)
+        aging = np.where(columns.has_start, aging, 0.0)
+
+        # EOD
+        eod = np.where(columns.duration <= 30, 0.5, 0.0)
+        eod = eod + np.where(columns.has_due & (columns.due_ordinal <= now_ordinal), 1.0, 0.0)
+        eod = eod - np.where(columns.complexity >= 4, 0.5, 0.0)
+
+        return ScoreComponents(
+            base=base_score,
+            urgency=urgency,
+            goal_urgency=goal_urgency,
+            project_urgency=project_urgency,
+            cpm=cpm,
+            milestone=milestone,
+            aging=aging,
+            eod=eod
+        )
+
+    def score_batch(
+            self,
+            tasks,
+            now: datetime,
+            slot_energy_level: int = 1,
+            last_project_id: Optional[int] = None,
+            sequence_count: int = 0,
+            hours_to_end_of_day: Optional[float] = None
+        ) -> np.ndarray:
+        """
+        Wektorowy odpowiednik calculate_score() dla całej listy zadań.
+        Przyjmuje listę encji lub gotowe TaskColumns, zwraca tablicę wyników (ta sama kolejność).
+        """
+        columns = tasks if isinstance(tasks, TaskColumns) else TaskColumns.from_tasks(tasks)
+        components = self.static_components_batch(columns, now)
+
+        energy_bonus = np.where(
+            columns.energy <= slot_energy_level,
+            self.weights['bonus_energy_match'] * (columns.energy / 3.0),
+            0.0
+        )
+
+        seq_bonus = np.zeros(len(columns))
+        if last_project_id:
+            base_bonus = self.weights.get('bonus_sequence', 0.5)
+            seq_bonus = np.where(columns.project_id == last_project_id, base_bonus * (0.8 ** sequence_count), 0.0)
+
+        eod_bonus = 0.0
+        if hours_to_end_of_day is not None and hours_to_end_of_day < EOD_WINDOW_HOURS:
+            eod_bonus = components.eod
+
+        total_score = components.base + \
+                      (self.weights['w_urgency'] * components.urgency) + \
+                      (1.0 * components.goal_urgency) + \
+                      (1.0 * components.project_urgency) + \
+                      energy_bonus + \
+                      components.cpm + \
+                      components.milestone + \
+                      seq_bonus + \
+                      components.aging + \
+                      eod_bonus
+
+        # round() Pythona zamiast np.round: np.round mnoży przez 10^4 i na granicy
+        # zaokrąglenia potrafi różnić się o 1e-4 od ścieżki skalarnej.
+        return np.fromiter((round(x, 4) for x in total_score.tolist()), dtype=np.float64, count=len(columns))
+
+    def rank_tasks(self, tasks: List[TaskEntity], now: datetime) -> List[TaskEntity]:
+        """Sortuje zadania malejąco wg wyniku (np. Backlog). Remisy zachowują kolejność."""
+        if not tasks:
+            return []
+        scores = self.score_batch(tasks, now)
+        order = np.argsort(-scores, kind='stable')
+        return [tasks[i] for i in order]
 
     @staticmethod
     def get_weights_for_strategy(strategy_name: str) -> dict:
@@ -0,0 +1,123 @@
+import random
+import time
+import tracemalloc
+from datetime import time as dt_time, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from apps.calendar_app.domain.services import SchedulerService
+from apps.goals.models import Goal
+from apps.projects.models import Project
+from apps.tasks.adapters.orm_repositories import DjangoTaskRepository
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Benchmark puli Schedulera: pełne TaskEntity (get_active_tasks) vs TaskSnapshot (get_active_snapshots)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=str, default='1000,5000',
+            help='Liczby aktywnych zadań oddzielone przecinkami (dane syntetyczne, wycofywane po pomiarze)'
+        )
+        parser.add_argument('--user', type=int, help='Zamiast danych syntetycznych: aktywne zadania użytkownika z bazy')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = get_user_model().objects.filter(id=options['user']).first()
+            if user is None:
+                raise CommandError(f"Brak użytkownika {options['user']}")
+            self._benchmark(user, label=f"Użytkownik {user.id}")
+            return
+
+        rng = random.Random(options['seed'])
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            # Dane syntetyczne tylko na czas pomiaru - transakcja jest wycofywana
+            with transaction.atomic():
+                user = self._synthetic_user(rng, size)
+                self._benchmark(user, label=f"{size:>7} zadań")
+                transaction.set_rollback(True)
+
+    def _benchmark(self, user, label: str):
+        now = timezone.now()
+        windows = SchedulerService().calculate_free_windows(now.date(), [], dt_time(8, 0), dt_time(18, 0))
+
+        def load_entities():
+            return DjangoTaskRepository().get_active_tasks(user_id=user.id), None
+
+        def load_snapshots():
+            repo = DjangoTaskRepository()
+            return repo.get_active_snapshots(user_id=user.id), repo
+
+        results = {}
+        for name, load in (('TaskEntity', load_entities), ('TaskSnapshot', load_snapshots)):
+            start = time.perf_counter()
+            pool, repo = load()
+            load_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            plan = SchedulerService().schedule_tasks(pool, windows, now, None)
+            if repo is not None:
+                repo.resolve_titles([item.task for item in plan])  # Tytuły tylko dla zaplanowanych
+            plan_ms = (time.perf_counter() - start) * 1000
+
+            # Pamięć mierzona osobnym przebiegiem - tracemalloc spowalnia tworzenie obiektów
+            tracemalloc.start()
+            load()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+
+            results[name] = [(item.task.id, item.task.title, item.start) for item in plan]
+            self.stdout.write(
+                f"{label} (aktywnych {len(pool)}), {name:<12}: wczytanie {load_ms:8.1f} ms / {peak:6.1f} MB, "
+                f"plan dnia {plan_ms:7.1f} ms"
+            )
+
+        self.stdout.write(
+            f"{label}: plan ({len(results['TaskSnapshot'])} pozycji) zgodny: "
+            f"{'tak' if results['TaskEntity'] == results['TaskSnapshot'] else 'NIE'}"
+        )
+
+    @staticmethod
+    def _synthetic_user(rng: random.Random, size: int):
+        user = get_user_model().objects.create_user(username=f'benchmark-snapshots-{size}-{rng.random():.8f}')
+        today = timezone.localdate()
+        goals = Goal.objects.bulk_create([
+            Goal(user=user, title=f'Cel {i}', deadline=today + timedelta(days=rng.randint(-5, 60)))
+            for i in range(5)
+        ])
+        projects = Project.objects.bulk_create([
+            Project(
+                user=user, title=f'Projekt {i}', goal=rng.choice(goals + [None]),
+                deadline=rng.choice([None, today + timedelta(days=rng.randint(0, 30))])
+            )
+            for i in range(max(1, size // 50))
+        ])
+
+        now = timezone.now()
+        tasks = Task.objects.bulk_create([
+            Task(
+                user=user,
+                title=f'Zadanie {i}',
+                description='Opis zadania ' * rng.randint(0, 40),
+                status=rng.choice(['todo', 'todo', 'scheduled']),
+                duration_min=rng.choice([15, 30, 45, 60, 90, 120]),
+                due_date=rng.choice([None, now + timedelta(hours=rng.randint(-48, 24 * 14))]),
+                priority=rng.randint(1, 5),
+                energy_required=rng.randint(1, 3),
+                complexity=rng.randint(1, 5),
+                project=rng.choice(projects + [None]),
+                ready_since=now - timedelta(hours=rng.randint(0, 200)),
+            )
+            for i in range(size)
+        ], batch_size=1000)
+
+        # Zależności: pełne encje ładują blocked_by, snapshoty nie
+        edges = [
+            Task.blocked_by.through(from_task_id=task.id, to_task_id=rng.choice(tasks).id)
+            for task in rng.sample(tasks, size // 5)
+        ]
+        Task.blocked_by.through.objects.bulk_create(edges, batch_size=1000, ignore_conflicts=True)
+        return user
@@ -5,10 +5,20 @@ from apps.tasks.domain.services import RecurrenceService
 class Command(BaseCommand):
     help = 'Generuje instancje zadań powtarzalnych'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Liczba szablonów na partię (jedna transakcja i stała liczba zapytań na partię)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Tylko policz, co zostałoby zrobione (bez zapisu)')
+
     def handle(self, *args, **options):
         service = RecurrenceService()
-        generated = service.generate_daily_instances()
+        result = service.generate_daily_instances(batch_size=options['batch_size'], dry_run=options['dry_run'])
 
-        self.stdout.write(self.style.SUCCESS(f'Wygenerowano {len(generated)} nowych zadań cyklicznych.'))
-        for t in generated:
-            self.stdout.write(f"- {t.title} ({t.due_date})")
\ No newline at end of file
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Wygenerowano {result.generated} nowych zadań cyklicznych.'))
+        self.stdout.write(
+            f"- szablony: {result.patterns} (partie: {result.batches}), punkty checklist: {result.checklist_items}, "
+            f"już istniejące: {result.duplicates}, zakończone serie: {result.deactivated}, błędy RRULE: {result.errors}"
+        )
@@ -0,0 +1,16 @@
+# apps/tasks/middleware.py
+from apps.tasks.application.unit_of_work import task_unit_of_work
+
+
+class TaskUnitOfWorkMiddleware:
+    """
+    Jedna jednostka pracy na żądanie: przeliczenia po zapisach zadań (CPM, postęp celu)
+    z całego widoku wykonują się raz, po jego zakończeniu (lub po commicie transakcji).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with task_unit_of_work():
+            return self.get_response(request)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0016_task_completed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="cpm_ef",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="cpm_es",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="cpm_lf",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="cpm_ls",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
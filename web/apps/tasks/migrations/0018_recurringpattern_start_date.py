@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:38
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_start_date(apps, schema_editor):
+    # Istniejące serie zakotwiczamy w najbliższym terminie - zachowuje ich fazę (np. co 2 tygodnie)
+    RecurringPattern = apps.get_model("tasks", "RecurringPattern")
+    RecurringPattern.objects.filter(start_date__isnull=True).update(start_date=F("next_run_date"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0017_task_cpm_ef_task_cpm_es_task_cpm_lf_task_cpm_ls"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recurringpattern",
+            name="start_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_start_date, migrations.RunPython.noop),
+    ]
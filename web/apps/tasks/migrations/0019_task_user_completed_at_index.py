@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_completed_at(apps, schema_editor):
+    # Zadania ukończone przed wprowadzeniem completed_at - najlepsze przybliżenie to ostatnia zmiana
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.filter(status="done", completed_at__isnull=True).update(completed_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("areas", "0001_initial"),
+        ("contexts", "0001_initial"),
+        ("goals", "0006_fill_progress_counters"),
+        ("projects", "0005_project_done_tasks_project_total_tasks"),
+        ("tasks", "0018_recurringpattern_start_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["user", "completed_at"], name="tasks_task_user_id_64f6c6_idx"),
+        ),
+        migrations.RunPython(fill_completed_at, migrations.RunPython.noop),
+    ]
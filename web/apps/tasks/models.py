@@ -1,6 +1,7 @@
 # apps/tasks/models.py
 from django.db import models
 from django.conf import settings
+from datetime import datetime
 from django.utils import timezone
 from apps.tasks.domain.entities import TaskStatus
 from dateutil.rrule import rrulestr
@@ -43,6 +44,9 @@ class RecurringPattern(models.Model):
     # Dla sztywnego: data startu / następnego wywołania
     next_run_date = models.DateField(default=timezone.now)
 
+    # Początek serii (DTSTART reguły) - od niego liczą się INTERVAL i COUNT; domyślnie pierwszy termin
+    start_date = models.DateField(null=True, blank=True)
+
     is_active = models.BooleanField(default=True)
 
     # Pola kopiowane do instancji zadania
@@ -61,6 +65,44 @@ class RecurringPattern(models.Model):
         if self.generated_count == 0: return 0
         return int((self.completed_count / self.generated_count) * 100)
 
+    def save(self, *args, **kwargs):
+        if self.start_date is None:
+            self.start_date = self.rule_start()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'start_date'}
+        super().save(*args, **kwargs)
+
+    # Pola, z których powstaje reguła (zmiana któregoś = nowa kompilacja w cache)
+    RULE_FIELDS = ('frequency', 'interval', 'week_days', 'end_date', 'max_occurrences', 'start_date')
+
+    def rule_fingerprint(self) -> int:
+        values = [getattr(self, f) for f in self.RULE_FIELDS]
+        values[self.RULE_FIELDS.index('week_days')] = tuple(self.week_days or ())
+        return hash(tuple(values))
+
+    def get_rule(self):
+        """Skompilowana reguła (dateutil rrule) z procesowego cache - bez ponownego parsowania."""
+        from apps.tasks.domain.rules import rule_cache
+        return rule_cache.get(self.pk, self.rule_fingerprint(), self.get_rrule_string(), self.rule_start())
+
+    def rule_start(self):
+        """DTSTART reguły: start_date, a dla niezapisanego szablonu - pierwszy termin."""
+        start = self.start_date or self.next_run_date
+        return start.date() if isinstance(start, datetime) else start
+
+    def occurrences_between(self, start, end):
+        """
+        Wszystkie terminy serii w przedziale [start, end] (daty, włącznie) - jednym wywołaniem,
+        np. zaległe wystąpienia do nadrobienia albo projekcja na widok tygodnia.
+        """
+        from apps.tasks.domain.rules import occurrences_between
+        return occurrences_between(self.get_rule(), start, end)
+
+    def next_occurrence(self, after):
+        """Pierwszy termin serii ściśle po dniu after (None = koniec serii)."""
+        from apps.tasks.domain.rules import next_occurrence
+        return next_occurrence(self.get_rule(), after)
+
     def get_rrule_string(self):
         """Generuje string zgodny z RFC 5545 na podstawie pól modelu."""
         from dateutil.rrule import MO, TU, WE, TH, FR, SA, SU
@@ -153,6 +195,12 @@ class Task(models.Model):
 
     is_critical_path = models.BooleanField(default=False)
 
+    # Wynik ostatniego przeliczenia CPM (minuty od startu projektu) - baza dla aktualizacji przyrostowej
+    cpm_es = models.IntegerField(null=True, blank=True)
+    cpm_ef = models.IntegerField(null=True, blank=True)
+    cpm_ls = models.IntegerField(null=True, blank=True)
+    cpm_lf = models.IntegerField(null=True, blank=True)
+
     recurring_pattern = models.ForeignKey(
         RecurringPattern,
         null=True, blank=True,
@@ -196,42 +244,104 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Raporty z okresu (heatmapa, statystyki ukończeń)
+            models.Index(fields=['user', 'completed_at']),
+        ]
+
     def __str__(self):
         return self.title
 
+    # Statusy zadań, które biorą udział w ścieżce krytycznej projektu
+    CPM_STATUSES = ('todo', 'scheduled', 'blocked', 'inbox')
+    CPM_INPUT_FIELDS = ('project_id', 'duration_min', 'duration_max', 'status')
+
+    # Pola, których stan sprzed zapisu widzą receivery (instance.changes, apps.tasks.changes)
+    TRACKED_FIELDS = ('status', 'project_id', 'duration_min', 'duration_max')
+
+    @classmethod
+    def cpm_key_from(cls, project_id, duration_min, duration_max, status) -> tuple:
+        return (project_id, duration_max or duration_min or 30, status in cls.CPM_STATUSES)
+
+    def cpm_key(self) -> tuple:
+        """Pola, od których zależy CPM (projekt, czas trwania, udział w grafie)."""
+        return self.cpm_key_from(self.project_id, self.duration_min, self.duration_max, self.status)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_tracked()
+
+    def _remember_tracked(self, update_fields=None):
+        """Migawka TRACKED_FIELDS "jak w bazie" (brak, jeśli któreś pole jest odroczone)."""
+        if any(f not in self.__dict__ for f in self.TRACKED_FIELDS):
+            self._loaded_values = None
+        elif update_fields is None or getattr(self, '_loaded_values', None) is None:
+            self._loaded_values = {f: self.__dict__[f] for f in self.TRACKED_FIELDS}
+        else:
+            # save(update_fields=...) zapisał tylko część pól - reszta w bazie się nie zmieniła
+            for f in self.TRACKED_FIELDS:
+                if f in update_fields or self._meta.get_field(f).name in update_fields:
+                    self._loaded_values[f] = self.__dict__[f]
+
     def save(self, *args, **kwargs):
         # Automatyczne dziedziczenie obszaru z projektu
-        if self.project and self.project.area and not self.area:
-            self.area = self.project.area
+        if self.project_id and not self.area_id and self.project.area_id:
+            self.area_id = self.project.area_id
         super().save(*args, **kwargs)
+        self._remember_tracked(kwargs.get('update_fields'))
+
+    @property
+    def checklist_progress(self):
+        total = self.checklist_items.count()
+        if total == 0: return 0
+        done = self.checklist_items.filter(is_completed=True).count()
+        return int((done / total) * 100)
+
+    @property
+    def duration_expected(self):
+        """Oblicza d_exp (średnia)."""
+        d_min = self.duration_min or 30
+        d_max = self.duration_max or d_min
+        return int((d_min + d_max) / 2)
 
 
-from django.db.models.signals import m2m_changed, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from apps.projects.services.project_service import ProjectService
+from apps.tasks.application.unit_of_work import defer, task_saved
+
+# Przeliczenia (CPM, zadania cykliczne) nie dzieją się w sygnałach - trafiają
+# do jednostki pracy (apps.tasks.application.unit_of_work) i wykonują się raz, po commicie.
 
 @receiver(m2m_changed, sender=Task.blocked_by.through)
-def dependencies_changed(sender, instance, action, **kwargs):
+def dependencies_changed(sender, instance, action, pk_set=None, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
         if instance.project_id:
-            service = ProjectService()
-            service.recalculate_cpm(instance.project_id)
+            # post_clear nie podaje pk_set - wtedy pełne przeliczenie
+            changed = None if action == "post_clear" else {instance.pk, *(pk_set or ())}
+            with defer() as uow:
+                uow.recalculate_cpm(instance.project_id, changed)
 
 @receiver(post_save, sender=Task)
 def task_changed(sender, instance, created, **kwargs):
-    # Jeśli zmienił się czas trwania, też trzeba przeliczyć
+    # Stan sprzed zapisu (instance.changes) ustawia track_task_changes w pre_save
+    task_saved(instance, instance.changes)
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
     if instance.project_id:
-        # Optymalizacja: sprawdź czy zmieniły się pola wpływające na CPM
-        service = ProjectService()
-        service.recalculate_cpm(instance.project_id)
+        from apps.projects.services.progress_service import ProgressService
+        ProgressService().apply_task_change(old=(instance.project_id, instance.status == 'done'), new=None)
 
-@receiver(post_save, sender=Task)
-def check_recurrence_on_completion(sender, instance, **kwargs):
-    if instance.status == 'done' and instance.recurring_pattern:
-        # Import z nowego miejsca (przez __init__)
-        from apps.tasks.domain.services import RecurrenceService
-        service = RecurrenceService()
-        service.handle_task_completion(instance)
+        # Krawędzie usuwanego zadania znikają razem z nim - pełne przeliczenie projektu
+        with defer() as uow:
+            uow.recalculate_cpm(instance.project_id)
 
 
 class ChecklistItem(models.Model):
@@ -247,19 +357,3 @@ class ChecklistItem(models.Model):
 
     def __str__(self):
         return self.text
-
-
-    @property
-    def checklist_progress(self):
-        total = self.checklist_items.count()
-        if total == 0: return 0
-        done = self.checklist_items.filter(is_completed=True).count()
-        return int((done / total) * 100)
-
-
-    @property
-    def duration_expected(self):
-        """Oblicza d_exp (średnia)."""
-        d_min = self.duration_min or 30
-        d_max = self.duration_max or d_min
-        return int((d_min + d_max) / 2)
\ No newline at end of file
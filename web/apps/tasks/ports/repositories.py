@@ -1,7 +1,7 @@
 # apps/tasks/ports/repositories.py
 from abc import ABC, abstractmethod
 from typing import List, Optional
-from apps.tasks.domain.entities import TaskEntity, TaskStatus
+from apps.tasks.domain.entities import TaskEntity, TaskSnapshot, TaskStatus
 
 
 class ITaskRepository(ABC):
@@ -19,8 +19,30 @@ class ITaskRepository(ABC):
         pass
 
     @abstractmethod
-    def get_active_tasks(self) -> List[TaskEntity]:
-        """Zwraca zadania todo i scheduled."""
+    def get_active_tasks(
+            self,
+            user_id: Optional[int] = None,
+            is_private: Optional[bool] = None,
+            context_id: Optional[int] = None,
+            area_id: Optional[int] = None
+        ) -> List[TaskEntity]:
+        """Zwraca zadania todo i scheduled (opcjonalnie: użytkownika, domeny prywatności, kontekstu, obszaru)."""
+        pass
+
+    @abstractmethod
+    def get_active_snapshots(
+            self,
+            user_id: Optional[int] = None,
+            is_private: Optional[bool] = None,
+            context_id: Optional[int] = None,
+            area_id: Optional[int] = None
+        ) -> List[TaskSnapshot]:
+        """Jak get_active_tasks, ale jako lekkie snapshoty (bez tytułów)."""
+        pass
+
+    @abstractmethod
+    def resolve_titles(self, snapshots: List[TaskSnapshot]) -> None:
+        """Uzupełnia tytuły snapshotów (np. tylko tych zaplanowanych)."""
         pass
 
     @abstractmethod
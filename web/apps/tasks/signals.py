@@ -3,24 +3,19 @@ from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from apps.reports.services import ActivityLogger
 from apps.reports.models import ActivityLog
+from apps.reports.application.activity_rollup import completion_details
 from django.utils import timezone
+from .changes import TaskChanges
 from .models import Task
 from .domain.entities import TaskStatus
 
 @receiver(pre_save, sender=Task)
 def track_task_changes(sender, instance, **kwargs):
     """
-    Przed zapisem sprawdzamy stary stan zadania, żeby wykryć zmiany.
-    Zapisujemy to w tymczasowym atrybucie instancji.
+    Przed zapisem ustalamy stary stan zadania - raz, dla wszystkich receiverów.
+    Pozostałe receivery czytają go przez instance.changes (TaskChanges).
     """
-    if instance.id:
-        try:
-            old_instance = Task.objects.get(id=instance.id)
-            instance._old_status = old_instance.status
-        except Task.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+    instance.changes = TaskChanges.capture(instance)
 
 
 @receiver(post_save, sender=Task)
@@ -28,69 +23,38 @@ def log_task_changes(sender, instance, created, **kwargs):
     """
     Po zapisie sprawdzamy, co się zmieniło i logujemy.
     """
-    user = instance.user  # Zakładamy, że user jest w modelu Task
-
+    # instance.user czytamy dopiero, gdy jest co logować (to osobne zapytanie)
     if created:
         ActivityLogger.log(
-            user, instance,
+            instance.user, instance,
             ActivityLog.ActionType.CREATED,
             f"Utworzono zadanie: {instance.title}"
         )
 
-    elif hasattr(instance, '_old_status') and instance._old_status != instance.status:
+    elif instance.changes.has_changed('status'):
         # Wykryto zmianę statusu!
         description = f"Zmiana statusu: {instance.get_status_display()}"
 
         # Specjalny przypadek: Ukończenie
         action_type = ActivityLog.ActionType.STATUS_CHANGE
+        details = {
+            'old_status': instance.changes.old('status'),
+            'new_status': instance.status
+        }
         if instance.status == 'done':
             action_type = ActivityLog.ActionType.COMPLETED
             description = "Zadanie ukończone! 🎉"
+            # Minuty i obszar/kontekst z chwili ukończenia - dla dziennych podsumowań
+            details.update(completion_details(instance))
 
         ActivityLogger.log(
-            user, instance,
+            instance.user, instance,
             action_type,
             description,
-            details={
-                'old_status': instance._old_status,
-                'new_status': instance.status
-            }
+            details=details
         )
 
 
-@receiver(post_save, sender=Task)
-def update_goal_progress(sender, instance, **kwargs):
-    """Przelicz postęp projektu i celu po zmianie zadania."""
-    if instance.project:
-        # 1. Przelicz Projekt (opcjonalnie, jeśli projekt ma pole progress)
-        # ...
-
-        # 2. Przelicz Cel (jeśli projekt ma cel)
-        goal = instance.project.goal
-        if goal:
-            from django.db.models import Count, Q
-
-            # Pobierz wszystkie zadania powiązane z tym celem (przez projekty)
-            # To wymaga odwrotnego lookupu.
-            # Załóżmy strukturę: Goal -> (projects) -> Project -> (tasks) -> Task
-
-            # Agregacja:
-            # Policz wszystkie zadania w projektach tego celu
-            stats = Task.objects.filter(project__goal=goal).aggregate(
-                total=Count('id'),
-                done=Count('id', filter=Q(status='done'))
-            )
-
-            total = stats['total']
-            done = stats['done']
-
-            new_progress = int((done / total) * 100) if total > 0 else 0
-
-            if goal.progress != new_progress:
-                goal.progress = new_progress
-                goal.save()
-
-
 @receiver(pre_save, sender=Task)
 def update_ready_since(sender, instance, **kwargs):
     """Aktualizuje ready_since przy wejściu w status aktywny."""
@@ -99,11 +63,7 @@ def update_ready_since(sender, instance, **kwargs):
     inactive_statuses = ['blocked', 'waiting', 'delegated', 'postponed', 'paused', 'inbox']
 
     if instance.id:
-        try:
-            old_instance = Task.objects.get(id=instance.id)
-            old_status = old_instance.status
-        except Task.DoesNotExist:
-            old_status = None
+        old_status = instance.changes.old('status')
 
         # Scenariusz 1: Nowe zadanie tworzone od razu jako TODO
         if not old_status and instance.status in active_statuses:
@@ -128,7 +88,7 @@ def track_recurring_completion(sender, instance, created, **kwargs):
     """Zlicza ukończenie zadania cyklicznego."""
     # Jeśli zadanie jest DONE, ma szablon i właśnie zmieniliśmy status
     if not created and instance.status == 'done' and instance.recurring_pattern:
-        if hasattr(instance, '_old_status') and instance._old_status != 'done':
+        if instance.changes.old('status') != 'done':
             # Inkrementacja licznika
             # Używamy F() dla bezpieczeństwa przy współbieżności (opcjonalnie)
             from django.db.models import F
@@ -0,0 +1,276 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from apps.areas.models import Area
+from apps.core.tests.migration_test_case import MigrationTestCase
+from apps.goals.models import Goal
+from apps.projects.models import Project
+from apps.projects.services.progress_service import ProgressService
+from apps.reports.application.activity_rollup import ActivityRollupService
+from apps.reports.models import ActivityLog, DailyActivityRollup
+from apps.tasks.domain.services import RecurrenceService
+from apps.tasks.models import ChecklistItem, RecurringPattern, Task
+
+
+class GenerateDailyInstancesTest(TestCase):
+    """Generator instancji (bulk_create) - zapis i skutki uboczne jak przy Task.objects.create."""
+
+    def setUp(self):
+        self.today = date.today()
+        self.user = get_user_model().objects.create_user(username='recurrence')
+        self.area = Area.objects.create(user=self.user, name='Dom')
+        self.goal = Goal.objects.create(user=self.user, title='Cel')
+        self.project = Project.objects.create(user=self.user, title='Projekt', goal=self.goal, area=self.area)
+
+    def make_pattern(self, user=None, project=None, days_behind=2, **fields):
+        return RecurringPattern.objects.create(
+            user=user or self.user, title='Podlać kwiaty', project=project, frequency='DAILY',
+            next_run_date=self.today - timedelta(days=days_behind), default_duration_min=20, **fields
+        )
+
+    def generate(self, **options):
+        with self.captureOnCommitCallbacks(execute=True):
+            return RecurrenceService().generate_daily_instances(**options)
+
+    def test_catches_up_missed_days(self):
+        pattern = self.make_pattern(project=self.project)
+
+        result = self.generate()
+
+        self.assertEqual((result.patterns, result.generated, result.duplicates), (1, 3, 0))
+        self.assertEqual(
+            sorted(t.due_date.date() for t in Task.objects.filter(recurring_pattern=pattern)),
+            [self.today - timedelta(days=offset) for offset in (2, 1, 0)],
+        )
+        pattern.refresh_from_db()
+        self.assertEqual((pattern.next_run_date, pattern.generated_count), (self.today + timedelta(days=1), 3))
+
+    def test_dry_run_writes_nothing(self):
+        pattern = self.make_pattern(project=self.project)
+        ChecklistItem.objects.create(recurring_pattern=pattern, text='Konewka')
+        out = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('run_daily_recurrence', '--dry-run', stdout=out)
+
+        self.assertIn('[dry-run] Wygenerowano 3 nowych zadań cyklicznych.', out.getvalue())
+        self.assertIn('punkty checklist: 3', out.getvalue())
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(ChecklistItem.objects.filter(task__isnull=False).count(), 0)
+        self.assertFalse(ActivityLog.objects.exists())
+        self.assertFalse(DailyActivityRollup.objects.exists())
+        pattern.refresh_from_db()
+        self.assertEqual((pattern.next_run_date, pattern.generated_count), (self.today - timedelta(days=2), 0))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.total_tasks, 0)
+
+    def test_existing_instances_are_duplicates(self):
+        pattern = self.make_pattern()
+        existing = Task.objects.create(
+            user=self.user, title='Już jest', status='done', recurring_pattern=pattern,
+            due_date=RecurrenceService._due_datetime(self.today - timedelta(days=1)),
+        )
+
+        result = self.generate()
+
+        self.assertEqual((result.generated, result.duplicates), (2, 1))
+        due_days = [t.due_date.date() for t in Task.objects.filter(recurring_pattern=pattern).exclude(pk=existing.pk)]
+        self.assertEqual(sorted(due_days), [self.today - timedelta(days=2), self.today])
+        # Drugi przebieg: wszystko już jest
+        RecurringPattern.objects.filter(pk=pattern.pk).update(next_run_date=self.today - timedelta(days=2))
+        result = self.generate()
+        self.assertEqual((result.generated, result.duplicates), (0, 3))
+
+    def test_checklist_items_are_copied_unticked(self):
+        pattern = self.make_pattern(days_behind=0)
+        ChecklistItem.objects.create(recurring_pattern=pattern, text='Konewka', order=2, is_completed=True)
+        ChecklistItem.objects.create(recurring_pattern=pattern, text='Nawóz', order=1, is_completed=True)
+
+        result = self.generate()
+
+        task = Task.objects.get(recurring_pattern=pattern)
+        self.assertEqual(result.checklist_items, 2)
+        self.assertEqual(
+            list(task.checklist_items.values_list('text', 'order', 'is_completed')),
+            [('Nawóz', 1, False), ('Konewka', 2, False)],
+        )
+        # Szablon bez zmian
+        self.assertEqual(ChecklistItem.objects.filter(recurring_pattern=pattern, is_completed=True).count(), 2)
+
+    def test_side_effects_match_task_create(self):
+        self.make_pattern(project=self.project)
+        self.generate()
+
+        # Te same zadania przez Task.objects.create (sygnały) u drugiego użytkownika
+        other = get_user_model().objects.create_user(username='recurrence-create')
+        other_goal = Goal.objects.create(user=other, title='Cel')
+        other_project = Project.objects.create(
+            user=other, title='Projekt', goal=other_goal, area=Area.objects.create(user=other, name='Dom')
+        )
+        pattern = self.make_pattern(user=other, project=other_project, is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            for task in Task.objects.filter(user=self.user).order_by('due_date'):
+                Task.objects.create(
+                    user=other, title=task.title, project=other_project, priority=task.priority,
+                    duration_min=task.duration_min, duration_max=task.duration_max, status=task.status,
+                    recurring_pattern=pattern, due_date=task.due_date,
+                )
+
+        def snapshot(user, project, goal):
+            project.refresh_from_db()
+            goal.refresh_from_db()
+            tasks = Task.objects.filter(user=user).order_by('due_date')
+            return {
+                'project': (project.total_tasks, project.done_tasks),
+                'goal': (goal.total_tasks, goal.done_tasks, goal.progress),
+                'tasks': list(tasks.values_list('area_id', 'status', 'cpm_es', 'cpm_ef', 'is_critical_path')),
+                'ready': [t.ready_since is not None for t in tasks],
+                'logs': sorted(ActivityLog.objects.filter(user=user).values_list('action_type', 'description')),
+                'rollups': [
+                    (r.date, r.created, r.completed, r.status_changes)
+                    for r in DailyActivityRollup.objects.filter(user=user)
+                ],
+            }
+
+        generated = snapshot(self.user, self.project, self.goal)
+        created = snapshot(other, other_project, other_goal)
+        # Obszar zadania dziedziczony z projektu - u każdego użytkownika inny
+        generated['tasks'] = [row[1:] for row in generated['tasks'] if row[0] == self.area.id]
+        created['tasks'] = [row[1:] for row in created['tasks'] if row[0] == other_project.area_id]
+
+        self.assertEqual(generated, created)
+        self.assertEqual(generated['project'], (3, 0))
+        self.assertEqual(len(generated['tasks']), 3)
+        self.assertEqual(ProgressService().check(), [])
+        self.assertEqual(ActivityRollupService().check(), [])
+
+    def test_remaining_max_occurrences_caps_generation(self):
+        # Dwie instancje już były - z pięciu zaległych terminów wolno utworzyć jeszcze dwie
+        pattern = self.make_pattern(days_behind=4, max_occurrences=4)
+        RecurringPattern.objects.filter(pk=pattern.pk).update(generated_count=2)
+
+        result = self.generate()
+
+        self.assertEqual((result.generated, result.deactivated), (2, 1))
+        pattern.refresh_from_db()
+        self.assertEqual((pattern.is_active, pattern.generated_count), (False, 4))
+        self.assertEqual(
+            sorted(t.due_date.date() for t in Task.objects.filter(recurring_pattern=pattern)),
+            [self.today - timedelta(days=4), self.today - timedelta(days=3)],
+        )
+
+
+class DueDaysTest(SimpleTestCase):
+    """Terminy do nadrobienia (_due_days) i wystąpienia reguły zakotwiczonej w start_date."""
+
+    def pattern(self, **fields):
+        fields.setdefault('frequency', 'DAILY')
+        return RecurringPattern(title='Cykl', **fields)
+
+    def test_paused_pattern_catches_up(self):
+        # Co poniedziałek od 6 stycznia; wstrzymany - ostatni termin 3 lutego
+        pattern = self.pattern(
+            frequency='WEEKLY', week_days=['MO'], start_date=date(2025, 1, 6), next_run_date=date(2025, 2, 3)
+        )
+
+        days, next_date, error = RecurrenceService._due_days(pattern, date(2025, 3, 5))
+
+        self.assertIsNone(error)
+        self.assertEqual(days, [date(2025, 2, 3), date(2025, 2, 10), date(2025, 2, 17), date(2025, 2, 24), date(2025, 3, 3)])
+        self.assertEqual(next_date, date(2025, 3, 10))
+
+    def test_next_run_date_off_rule_is_kept(self):
+        # Termin przesunięty ręcznie poza regułę - zostaje, dalej terminy reguły
+        pattern = self.pattern(
+            frequency='WEEKLY', week_days=['MO'], start_date=date(2025, 1, 6), next_run_date=date(2025, 2, 5)
+        )
+
+        days, next_date, _ = RecurrenceService._due_days(pattern, date(2025, 2, 18))
+
+        self.assertEqual(days, [date(2025, 2, 5), date(2025, 2, 10), date(2025, 2, 17)])
+        self.assertEqual(next_date, date(2025, 2, 24))
+
+    def test_nothing_due_yet(self):
+        pattern = self.pattern(start_date=date(2025, 3, 1), next_run_date=date(2025, 3, 12))
+
+        self.assertEqual(
+            RecurrenceService._due_days(pattern, date(2025, 3, 10)), ([], date(2025, 3, 12), None)
+        )
+
+    def test_capped_by_end_date(self):
+        pattern = self.pattern(start_date=date(2025, 3, 1), next_run_date=date(2025, 3, 2), end_date=date(2025, 3, 4))
+
+        days, next_date, _ = RecurrenceService._due_days(pattern, date(2025, 3, 10))
+
+        self.assertEqual(days, [date(2025, 3, 2), date(2025, 3, 3), date(2025, 3, 4)])
+        self.assertIsNone(next_date)  # Koniec serii
+        self.assertEqual(pattern.occurrences_between(date(2025, 3, 4), date(2025, 3, 31)), [date(2025, 3, 4)])
+
+    def test_capped_by_max_occurrences(self):
+        # COUNT liczy się od start_date: 1..5 marca; dwa już wygenerowane
+        pattern = self.pattern(
+            start_date=date(2025, 3, 1), next_run_date=date(2025, 3, 3), max_occurrences=5, generated_count=2
+        )
+
+        days, next_date, _ = RecurrenceService._due_days(pattern, date(2025, 3, 10))
+
+        self.assertEqual(days, [date(2025, 3, 3), date(2025, 3, 4), date(2025, 3, 5)])
+        self.assertIsNone(next_date)
+        self.assertEqual(pattern.next_occurrence(date(2025, 3, 4)), date(2025, 3, 5))
+        self.assertIsNone(pattern.next_occurrence(date(2025, 3, 5)))
+
+    def test_invalid_rule_keeps_next_run_date(self):
+        pattern = self.pattern(frequency='NIEZNANA', start_date=date(2025, 3, 1), next_run_date=date(2025, 3, 3))
+
+        days, next_date, error = RecurrenceService._due_days(pattern, date(2025, 3, 10))
+
+        self.assertEqual((days, next_date), ([date(2025, 3, 3)], None))
+        self.assertIsNotNone(error)
+
+    def test_start_date_anchors_interval(self):
+        # Co 2 tygodnie od 17 marca - faza liczona od start_date, nie od bieżącego next_run_date
+        pattern = self.pattern(
+            frequency='WEEKLY', interval=2, week_days=['MO'], start_date=date(2025, 3, 17),
+            next_run_date=date(2025, 3, 24),  # Ręcznie przesunięty o tydzień
+        )
+
+        self.assertEqual(
+            pattern.occurrences_between(date(2025, 3, 18), date(2025, 4, 30)),
+            [date(2025, 3, 31), date(2025, 4, 14), date(2025, 4, 28)],
+        )
+        self.assertEqual(pattern.next_occurrence(date(2025, 3, 24)), date(2025, 3, 31))
+
+
+class StartDateMigrationTest(MigrationTestCase):
+    """Migracja 0018 zakotwicza istniejące serie w next_run_date - serie co 2 tygodnie zachowują fazę."""
+
+    migrate_from = [('tasks', '0017_task_cpm_ef_task_cpm_es_task_cpm_lf_task_cpm_ls')]
+    migrate_to = [('tasks', '0018_recurringpattern_start_date')]
+
+    def setUpBeforeMigration(self, apps):
+        user = apps.get_model('auth', 'User').objects.create(username='migration-0018')
+        self.pattern_id = apps.get_model('tasks', 'RecurringPattern').objects.create(
+            user=user, title='Przegląd co 2 tygodnie', frequency='WEEKLY', interval=2, week_days=['MO'],
+            next_run_date=date(2025, 3, 17),
+        ).id
+
+    def test_biweekly_pattern_keeps_phase(self):
+        historical = self.apps.get_model('tasks', 'RecurringPattern').objects.get(id=self.pattern_id)
+        self.assertEqual(historical.start_date, date(2025, 3, 17))
+
+        pattern = RecurringPattern.objects.get(id=self.pattern_id)
+        self.assertEqual(
+            pattern.occurrences_between(date(2025, 3, 10), date(2025, 4, 30)),
+            [date(2025, 3, 17), date(2025, 3, 31), date(2025, 4, 14), date(2025, 4, 28)],
+        )
+        # Po wygenerowaniu terminu reguła nadal liczy od start_date
+        days, next_date, _ = RecurrenceService._due_days(pattern, date(2025, 3, 20))
+        self.assertEqual((days, next_date), ([date(2025, 3, 17)], date(2025, 3, 31)))
+        pattern.next_run_date = next_date
+        pattern.save()
+        pattern.refresh_from_db()
+        self.assertEqual(pattern.next_occurrence(date(2025, 4, 1)), date(2025, 4, 14))
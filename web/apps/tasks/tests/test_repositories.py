@@ -0,0 +1,74 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.areas.models import Area
+from apps.goals.models import Goal
+from apps.projects.models import Project
+from apps.tasks.adapters.orm_repositories import DjangoTaskRepository
+from apps.tasks.domain.entities import TaskStatus
+from apps.tasks.models import Task
+
+
+class BulkReadQueryCountTest(TestCase):
+    """Odczyty zbiorcze repozytorium: blocked_by jednym zapytaniem, niezależnie od liczby zadań."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='repo')
+        goal = Goal.objects.create(user=cls.user, title='Cel', deadline=date(2030, 1, 1))
+        cls.project = Project.objects.create(user=cls.user, title='Projekt', goal=goal, deadline=date(2029, 6, 1))
+        cls.area = Area.objects.create(user=cls.user, name='Praca')
+
+    def make_tasks(self, count):
+        tasks = Task.objects.bulk_create([
+            Task(user=self.user, title=f'Zadanie {i}', status='todo', project=self.project, area=self.area)
+            for i in range(count)
+        ])
+        # Każde zadanie (poza pierwszym) zablokowane przez poprzednie, co trzecie także przez pierwsze
+        edges = []
+        for i, task in enumerate(tasks[1:], start=1):
+            edges.append(Task.blocked_by.through(from_task_id=task.id, to_task_id=tasks[i - 1].id))
+            if i % 3 == 0 and i > 1:
+                edges.append(Task.blocked_by.through(from_task_id=task.id, to_task_id=tasks[0].id))
+        Task.blocked_by.through.objects.bulk_create(edges)
+        return tasks
+
+    def test_get_active_tasks_query_count_is_constant(self):
+        for count in (3, 40):
+            with self.subTest(count=count):
+                Task.objects.all().delete()
+                self.make_tasks(count)
+
+                # 1: zadania z area / project / goal (select_related), 2: wszystkie krawędzie blocked_by
+                with self.assertNumQueries(2):
+                    entities = DjangoTaskRepository().get_active_tasks(user_id=self.user.id)
+
+                self.assertEqual(len(entities), count)
+
+    def test_to_entities_and_other_bulk_reads_query_count(self):
+        tasks = self.make_tasks(25)
+        repo = DjangoTaskRepository()
+
+        with self.assertNumQueries(2):
+            repo.to_entities(Task.objects.filter(user=self.user).select_related('area', 'project__goal'))
+        with self.assertNumQueries(2):
+            repo.filter_by_status(TaskStatus.TODO)
+        with self.assertNumQueries(2):
+            repo.get_dependent_tasks(tasks[0].id)
+
+    def test_blocked_by_assembled_in_memory(self):
+        tasks = self.make_tasks(7)
+
+        entities = {e.id: e for e in DjangoTaskRepository().get_active_tasks(user_id=self.user.id)}
+
+        for task in tasks:
+            with self.subTest(task=task.id):
+                self.assertEqual(
+                    sorted(entities[task.id].blocked_by),
+                    sorted(task.blocked_by.values_list('id', flat=True)),
+                )
+        self.assertEqual(entities[tasks[0].id].blocked_by, [])
+        self.assertEqual(entities[tasks[1].id].area_color, self.area.color)
+        self.assertEqual(entities[tasks[1].id].goal_deadline.date(), date(2030, 1, 1))
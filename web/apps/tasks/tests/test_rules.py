@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from apps.tasks.domain.rules import RuleCache, occurrences_between
+
+
+class RuleCacheTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = RuleCache(maxsize=2)
+        start = date(2025, 3, 1)
+        first = cache.get(1, 'a', 'FREQ=DAILY', start)
+        cache.get(2, 'a', 'FREQ=WEEKLY', start)
+
+        self.assertIs(cache.get(1, 'a', 'FREQ=DAILY', start), first)  # 1 ostatnio używany
+        cache.get(3, 'a', 'FREQ=MONTHLY', start)  # Wypiera 2, nie 1
+
+        self.assertIs(cache.get(1, 'a', 'FREQ=DAILY', start), first)
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+        cache.get(2, 'a', 'FREQ=WEEKLY', start)
+        self.assertEqual(cache.misses, 4)
+
+    def test_changed_fingerprint_recompiles_in_place(self):
+        cache = RuleCache(maxsize=2)
+        start = date(2025, 3, 1)
+        cache.get(1, 'co-dzień', 'FREQ=DAILY', start)
+        rule = cache.get(1, 'co-2-dni', 'FREQ=DAILY;INTERVAL=2', start)
+
+        self.assertEqual(
+            occurrences_between(rule, date(2025, 3, 1), date(2025, 3, 6)),
+            [date(2025, 3, 1), date(2025, 3, 3), date(2025, 3, 5)],
+        )
+        self.assertEqual(len(cache._rules), 1)
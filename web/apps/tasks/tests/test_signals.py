@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.reports.models import ActivityLog
+from apps.tasks.models import Task
+
+
+# Odczyt stanu sprzed zapisu w TaskChanges.capture (values(*TRACKED_FIELDS))
+SNAPSHOT_SQL = 'SELECT "tasks_task"."status" AS "status", "tasks_task"."project_id" AS "project_id",'
+
+
+class TaskChangesQueryCountTest(TestCase):
+    """Stan sprzed zapisu czytany najwyżej raz na Task.save(), wspólnie dla wszystkich receiverów."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='signals')
+
+    def setUp(self):
+        self.task = Task.objects.create(user=self.user, title='Zadanie', status='blocked', duration_min=30)
+
+    def snapshot_reads(self, queries):
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith(SNAPSHOT_SQL)]
+
+    def test_loaded_task_save_reads_no_snapshot(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = 'todo'
+
+        with CaptureQueriesContext(connection) as queries:
+            task.save()
+
+        self.assertEqual(self.snapshot_reads(queries), [])
+        # Wszystkie receivery widziały zmianę statusu blocked -> todo
+        task.refresh_from_db()
+        self.assertIsNotNone(task.ready_since)
+        self.assertTrue(ActivityLog.objects.filter(
+            object_id=task.pk, action_type=ActivityLog.ActionType.STATUS_CHANGE,
+            details__old_status='blocked', details__new_status='todo',
+        ).exists())
+
+    def test_task_without_snapshot_reads_it_once(self):
+        # Instancja zbudowana ręcznie (bez from_db) - migawki brak, potrzebny jeden SELECT
+        loaded = Task.objects.get(pk=self.task.pk)
+        task = Task(**{f.attname: getattr(loaded, f.attname) for f in Task._meta.concrete_fields})
+        task.status = 'todo'
+
+        with CaptureQueriesContext(connection) as queries:
+            task.save()
+
+        self.assertEqual(len(self.snapshot_reads(queries)), 1)
+        self.assertEqual(task.changes.old('status'), 'blocked')
+        self.assertIsNotNone(task.ready_since)
+
+    def test_save_query_count(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.title = 'Nowy tytuł'
+
+        # Bez zmiany statusu: tylko UPDATE, bez odczytu migawki i bez logowania
+        with self.assertNumQueries(1):
+            task.save()
+
+        task.save()  # Kolejny zapis tej samej instancji korzysta z odświeżonej migawki
+        task.status = 'todo'
+        with CaptureQueriesContext(connection) as queries:
+            task.save()
+        self.assertEqual(self.snapshot_reads(queries), [])
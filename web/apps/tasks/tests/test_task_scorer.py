@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from apps.tasks.domain.entities import TaskEntity, TaskStatus
+from apps.tasks.domain.services import TaskScorer
+
+
+NOW = datetime(2025, 3, 10, 15, 45, tzinfo=timezone.utc)
+STRATEGIES = ['balanced', 'warmup', 'deep_work', 'deadline']
+
+
+def maybe(rng, value, p=0.6):
+    return value if rng.random() < p else None
+
+
+def random_task(rng, task_id):
+    duration_min = rng.choice([None, 5, 15, 25, 30, 45, 60, 120, 240, 300])
+    return TaskEntity(
+        id=task_id,
+        title=f"Zadanie {task_id}",
+        status=TaskStatus.TODO,
+        duration_min=duration_min,
+        duration_max=maybe(rng, (duration_min or 30) + rng.choice([0, 15, 45])),
+        # Terminy wokół progów pilności: przeterminowane, < 24h, < 72h, dalej; także "dziś" dla EOD
+        due_date=maybe(rng, NOW + timedelta(minutes=rng.randint(-3 * 24 * 60, 10 * 24 * 60))),
+        priority=rng.randint(1, 5),
+        energy_required=rng.randint(1, 3),
+        complexity=rng.randint(1, 5),
+        is_critical_path=rng.random() < 0.15,
+        is_milestone=rng.random() < 0.1,
+        project_id=rng.choice([None, 1, 2, 3, 4]),
+        goal_deadline=maybe(rng, NOW + timedelta(hours=rng.randint(-72, 24 * 20))),
+        project_deadline=maybe(rng, NOW + timedelta(hours=rng.randint(-72, 24 * 20))),
+        ready_since=maybe(rng, NOW - timedelta(minutes=rng.randint(-60, 5 * 24 * 60))),
+        created_at=maybe(rng, NOW - timedelta(days=rng.randint(0, 10))),
+    )
+
+
+class ScoreBatchPropertyTest(SimpleTestCase):
+    """Ścieżka wektorowa (score_batch, rank_tasks) musi zgadzać się ze skalarną calculate_score."""
+
+    def test_score_batch_matches_calculate_score(self):
+        rng = random.Random(42)
+
+        for case in range(300):
+            scorer = TaskScorer(TaskScorer.get_weights_for_strategy(rng.choice(STRATEGIES)))
+            tasks = [random_task(rng, i) for i in range(rng.randint(1, 40))]
+            slot = dict(
+                slot_energy_level=rng.randint(1, 3),
+                last_project_id=rng.choice([None, 1, 2, 3]),
+                sequence_count=rng.randint(0, 4),
+                hours_to_end_of_day=rng.choice([None, 0.5, 1.99, 2.0, 6.0]),
+            )
+
+            batch = scorer.score_batch(tasks, NOW, **slot)
+
+            self.assertEqual(len(batch), len(tasks))
+            for task, score in zip(tasks, batch):
+                with self.subTest(case=case, task=task.id):
+                    self.assertAlmostEqual(float(score), scorer.calculate_score(task, NOW, **slot), places=4)
+
+    def test_rank_tasks_matches_scalar_sort(self):
+        rng = random.Random(7)
+
+        for case in range(100):
+            scorer = TaskScorer()
+            tasks = [random_task(rng, i) for i in range(rng.randint(0, 60))]
+
+            # Stabilne sortowanie malejąco po wyniku skalarnym (remisy w kolejności wejścia)
+            expected = sorted(tasks, key=lambda t: -scorer.calculate_score(t, NOW))
+
+            with self.subTest(case=case):
+                self.assertEqual([t.id for t in scorer.rank_tasks(tasks, NOW)], [t.id for t in expected])
+
+    def test_empty_input(self):
+        scorer = TaskScorer()
+        self.assertEqual(len(scorer.score_batch([], NOW)), 0)
+        self.assertEqual(scorer.rank_tasks([], NOW), [])
@@ -72,6 +72,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Przeliczenia po zapisach zadań - raz na żądanie (apps.tasks.application.unit_of_work)
+    "apps.tasks.middleware.TaskUnitOfWorkMiddleware",
 ]
 
 ROOT_URLCONF = "gtd_calendar.urls"
@@ -143,3 +145,42 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Cache (plany Schedulera, fragmenty przeglądu tygodniowego, sekcje statystyk raportów).
+# Unieważnianie działa przez liczniki generacji w cache, podbijane także poza serwerem WWW:
+# run_daily_recurrence, sync_calendars, inne workery. Wszystkie procesy muszą więc widzieć
+# TEN SAM cache - w produkcji CACHE_URL=redis://host:6379/1 (docker-compose: gtd-redis).
+# Domyślny LocMem jest osobny w każdym procesie: zmiany z komend i innych workerów
+# do niego nie docierają i strona pokazuje stare plany / statystyki aż do upływu TTL
+# (PLAN_CACHE['TIMEOUT'], WeeklyReviewPage, StatsReport). Wystarcza tylko dla jednego procesu
+# runserver bez komend w tle.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Cache planów Schedulera (apps.calendar_app.application.plan_cache)
+# Domyślnie framework cache Django (CACHES, patrz wyżej - musi być współdzielony między procesami).
+# W testach: 'apps.calendar_app.adapters.plan_cache.LocMemPlanCacheBackend'.
+# Statystyki trafień: logger apps.calendar_app.application.plan_cache (INFO co 100 odczytów, DEBUG każdy).
+PLAN_CACHE = {
+    'BACKEND': 'apps.calendar_app.adapters.plan_cache.DjangoPlanCacheBackend',
+    'OPTIONS': {},
+    'TIMEOUT': 15 * 60,
+}
+
+# Lokalna kopia kalendarza (calendar_app.CalendarEvent, odświeżana przez `manage.py sync_calendars`)
+# Starsza niż tyle sekund -> widoki czytają bezpośrednio z Google API.
+CALENDAR_SYNC_STALE_AFTER = env.int('CALENDAR_SYNC_STALE_AFTER', default=30 * 60)
+
+# Logi aplikacji (np. statystyki cache planów) na konsolę
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps': {'handlers': ['console'], 'level': env('APPS_LOG_LEVEL', default='INFO')},
+    },
+}